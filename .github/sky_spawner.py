@@ -1,6 +1,65 @@
 # FULL ARCADE SHOOTER: SUB WEAPONS + 4 BOSSES + BOMB + DINO HELPERS + SMOOTH LERP
 # Integrated dino-chain + custom dino sprite + updated power-up system
-import os, sys, time, random, pygame, math, traceback
+import os, sys, io, time, random, math, traceback, argparse, json, mmap, hashlib, wave
+from collections import OrderedDict
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+# ---------------- COMMAND LINE ----------------
+# --headless runs the simulation with no window, no mixer and no FPS cap (CI balance / perf runs).
+arg_parser = argparse.ArgumentParser(description="Sky Ruins arcade shooter")
+arg_parser.add_argument("--headless", action="store_true", help="simulate without window/audio/frame cap")
+arg_parser.add_argument("--frames", type=int, default=3600, help="frames to simulate in headless mode")
+arg_parser.add_argument("--dirty-rects", action="store_true",
+                        help="software rendering: static background, update only changed screen areas")
+arg_parser.add_argument("--seed", type=int, default=None, help="seed the gameplay and cosmetic RNG streams")
+arg_parser.add_argument("--record", default=None, metavar="PATH",
+                        help="record every game (seed, per-step input, actions) to PATH, PATH-2, ...")
+arg_parser.add_argument("--replay", default=None, metavar="PATH",
+                        help="play back a recording; with --headless just verify it, with --bench time it")
+arg_parser.add_argument("--build-assets", action="store_true",
+                        help="rebuild every entry of the derived-asset pack, write it and exit")
+arg_parser.add_argument("--frame-budget", type=float, default=None,
+                        help="frame-time budget in ms for the load governor (default: one frame at FPS)")
+arg_parser.add_argument("--profile", action="store_true",
+                        help="record per-phase frame timings from the start (F4 toggles) and write them on exit")
+arg_parser.add_argument("--profile-csv", default="profile.csv", help="where --profile writes its timings")
+arg_parser.add_argument("--bench", nargs="?", const="all", default=None, metavar="SCENARIO",
+                        help="run a stress scenario (or all of them) headless and print JSON results")
+arg_parser.add_argument("--bench-frames", type=int, default=600, help="frames per benchmark scenario")
+arg_parser.add_argument("--bench-seed", type=int, default=1, help="RNG seed for benchmark scenarios")
+arg_parser.add_argument("--bench-out", default=None, help="also write the benchmark JSON to this file")
+arg_parser.add_argument("--bench-baseline", default=None,
+                        help="earlier --bench-out JSON; exit non-zero if any scenario regressed")
+arg_parser.add_argument("--bench-tolerance", type=float, default=0.15,
+                        help="allowed slowdown vs the baseline (0.15 = 15%%)")
+arg_parser.add_argument("--batch", type=int, default=None, metavar="N",
+                        help="play N seeded headless games with the autopilot across a process pool")
+arg_parser.add_argument("--batch-workers", type=int, default=None, help="worker processes (default: CPU count)")
+arg_parser.add_argument("--batch-frames", type=int, default=18000, help="frame limit per batch game")
+arg_parser.add_argument("--batch-config", default=None, metavar="PATH",
+                        help="JSON list of config overrides, e.g. [{\"ENEMY_SPAWN_BASE_INTERVAL\": 0.7}]; "
+                             "run i uses entry i %% len")
+arg_parser.add_argument("--batch-out", default="batch_results.json", help="where --batch writes per-run stats")
+arg_parser.add_argument("--autopilot", action="store_true",
+                        help="let the built-in autopilot play (window, --headless, --bench; --batch always uses it)")
+arg_parser.add_argument("--bench-autopilot", action="store_true",
+                        help="time one autopilot decision against growing enemy bullet counts, then exit")
+arg_parser.add_argument("--bench-entities", action="store_true",
+                        help="compare dict vs slotted entity update speed and memory, then exit")
+ARGS, _ = arg_parser.parse_known_args()
+HEADLESS = (ARGS.headless or ARGS.bench is not None or ARGS.batch is not None or ARGS.build_assets
+            or ARGS.bench_autopilot
+            or os.environ.get("SKY_HEADLESS") == "1")
+if HEADLESS:
+    # SDL reads these at init time, so they must be set before pygame.init()
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    os.environ["SDL_NO_SIGNAL_HANDLERS"] = "1"  # SIGTERM must end batch workers, not queue a QUIT event
+    os.environ["SKY_HEADLESS"] = "1"
+
+import pygame
+import numpy as np
 from pygame import Rect
 from math import hypot, sin, cos, radians
 
@@ -97,148 +156,317 @@ helper_count = 0
 helper_spawn_timer = 0.0
 
 # ---------------- SOUND INIT ----------------
-pygame.mixer.pre_init(44100, -16, 2, 512)
-pygame.init()
+if HEADLESS:
+    # only what the simulation needs: a dummy display (for convert_alpha) and fonts
+    pygame.display.init()
+    pygame.font.init()
+else:
+    pygame.mixer.pre_init(44100, -16, 2, 512)
+    pygame.init()
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("SKY RUINS — 4 BOSSES + DINO HELPERS + SMOOTH LERP")
 clock = pygame.time.Clock()
 font = pygame.font.SysFont("consolas", 20)
 bigfont = pygame.font.SysFont("arial", 48, bold=True)
+smallfont = pygame.font.SysFont("consolas", 14)
 
 # ---------------- SOUND LOADERS ----------------
-def load_sound_safe(name):
+# Split so the loader threads do the slow part: sound_source() reads the file or synthesizes
+# PCM (see SYNTH below); make_sound() hands it to the mixer.
+def sound_source(name):
     path = ap(f"sounds/{name}")
     if os.path.exists(path):
+        with open(path, "rb") as f:
+            return ("file", f.read())
+    return ("pcm", synth_sound(name))
+
+def make_sound(name, source):
+    if HEADLESS: return None  # no mixer; every call site checks "if sound:"
+    kind, data = source
+    if kind == "file":
         try:
-            snd = pygame.mixer.Sound(path)
+            snd = pygame.mixer.Sound(file=io.BytesIO(data))
             snd.set_volume(0.5)
             return snd
         except Exception as e:
             print(f"Sound load failed ({name}): {e}")
-    if name == "shoot.wav": return create_beep(800, 0.05)
-    elif name == "hit.wav": return create_beep(400, 0.03)
-    elif name == "explode.wav": return create_explosion()
-    elif name == "powerup.wav": return create_sweep(600, 1200, 0.15)
-    elif name == "boss.wav": return create_beep(150, 0.4)
-    elif name == "victory.wav": return create_jingle()
-    elif name == "levelup.wav": return create_rising(400, 1200, 0.4)
-    elif name == "transform.wav": return create_powerup()
-    elif name == "bomb.wav": return create_bomb_sound()
-    return None
+            data = synth_sound(name)
+    return pcm_to_sound(data) if data is not None else None
+
+def load_sound_safe(name):
+    if HEADLESS: return None
+    return make_sound(name, sound_source(name))
+
+# ---------------- SYNTH ----------------
+# Whole-buffer NumPy synthesis: a voice is a float array in [-1, 1] at SYNTH_RATE, shaped by
+# an ADSR envelope; mix() lays voices out on a timeline. Rendered PCM is cached on disk under
+# a hash of the recipe, so a missing sounds/*.wav costs one render per parameter change.
+SYNTH_RATE = 44100
+SYNTH_VERSION = 1  # bump when the synth functions change what a recipe sounds like
+SYNTH_CACHE_DIR = ap("sounds/synth_cache")
+
+def synth_time(duration):
+    return np.arange(int(duration * SYNTH_RATE)) / SYNTH_RATE
+
+def adsr(n, attack=0.005, decay=0.0, sustain=1.0, release=0.01):
+    """Envelope of n samples; times in seconds, release is taken from the end of the buffer."""
+    env = np.full(n, float(sustain))
+    a, d, r = (min(n, int(x * SYNTH_RATE)) for x in (attack, decay, release))
+    if a: env[:a] = np.linspace(0.0, 1.0, a, endpoint=False)
+    if d: env[a:a+d] = np.linspace(1.0, sustain, len(env[a:a+d]), endpoint=False)
+    if r: env[n-r:] *= np.linspace(1.0, 0.0, r)
+    return env
+
+def tone(freq, duration, amp=0.5, env=None):
+    """Sine voice; freq may be an array (per sample) for sweeps."""
+    t = synth_time(duration)
+    freq = freq(t) if callable(freq) else freq
+    wave_ = amp * np.sin(2 * np.pi * freq * t)
+    return wave_ * (adsr(len(t)) if env is None else env(len(t)))
+
+def noise(duration, amp=0.25, seed=0):
+    n = int(duration * SYNTH_RATE)
+    return amp * np.random.default_rng(seed).uniform(-1.0, 1.0, n)
+
+def mix(voices, duration=None):
+    """Sum (start_seconds, voice) pairs into one buffer."""
+    ends = [int(start * SYNTH_RATE) + len(v) for start, v in voices]
+    out = np.zeros(int(duration * SYNTH_RATE) if duration else max(ends))
+    for (start, v), end in zip(voices, ends):
+        i = int(start * SYNTH_RATE)
+        end = min(end, len(out))
+        out[i:end] += v[:end - i]
+    return out
+
+def to_pcm(buf):
+    return (np.clip(buf, -1.0, 1.0) * 32767).astype(np.int16)
 
 def create_beep(freq, duration):
-    sample_rate = 44100
-    frames = int(duration * sample_rate)
-    data = bytearray()
-    for i in range(frames):
-        t = i / sample_rate
-        value = int(32767 * 0.5 * math.sin(2 * math.pi * freq * t))
-        data.extend(value.to_bytes(2, 'little', signed=True))
-    return pygame.mixer.Sound(buffer=data)
+    return tone(freq, duration, 0.5)
 
 def create_sweep(f1, f2, duration):
-    sample_rate = 44100
-    frames = int(duration * sample_rate)
-    data = bytearray()
-    for i in range(frames):
-        t = i / sample_rate
-        freq = f1 + (f2 - f1) * (t / duration)
-        value = int(32767 * 0.4 * math.sin(2 * math.pi * freq * t))
-        data.extend(value.to_bytes(2, 'little', signed=True))
-    return pygame.mixer.Sound(buffer=data)
+    return tone(lambda t: f1 + (f2 - f1) * (t / duration), duration, 0.4)
 
 def create_explosion():
-    sample_rate = 44100
-    frames = int(0.2 * sample_rate)
-    data = bytearray()
-    for i in range(frames):
-        t = i / sample_rate
-        noise = random.randint(-8000, 8000)
-        decay = 1 - (t / 0.2)
-        value = int(noise * decay)
-        data.extend(value.to_bytes(2, 'little', signed=True))
-    return pygame.mixer.Sound(buffer=data)
+    return noise(0.2, 8000 / 32767, seed=1) * np.linspace(1.0, 0.0, int(0.2 * SYNTH_RATE), endpoint=False)
 
 def create_rising(f1, f2, duration):
-    sample_rate = 44100
-    frames = int(duration * sample_rate)
-    data = bytearray()
-    for i in range(frames):
-        t = i / sample_rate
-        freq = f1 + (f2 - f1) * (t / duration)
-        value = int(32767 * 0.6 * math.sin(2 * math.pi * freq * t))
-        data.extend(value.to_bytes(2, 'little', signed=True))
-    return pygame.mixer.Sound(buffer=data)
+    return tone(lambda t: f1 + (f2 - f1) * (t / duration), duration, 0.6)
 
 def create_powerup():
-    sample_rate = 44100
-    frames = int(0.8 * sample_rate)
-    data = bytearray()
-    for i in range(frames):
-        t = i / sample_rate
-        f1 = 600 + 300 * math.sin(t * 12)
-        f2 = 1200 + 200 * math.sin(t * 18)
-        value = int(32767 * 0.3 * (math.sin(2 * math.pi * f1 * t) + 0.6 * math.sin(2 * math.pi * f2 * t)))
-        data.extend(value.to_bytes(2, 'little', signed=True))
-    return pygame.mixer.Sound(buffer=data)
+    t = synth_time(0.8)
+    f1 = 600 + 300 * np.sin(t * 12)
+    f2 = 1200 + 200 * np.sin(t * 18)
+    return 0.3 * (np.sin(2 * np.pi * f1 * t) + 0.6 * np.sin(2 * np.pi * f2 * t)) * adsr(len(t))
 
 def create_jingle():
-    sample_rate = 44100
-    total_frames = int(1.0 * sample_rate)
-    data = bytearray(b'\x00\x00' * total_frames)
     notes = [(523, 0.15), (659, 0.15), (784, 0.15), (1047, 0.4)]
-    pos = 0
+    voices, start = [], 0.0
     for freq, dur in notes:
-        frames = int(dur * sample_rate)
-        for i in range(frames):
-            if pos + i < total_frames:
-                t = i / sample_rate
-                value = int(32767 * 0.5 * math.sin(2 * math.pi * freq * t))
-                offset = (pos + i) * 2
-                data[offset:offset+2] = value.to_bytes(2, 'little', signed=True)
-        pos += frames
-    return pygame.mixer.Sound(buffer=data)
+        voices.append((start, tone(freq, dur, 0.5, lambda n: adsr(n, 0.005, 0.05, 0.8, 0.03))))
+        start += dur
+    return mix(voices, 1.0)
 
 def create_bomb_sound():
-    sample_rate = 44100
-    frames = int(0.6 * sample_rate)
-    data = bytearray()
-    for i in range(frames):
-        t = i / sample_rate
-        freq = 100 + 800 * (1 - t / 0.6)
-        noise = random.randint(-12000, 12000) * (1 - t / 0.6)
-        value = int(noise + 32767 * 0.7 * math.sin(2 * math.pi * freq * t))
-        value = max(-32768, min(32767, value))
-        data.extend(value.to_bytes(2, 'little', signed=True))
-    return pygame.mixer.Sound(buffer=data)
-
-# Load sounds
-shoot_sound = load_sound_safe("shoot.wav")
-hit_sound = load_sound_safe("hit.wav")
-explode_sound = load_sound_safe("explode.wav")
-powerup_sound = load_sound_safe("powerup.wav")
-boss_sound = load_sound_safe("boss.wav")
-victory_sound = load_sound_safe("victory.wav")
-levelup_sound = load_sound_safe("levelup.wav")
-transform_sound = load_sound_safe("transform.wav")
-bomb_sound = load_sound_safe("bomb.wav")
+    t = synth_time(0.6)
+    fade = 1 - t / 0.6
+    rumble = tone(lambda t: 100 + 800 * (1 - t / 0.6), 0.6, 0.7)
+    return mix([(0.0, rumble), (0.0, noise(0.6, 12000 / 32767, seed=2) * fade)])
+
+# name -> (synth function, args); the cache key covers all of it
+SYNTH_RECIPES = {
+    "shoot.wav": (create_beep, (800, 0.05)),
+    "hit.wav": (create_beep, (400, 0.03)),
+    "explode.wav": (create_explosion, ()),
+    "powerup.wav": (create_sweep, (600, 1200, 0.15)),
+    "boss.wav": (create_beep, (150, 0.4)),
+    "victory.wav": (create_jingle, ()),
+    "levelup.wav": (create_rising, (400, 1200, 0.4)),
+    "transform.wav": (create_powerup, ()),
+    "bomb.wav": (create_bomb_sound, ()),
+}
 
-# Background music
-music_path = ap("sounds/music.ogg")
-if os.path.exists(music_path):
+def synth_cache_path(name, fn, args):
+    recipe = json.dumps([name, fn.__name__, list(args), SYNTH_RATE, SYNTH_VERSION])
+    digest = hashlib.sha1(recipe.encode()).hexdigest()[:12]
+    return os.path.join(SYNTH_CACHE_DIR, f"{os.path.splitext(name)[0]}-{digest}.wav")
+
+def synth_sound(name):
+    """Mono int16 PCM for a built-in sound, rendered once and then read back from the cache."""
+    if name not in SYNTH_RECIPES:
+        return None
+    fn, args = SYNTH_RECIPES[name]
+    path = synth_cache_path(name, fn, args)
     try:
-        pygame.mixer.music.load(music_path)
-        pygame.mixer.music.play(-1)
-        pygame.mixer.music.set_volume(0.9)
-    except:
+        with wave.open(path, "rb") as w:
+            return np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+    except (OSError, EOFError, wave.Error):
         pass
+    pcm = to_pcm(fn(*args))
+    try:
+        os.makedirs(SYNTH_CACHE_DIR, exist_ok=True)
+        tmp = path + ".tmp"
+        with wave.open(tmp, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(SYNTH_RATE)
+            w.writeframes(pcm.tobytes())
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"synth cache write failed ({name}): {e}")
+    return pcm
+
+def pcm_to_sound(pcm):
+    """Mono int16 PCM -> mixer Sound, matching the mixer's rate and channel count."""
+    freq, _, channels = pygame.mixer.get_init()
+    if freq != SYNTH_RATE:
+        n = int(len(pcm) * freq / SYNTH_RATE)
+        pcm = np.interp(np.arange(n) * SYNTH_RATE / freq, np.arange(len(pcm)), pcm).astype(np.int16)
+    if channels > 1:
+        pcm = np.repeat(pcm[:, None], channels, axis=1)
+    return pygame.sndarray.make_sound(np.ascontiguousarray(pcm))
+
+# ---------------- VOICE MANAGER ----------------
+# Every effect goes through sfx.play(); triggers are queued and played once per rendered frame
+# by sfx.flush(), so a frame with thirty kills costs a few channel plays instead of thirty.
+# name -> (channel group, priority, max simultaneous voices)
+SOUND_SPECS = {
+    "shoot": ("weapons", 1, 2),
+    "hit": ("impacts", 1, 3),
+    "explode": ("impacts", 2, 4),
+    "powerup": ("events", 3, 1),
+    "boss": ("events", 4, 1),
+    "levelup": ("events", 4, 1),
+    "victory": ("events", 5, 1),
+    "transform": ("events", 5, 1),
+    "bomb": ("events", 5, 1),
+}
+SOUND_GROUPS = {"weapons": 3, "impacts": 5, "events": 3}  # reserved channels per group
+SOUND_FILES = {name: f"{name}.wav" for name in SOUND_SPECS}
+SOUND_PAN = 0.7      # how far a sound at the screen edge leans into one speaker
+SOUND_FALLOFF = 0.5  # volume lost at a full screen width from the player
+
+class VoiceManager:
+    def __init__(self):
+        self.sounds = {}        # name -> Sound, filled by the asset loader (see STARTUP)
+        self.groups = {}        # group -> [Channel]
+        self.voices = {}        # Channel -> (name, priority, start time)
+        self.pending = {}       # name -> [triggers, x sum, positioned triggers, max volume]
+        self.stats = {"played": 0, "merged": 0, "stolen": 0, "dropped": 0}
+
+    def init_channels(self):
+        """Reserve a fixed block of mixer channels per group; music and stray plays keep the rest."""
+        if HEADLESS or not pygame.mixer.get_init():
+            return
+        total = sum(SOUND_GROUPS.values())
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), total + 4))
+        pygame.mixer.set_reserved(total)
+        idx = 0
+        for group, n in SOUND_GROUPS.items():
+            self.groups[group] = [pygame.mixer.Channel(idx + i) for i in range(n)]
+            idx += n
+
+    def register(self, name, sound):
+        if sound:
+            self.sounds[name] = sound
+
+    def play(self, name, x=None, volume=1.0):
+        """Queue a trigger; duplicates within a frame merge into one louder voice."""
+        if name not in self.sounds:
+            return
+        p = self.pending.get(name)
+        if p is None:
+            p = self.pending[name] = [0, 0.0, 0, 0.0]
+        else:
+            self.stats["merged"] += 1
+        p[0] += 1
+        if x is not None:
+            p[1] += x
+            p[2] += 1
+        p[3] = max(p[3], volume)
+
+    def flush(self, listener_x=None):
+        if not self.pending:
+            return
+        t = time.perf_counter()
+        # most important first, so low-priority sounds are the ones left without a channel
+        for name in sorted(self.pending, key=lambda n: -SOUND_SPECS[n][1]):
+            count, xsum, xn, vol = self.pending[name]
+            ch = self._channel(name, t)
+            if ch is None:
+                self.stats["dropped"] += 1
+                continue
+            vol = min(1.0, vol * (1.0 + 0.15 * (count - 1)))
+            left = right = vol
+            if xn:
+                x = xsum / xn
+                if listener_x is not None:
+                    vol *= 1.0 - SOUND_FALLOFF * min(1.0, abs(x - listener_x) / WIDTH)
+                pan = max(-1.0, min(1.0, (x / WIDTH) * 2.0 - 1.0)) * SOUND_PAN
+                left, right = vol * min(1.0, 1.0 - pan), vol * min(1.0, 1.0 + pan)
+            ch.play(self.sounds[name])
+            ch.set_volume(left, right)
+            self.voices[ch] = (name, SOUND_SPECS[name][1], t)
+            self.stats["played"] += 1
+        self.pending.clear()
+
+    def _channel(self, name, t):
+        group, priority, max_voices = SOUND_SPECS[name]
+        channels = self.groups.get(group)
+        if not channels:
+            return pygame.mixer.find_channel()  # mixer came up without reserved groups
+        busy = [ch for ch in channels if ch.get_busy()]
+        same = [ch for ch in busy if self.voices.get(ch, ("",))[0] == name]
+        if len(same) >= max_voices:
+            self.stats["stolen"] += 1
+            return min(same, key=lambda ch: self.voices[ch][2])  # restart the oldest copy
+        for ch in channels:
+            if not ch.get_busy():
+                return ch
+        # group full: steal the oldest voice of lower priority, if any
+        victims = [ch for ch in busy if self.voices.get(ch, ("", 0, 0))[1] < priority]
+        if not victims:
+            return None
+        self.stats["stolen"] += 1
+        return min(victims, key=lambda ch: (self.voices[ch][1], self.voices[ch][2]))
+
+sfx = VoiceManager()
+sfx.init_channels()
+
+# Background music
+music_path = ap("sounds/music.ogg")
+
+def start_music():
+    if not HEADLESS and os.path.exists(music_path):
+        try:
+            pygame.mixer.music.load(music_path)
+            pygame.mixer.music.play(-1)
+            pygame.mixer.music.set_volume(0.9)
+        except:
+            pass
 
 # ---------------- LOADERS ----------------
+_decoded_images = {}  # path -> Surface decoded by a loader thread, still in file pixel format
+
+def decode_image(name):
+    """Loader-thread half of load_image_safe: file decode only (convert_alpha needs the main thread)."""
+    path = ap(name)
+    if os.path.exists(path):
+        try:
+            _decoded_images[path] = pygame.image.load(path)
+        except Exception:
+            pass
+
 def load_image_safe(name, size=None):
     path = ap(name)
-    if path and os.path.exists(path):
+    img = _decoded_images.pop(path, None)
+    if img is None and path and os.path.exists(path):
         try:
-            img = pygame.image.load(path).convert_alpha()
+            img = pygame.image.load(path)
+        except: pass
+    if img is not None:
+        try:
+            img = img.convert_alpha()
             if size: img = pygame.transform.smoothscale(img, size)
             return img
         except: pass
@@ -247,63 +475,272 @@ def load_image_safe(name, size=None):
     surf.fill((120,120,120,255))
     return surf
 
+# ---------------- ASSET LOADER ----------------
+class AssetLoader:
+    """
+    Background asset loading. Each job is work() on a pool thread (file reads, image decode,
+    PCM synthesis) plus finish(result) on the main thread (convert_alpha, mixer, globals).
+    Required jobs finish strictly in submit order so later stages can rely on earlier ones;
+    optional jobs (sounds, music) finish as soon as their work is done.
+    """
+    def __init__(self, workers=4):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+        self.required = []   # [name, future, finish] in submit order
+        self.optional = []
+        self.total = 0
+        self.finished = 0
+
+    def submit(self, name, work=None, finish=None, required=True):
+        fut = self.pool.submit(work) if work else None
+        (self.required if required else self.optional).append([name, fut, finish])
+        self.total += 1
+
+    def _finish(self, job):
+        name, fut, finish = job
+        try:
+            result = fut.result() if fut else None
+            if finish: finish(result)
+        except Exception as e:
+            print(f"Asset job failed ({name}): {e}")
+        self.finished += 1
+
+    def pump(self, budget_ms=8.0):
+        """Finish whatever is ready, stopping once budget_ms of main-thread time is used."""
+        end = time.perf_counter() + budget_ms / 1000.0
+        while self.required and time.perf_counter() < end:
+            fut = self.required[0][1]
+            if fut and not fut.done(): break
+            self._finish(self.required.pop(0))
+        for job in list(self.optional):
+            if time.perf_counter() >= end: break
+            if job[1] is None or job[1].done():
+                self.optional.remove(job)
+                self._finish(job)
+        self._maybe_close()
+
+    def wait(self, required_only=True):
+        """Block until the required jobs (and optionally the rest) have finished."""
+        while self.required:
+            self._finish(self.required.pop(0))
+        if not required_only:
+            while self.optional:
+                self._finish(self.optional.pop(0))
+        self._maybe_close()
+
+    def _maybe_close(self):
+        if self.done() and self.pool:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+            _decoded_images.clear()  # decodes the asset pack made unnecessary
+
+    def pending(self, required_only=True):
+        return len(self.required) + (0 if required_only else len(self.optional))
+
+    def progress(self):
+        return self.finished / self.total if self.total else 1.0
+
+    def current(self):
+        return self.required[0][0] if self.required else (self.optional[0][0] if self.optional else "")
+
+    def done(self):
+        return not self.required and not self.optional
+
+asset_loader = AssetLoader()
+
+# ---------------- ASSET PACK ----------------
+ASSET_PACK_PATH = ap("assets/derived.pack")
+ASSET_PACK_MAGIC = b"SKYPACK1"
+
+class AssetPack:
+    """
+    Derived surfaces (scaled, padded, sliced) cached in one file: magic, manifest length,
+    JSON manifest, then raw RGBA blobs. Each entry records the source mtimes and build
+    parameters it was made from; on a mismatch only that entry is rebuilt and save()
+    rewrites the pack. Cached pixels come straight out of an mmap via image.frombuffer.
+    """
+    def __init__(self, path=ASSET_PACK_PATH, rebuild=False):
+        self.path = path
+        self.manifest = {}
+        self.mm = None
+        self.data_start = 0
+        self.fresh = {}  # key -> (stamp, surfaces) built this run
+        self.hits = 0
+        if not rebuild:
+            self._open()
+
+    def _open(self):
+        try:
+            with open(self.path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return  # no pack yet (or an empty file)
+        header = len(ASSET_PACK_MAGIC) + 8
+        try:
+            if mm[:len(ASSET_PACK_MAGIC)] != ASSET_PACK_MAGIC:
+                raise ValueError("bad magic")
+            size = int.from_bytes(mm[len(ASSET_PACK_MAGIC):header], "little")
+            self.manifest = json.loads(mm[header:header + size])
+        except ValueError:
+            mm.close()
+            self.manifest = {}
+            return
+        self.mm = mm
+        self.data_start = header + size
+
+    @staticmethod
+    def stamp(sources, params):
+        mtimes = []
+        for name in sources:
+            path = ap(name)
+            mtimes.append([name, os.path.getmtime(path) if os.path.exists(path) else None])
+        # round-trip so tuples in params compare equal to what the manifest loads back
+        return json.loads(json.dumps({"sources": mtimes, "params": params}))
+
+    def get(self, key, sources, params, build):
+        """Surfaces for `key`: from the pack if its stamp still matches, else build() them."""
+        stamp = self.stamp(sources, params)
+        entry = self.manifest.get(key)
+        if self.mm is not None and entry is not None and entry["stamp"] == stamp:
+            self.hits += 1
+            return [self._surface(off, w, h) for off, w, h in entry["frames"]]
+        surfs = build()
+        self.fresh[key] = (stamp, surfs)
+        return surfs
+
+    def _surface(self, off, w, h):
+        start = self.data_start + off
+        with memoryview(self.mm)[start:start + w * h * 4] as view:
+            return pygame.image.frombuffer(view, (w, h), "RGBA").convert_alpha()
+
+    def save(self):
+        """Rewrite the pack if anything was rebuilt; untouched entries keep their stored pixels."""
+        if not self.fresh:
+            return
+        manifest, blobs, off = {}, [], 0
+        for key, entry in self.manifest.items():
+            if key in self.fresh or self.mm is None:
+                continue
+            frames = []
+            for old_off, w, h in entry["frames"]:
+                start = self.data_start + old_off
+                blobs.append(self.mm[start:start + w * h * 4])
+                frames.append([off, w, h])
+                off += w * h * 4
+            manifest[key] = {"stamp": entry["stamp"], "frames": frames}
+        for key, (stamp, surfs) in self.fresh.items():
+            frames = []
+            for surf in surfs:
+                w, h = surf.get_size()
+                blobs.append(pygame.image.tobytes(surf, "RGBA"))
+                frames.append([off, w, h])
+                off += w * h * 4
+            manifest[key] = {"stamp": stamp, "frames": frames}
+        header = json.dumps(manifest).encode()
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(ASSET_PACK_MAGIC)
+                f.write(len(header).to_bytes(8, "little"))
+                f.write(header)
+                for blob in blobs:
+                    f.write(blob)
+            os.replace(tmp, self.path)
+            print(f"asset pack: rebuilt {len(self.fresh)} of {len(manifest)} entries -> {self.path}")
+        except OSError:
+            traceback.print_exc()
+        self.manifest = manifest
+        self.fresh = {}
+
+asset_pack = AssetPack(rebuild=ARGS.build_assets)
+
 # ---------------- ASSETS ----------------
-stage_img = load_image_safe("assets/stage.png", (WIDTH*3, HEIGHT))
+# Everything below is filled in by the load_* stages the asset loader runs on the main thread
+# (see STARTUP); the placeholders keep the title scene drawable meanwhile.
+stage_img = None
+hero_imgs = []
+hero_transform_img = None
+enemy_img = boss_img = dino_img = None
 
-# --- HERO FRAMES: normalize canvas so wing / frame differences don't compress or misalign frames ---
-# Load raw hero frames without forcing a uniform size first (so we can inspect originals).
-hero_raw = [load_image_safe(f"assets/hero{i+1}.png") for i in range(4)]
+def load_stage():
+    global stage_img
+    stage_img = asset_pack.get("stage", ["assets/stage.png"], [WIDTH*3, HEIGHT],
+                               lambda: [load_image_safe("assets/stage.png", (WIDTH*3, HEIGHT))])[0]
 
-# Determine maximum original width/height and add a horizontal padding so wing sprites can overlap
-orig_sizes = [img.get_size() for img in hero_raw]
-max_w = max([w for w,h in orig_sizes]) if orig_sizes else 64
-max_h = max([h for w,h in orig_sizes]) if orig_sizes else 64
+# --- HERO FRAMES: normalize canvas so wing / frame differences don't compress or misalign frames ---
 WING_PADDING = 24  # extra horizontal pixels to allow wing span overlap
-HERO_CANVAS = (max_w + WING_PADDING, max_h)
+HERO_SOURCES = [f"assets/hero{i+1}.png" for i in range(4)]
+HERO_CANVAS = (64 + WING_PADDING, 64)  # replaced by the real canvas in load_hero()
 
-# Create consistent-sized frames by centering each raw frame on a new surface with extra width
-hero_imgs = []
-for i, img in enumerate(hero_raw):
-    surf = pygame.Surface(HERO_CANVAS, pygame.SRCALPHA)
-    x = (HERO_CANVAS[0] - img.get_width()) // 2
-    y = (HERO_CANVAS[1] - img.get_height()) // 2
-    surf.blit(img, (x, y))
-    hero_imgs.append(surf)
-
-# Debug print to help you spot mismatched source frames during testing (remove/comment in production)
-print("hero frame original sizes:", orig_sizes, "-> normalized to:", HERO_CANVAS)
-
-# Transform image: ensure it's not awkwardly scaled compared to normalized hero frames
-hero_transform_img = load_image_safe("assets/hero_transform.png")
-if hero_transform_img.get_size() != HERO_CANVAS:
-    t_surf = pygame.Surface(HERO_CANVAS, pygame.SRCALPHA)
-    tx = (HERO_CANVAS[0] - hero_transform_img.get_width()) // 2
-    ty = (HERO_CANVAS[1] - hero_transform_img.get_height()) // 2
-    t_surf.blit(hero_transform_img, (tx, ty))
-    hero_transform_img = t_surf
-
-enemy_img = pygame.transform.smoothscale(load_image_safe("assets/enemy.png", (48,48)), (64,64))
-
-# BOSS IMAGE — FIXED!
-boss_img = load_image_safe("assets/boss1.png", (140, 140))
-if boss_img.get_width() < 10:
-    boss_img = pygame.Surface((140, 140), pygame.SRCALPHA)
-    pygame.draw.circle(boss_img, (180, 0, 180), (70, 70), 60)
-    pygame.draw.circle(boss_img, (255, 100, 255), (70, 70), 60, 8)
-    pygame.draw.polygon(boss_img, (255, 50, 255), [(70,10), (100,60), (70,110), (40,60)])
-    pygame.draw.circle(boss_img, (255, 200, 255), (50, 50), 15)
-    pygame.draw.circle(boss_img, (255, 200, 255), (90, 90), 15)
-
-# DINO HELPER SPRITE (load default first)
-dino_img = load_image_safe(DINO_SPRITE_PATH, (48, 48))
-if dino_img.get_width() < 10:
-    dino_img = pygame.Surface((48,48), pygame.SRCALPHA)
-    pygame.draw.polygon(dino_img, (80,180,80), [(12,24),(24,12),(36,24),(24,36)])
-    pygame.draw.circle(dino_img, (120,220,120), (20,20), 8)
-    pygame.draw.circle(dino_img, (220,220,220), (20,20), 4)
-    pygame.draw.circle(dino_img, (60,140,60), (36,20), 8)
-    pygame.draw.circle(dino_img, (220,220,220), (36,20), 4)
-    pygame.draw.polygon(dino_img, (150,255,150), [(12,24),(24,12),(36,24),(24,36)], 2)
+def build_hero_frames():
+    # Load raw hero frames without forcing a uniform size first (so we can inspect originals).
+    hero_raw = [load_image_safe(name) for name in HERO_SOURCES]
+
+    # Determine maximum original width/height and add a horizontal padding so wing sprites can overlap
+    orig_sizes = [img.get_size() for img in hero_raw]
+    max_w = max([w for w,h in orig_sizes]) if orig_sizes else 64
+    max_h = max([h for w,h in orig_sizes]) if orig_sizes else 64
+    canvas = (max_w + WING_PADDING, max_h)
+
+    # Create consistent-sized frames by centering each raw frame on a new surface with extra width
+    frames = []
+    for img in hero_raw:
+        surf = pygame.Surface(canvas, pygame.SRCALPHA)
+        x = (canvas[0] - img.get_width()) // 2
+        y = (canvas[1] - img.get_height()) // 2
+        surf.blit(img, (x, y))
+        frames.append(surf)
+
+    # Debug print to help you spot mismatched source frames during testing (remove/comment in production)
+    print("hero frame original sizes:", orig_sizes, "-> normalized to:", canvas)
+    return frames
+
+
+def build_hero_transform():
+    # Transform image: ensure it's not awkwardly scaled compared to normalized hero frames
+    img = load_image_safe("assets/hero_transform.png")
+    if img.get_size() != HERO_CANVAS:
+        t_surf = pygame.Surface(HERO_CANVAS, pygame.SRCALPHA)
+        tx = (HERO_CANVAS[0] - img.get_width()) // 2
+        ty = (HERO_CANVAS[1] - img.get_height()) // 2
+        t_surf.blit(img, (tx, ty))
+        img = t_surf
+    return [img]
+
+def load_hero():
+    global hero_imgs, HERO_CANVAS, hero_transform_img
+    hero_imgs = asset_pack.get("hero_frames", HERO_SOURCES, [WING_PADDING], build_hero_frames)
+    HERO_CANVAS = hero_imgs[0].get_size()
+    hero_transform_img = asset_pack.get("hero_transform", ["assets/hero_transform.png"], HERO_CANVAS,
+                                        build_hero_transform)[0]
+
+def load_sprites():
+    global enemy_img, boss_img, dino_img
+    enemy_img = pygame.transform.smoothscale(load_image_safe("assets/enemy.png", (48,48)), (64,64))
+
+    # BOSS IMAGE — FIXED!
+    boss_img = load_image_safe("assets/boss1.png", (140, 140))
+    if boss_img.get_width() < 10:
+        boss_img = pygame.Surface((140, 140), pygame.SRCALPHA)
+        pygame.draw.circle(boss_img, (180, 0, 180), (70, 70), 60)
+        pygame.draw.circle(boss_img, (255, 100, 255), (70, 70), 60, 8)
+        pygame.draw.polygon(boss_img, (255, 50, 255), [(70,10), (100,60), (70,110), (40,60)])
+        pygame.draw.circle(boss_img, (255, 200, 255), (50, 50), 15)
+        pygame.draw.circle(boss_img, (255, 200, 255), (90, 90), 15)
+
+    # DINO HELPER SPRITE (load default first)
+    dino_img = load_image_safe(DINO_SPRITE_PATH, (48, 48))
+    if dino_img.get_width() < 10:
+        dino_img = pygame.Surface((48,48), pygame.SRCALPHA)
+        pygame.draw.polygon(dino_img, (80,180,80), [(12,24),(24,12),(36,24),(24,36)])
+        pygame.draw.circle(dino_img, (120,220,120), (20,20), 8)
+        pygame.draw.circle(dino_img, (220,220,220), (20,20), 4)
+        pygame.draw.circle(dino_img, (60,140,60), (36,20), 8)
+        pygame.draw.circle(dino_img, (220,220,220), (36,20), 4)
+        pygame.draw.polygon(dino_img, (150,255,150), [(12,24),(24,12),(36,24),(24,36)], 2)
 
 # ---------------- Rune system / visuals ----------------
 rune_colors = [(255,200,100), (100,200,255), (200,100,255), (255,100,100)]
@@ -319,29 +756,45 @@ def create_rune_glow(size, color, alpha=180):
         pygame.draw.line(surf, (*color, min(255, alpha+50)), (x1,y1), (x2,y2), 3)
     return surf
 
-muzzle_imgs = [create_rune_glow(48, c) for c in rune_colors]
-bullet_imgs = [create_rune_glow(24, c, 220) for c in rune_colors]
-hit_imgs = [create_rune_glow(48, c, 200) for c in rune_colors]
-rune_img = create_rune_glow(36, (200,180,255), 240)
+muzzle_imgs, bullet_imgs, hit_imgs, rune_img = [], [], [], None
+
+def build_rune_glows():
+    # plain SRCALPHA drawing, so this runs on a loader thread
+    return ([create_rune_glow(48, c) for c in rune_colors],
+            [create_rune_glow(24, c, 220) for c in rune_colors],
+            [create_rune_glow(48, c, 200) for c in rune_colors],
+            create_rune_glow(36, (200,180,255), 240))
+
+def set_rune_glows(glows):
+    global muzzle_imgs, bullet_imgs, hit_imgs, rune_img
+    muzzle_imgs, bullet_imgs, hit_imgs, rune_img = glows
 
 # ---------------- BOMB ANIMATION ----------------
 bomb_frames = []
-for i in range(8):
-    surf = pygame.Surface((60,60), pygame.SRCALPHA)
-    t = i / 7
-    radius = 10 + int(15 * t)
-    alpha = int(255 * (1 - t))
-    color = (255, int(150*t), int(50*t), alpha)
-    pygame.draw.circle(surf, color, (30,30), radius)
-    for j in range(6):
-        ang = j * 60 + i * 15
-        rad = radians(ang)
-        x1 = 30 + int(20 * cos(rad))
-        y1 = 30 + int(20 * sin(rad))
-        x2 = 30 + int(35 * cos(rad))
-        y2 = 30 + int(35 * sin(rad))
-        pygame.draw.line(surf, color, (x1,y1), (x2,y2), 3)
-    bomb_frames.append(surf)
+
+def build_bomb_frames():
+    frames = []
+    for i in range(8):
+        surf = pygame.Surface((60,60), pygame.SRCALPHA)
+        t = i / 7
+        radius = 10 + int(15 * t)
+        alpha = int(255 * (1 - t))
+        color = (255, int(150*t), int(50*t), alpha)
+        pygame.draw.circle(surf, color, (30,30), radius)
+        for j in range(6):
+            ang = j * 60 + i * 15
+            rad = radians(ang)
+            x1 = 30 + int(20 * cos(rad))
+            y1 = 30 + int(20 * sin(rad))
+            x2 = 30 + int(35 * cos(rad))
+            y2 = 30 + int(35 * sin(rad))
+            pygame.draw.line(surf, color, (x1,y1), (x2,y2), 3)
+        frames.append(surf)
+    return frames
+
+def set_bomb_frames(frames):
+    bomb_frames[:] = frames
+
 bomb_anim_timer = 0.0
 bomb_anim_index = 0
 
@@ -363,95 +816,681 @@ def create_sub_sprite(typ):
     return surf
 
 sub_imgs = {}
-for typ in sub_weapons:
-    path = sub_sprite_paths.get(typ)
-    img = load_image_safe(path, (48,48))
-    if img.get_width() < 10:
-        img = create_sub_sprite(typ)
-    sub_imgs[typ] = img
+
+def load_sub_sprites():
+    for typ in sub_weapons:
+        path = sub_sprite_paths.get(typ)
+        img = load_image_safe(path, (48,48))
+        if img.get_width() < 10:
+            img = create_sub_sprite(typ)
+        sub_imgs[typ] = img
+
+# ---------------- LOAD GOVERNOR ----------------
+FRAME_BUDGET_MS = ARGS.frame_budget or 1000.0 / FPS
+QUALITY_MIN = 0.25
+MAX_EFFECTS = 200
+MAX_ENEMIES = 40
+
+class LoadGovernor:
+    """
+    Tracks a smoothed frame time against FRAME_BUDGET_MS and steers a quality scalar in
+    [QUALITY_MIN, 1]: it drops fast when over budget and recovers slowly with headroom.
+    Cosmetic work degrades first (particle counts and lifetimes, then the particle and effect
+    caps); the enemy cap only tightens once quality is near the floor. Headless runs never
+    record frame times, so seeded simulations always run at full quality.
+    """
+    def __init__(self, budget_ms=FRAME_BUDGET_MS):
+        self.budget_ms = budget_ms
+        self.avg_ms = 0.0
+        self.quality = 1.0
+
+    def record(self, frame_ms):
+        self.avg_ms += (frame_ms - self.avg_ms) * 0.1
+        if self.avg_ms > self.budget_ms:
+            self.set_quality(max(QUALITY_MIN, self.quality - 0.05))
+        elif self.avg_ms < self.budget_ms * 0.75:
+            self.set_quality(min(1.0, self.quality + 0.01))
+
+    def set_quality(self, quality):
+        # enemy_cap() makes quality gameplay-relevant, so replays record and restore it
+        self.quality = quality
+        effects.limit = self.effect_cap()
+
+    def count(self, n):
+        """Emitter count for a cosmetic burst; never rounds a non-empty burst to zero."""
+        return max(1, int(n * self.quality + 0.5)) if n > 0 else 0
+
+    def life(self, life):
+        return life * (0.5 + 0.5 * self.quality)
+
+    def particle_cap(self, capacity):
+        return int(capacity * self.quality)
+
+    def effect_cap(self):
+        return MAX_EFFECTS if self.quality >= 0.6 else int(MAX_EFFECTS * self.quality)
+
+    def enemy_cap(self):
+        return MAX_ENEMIES if self.quality > 0.4 else MAX_ENEMIES // 2
+
+governor = LoadGovernor()
 
 # ---------------- PARTICLE SYSTEM ----------------
-particles = []
+MAX_PARTICLES = 8192  # fixed capacity; when full, new particles overwrite slots in ring order
+
+class ParticleSystem:
+    """
+    Fixed-capacity particle pool in NumPy arrays with live particles packed in [0, n).
+    update() applies gravity, integration and life decay to all particles at once, then fills the
+    holes left by dead particles with live ones from the tail (swap-compaction, no shifting).
+    Emission has its own NumPy generator: particles are cosmetic and don't touch the gameplay RNG.
+    """
+    def __init__(self, capacity=MAX_PARTICLES, seed=None):
+        self.capacity = capacity
+        self.n = 0
+        self.ring = 0  # next slot to overwrite once the pool is full
+        self.rng = np.random.default_rng(seed)
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.life = np.zeros(capacity)
+        self.max_life = np.ones(capacity)
+        self.size = np.zeros(capacity)
+        self.gravity = np.zeros(capacity)
+        self.color = np.zeros((capacity, 3), np.uint8)
+
+    def __len__(self):
+        return self.n
+
+    def clear(self):
+        self.n = 0
+        self.ring = 0
+
+    def _alloc(self, count):
+        count = min(count, self.capacity)
+        free = self.capacity - self.n
+        if count <= free:
+            idx = np.arange(self.n, self.n + count)
+            self.n += count
+            return idx
+        head = np.arange(self.n, self.capacity)
+        self.n = self.capacity
+        tail = (self.ring + np.arange(count - free)) % self.capacity
+        self.ring = int((self.ring + count - free) % self.capacity)
+        return np.concatenate((head, tail))
+
+    def emit(self, x, y, count, color, speed, life, size, gravity, spread):
+        if count <= 0:
+            return
+        idx = self._alloc(count)
+        k = len(idx)
+        ang = np.radians(self.rng.uniform(0, spread, k))
+        vel = self.rng.uniform(speed * 0.5, speed, k)
+        self.x[idx] = x
+        self.y[idx] = y
+        self.vx[idx] = np.cos(ang) * vel
+        self.vy[idx] = np.sin(ang) * vel
+        self.life[idx] = life
+        self.max_life[idx] = life
+        self.size[idx] = size
+        self.gravity[idx] = gravity
+        self.color[idx] = color[:3]
+
+    def update(self, dt):
+        n = self.n
+        if not n:
+            return
+        vy = self.vy[:n]
+        vy += self.gravity[:n]
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += vy
+        life = self.life[:n]
+        life -= dt
+        dead = life <= 0
+        dead_count = int(np.count_nonzero(dead))
+        if not dead_count:
+            return
+        keep = n - dead_count
+        holes = np.flatnonzero(dead[:keep])            # dead slots inside the surviving range
+        fillers = np.flatnonzero(~dead[keep:]) + keep  # live slots beyond it (same count)
+        if len(holes):
+            for arr in (self.x, self.y, self.vx, self.vy, self.life, self.max_life,
+                        self.size, self.gravity, self.color):
+                arr[holes] = arr[fillers]
+        self.n = keep
+        if self.ring >= keep:
+            self.ring = 0
+
+particles = ParticleSystem()
+
 def create_particles(x, y, count=15, color=(255,200,100), speed=8, life=0.8, size=4, gravity=0.3, spread=360):
-    for _ in range(count):
-        angle = random.uniform(0, spread)
-        vel = random.uniform(speed * 0.5, speed)
-        vx = math.cos(math.radians(angle)) * vel
-        vy = math.sin(math.radians(angle)) * vel
-        particles.append({
-            "x": x, "y": y, "vx": vx, "vy": vy,
-            "life": life, "max_life": life, "color": color, "size": size, "gravity": gravity
-        })
+    # below full quality, bursts shrink, die sooner and stop at the governor's live cap
+    if governor.quality < 1.0:
+        count = min(governor.count(count), governor.particle_cap(particles.capacity) - particles.n)
+        life = governor.life(life)
+    particles.emit(x, y, count, color, speed, life, size, gravity, spread)
 
 def update_particles(dt):
-    for p in particles[:]:
-        p["vy"] += p["gravity"]
-        p["x"] += p["vx"]
-        p["y"] += p["vy"]
-        p["life"] -= dt
-        if p["life"] <= 0:
-            particles.remove(p)
-
-def draw_particles():
-    for p in particles:
-        alpha = int(255 * (p["life"] / p["max_life"]))
-        size = max(1, int(p["size"] * (p["life"] / p["max_life"])))
-        color = (*p["color"], alpha)
-        s = pygame.Surface((size*2, size*2), pygame.SRCALPHA)
-        pygame.draw.circle(s, color, (size, size), size)
-        screen.blit(s, (int(p["x"] - size) + shake_offset[0], int(p["y"] - size) + shake_offset[1]))
+    particles.update(dt)
+
+# ---------------- PARTICLE SPRITE CACHE ----------------
+PARTICLE_ALPHA_STEP = 16                       # alpha is quantized to this many levels per bucket
+PARTICLE_CACHE_MAX_BYTES = 4 * 1024 * 1024     # memory cap for cached particle surfaces
+
+class SpriteCache:
+    """
+    LRU cache of pre-rendered particle discs keyed by (rgb, radius, alpha bucket).
+    Least recently used surfaces are evicted once their total pixel memory passes max_bytes.
+    """
+    def __init__(self, max_bytes=PARTICLE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, rgb, radius, alpha):
+        key = (rgb, radius, alpha)
+        surf = self.entries.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
+        pygame.draw.circle(surf, (*rgb, alpha), (radius, radius), radius)
+        self.entries[key] = surf
+        self.bytes += radius * radius * 16
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, old = self.entries.popitem(last=False)
+            self.bytes -= old.get_width() * old.get_height() * 4
+            self.evictions += 1
+        return surf
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self.entries), "bytes": self.bytes,
+                "hit_rate": self.hits / total if total else 0.0}
+
+particle_sprite_cache = SpriteCache()
+
+# ---------------- SPRITE VARIANT CACHE ----------------
+VARIANT_SCALE_STEPS = 16   # pre-rendered sizes across a pulse range
+VARIANT_ALPHA_STEPS = 32   # pre-rendered opacities for fades
+
+class VariantCache:
+    """
+    Pre-rendered scale and alpha variants of source surfaces, so per-frame pulses and fades are
+    table lookups instead of smoothscale/set_alpha calls. Variants are copies, so shared source
+    images (muzzle_imgs, bullet sprites) are never modified.
+    """
+    def __init__(self, scale_steps=VARIANT_SCALE_STEPS, alpha_steps=VARIANT_ALPHA_STEPS):
+        self.scale_steps = scale_steps
+        self.alpha_steps = alpha_steps
+        self.tables = {}
+
+    def scaled(self, src, scale, lo, hi, alpha=None):
+        """Variant of src nearest to scale, from scale_steps sizes spanning [lo, hi]."""
+        key = (id(src), lo, hi, alpha)
+        entry = self.tables.get(key)
+        if entry is None:
+            w, h = src.get_size()
+            table = []
+            for i in range(self.scale_steps):
+                f = lo + (hi - lo) * i / (self.scale_steps - 1)
+                surf = pygame.transform.smoothscale(src, (max(1, int(w*f)), max(1, int(h*f))))
+                if alpha is not None:
+                    surf.set_alpha(alpha)
+                table.append(surf)
+            entry = self.tables[key] = (src, table)  # keep src alive so its id can't be reused
+        i = int(round((scale - lo) / (hi - lo) * (self.scale_steps - 1)))
+        return entry[1][clamp(i, 0, self.scale_steps - 1)]
+
+    def glowing(self, src, scale, lo, hi, glow_alpha):
+        """
+        src over a glow (a scaled copy at glow_alpha), baked into one per-pixel-alpha surface
+        per scale step, so a glowing sprite costs one blit instead of two. Returns
+        (surface, dx, dy): the bake is cropped to its opaque pixels, and (dx, dy) is its
+        top-left relative to the sprite centre.
+        """
+        key = (id(src), lo, hi, "glow", glow_alpha)
+        entry = self.tables.get(key)
+        if entry is None:
+            w, h = src.get_size()
+            table = []
+            for i in range(self.scale_steps):
+                f = lo + (hi - lo) * i / (self.scale_steps - 1)
+                gw, gh = max(1, int(w*f)), max(1, int(h*f))
+                glow = pygame.Surface((gw, gh), pygame.SRCALPHA)
+                glow.blit(pygame.transform.smoothscale(src, (gw, gh)), (0, 0))
+                cw, ch = max(w, gw), max(h, gh)
+                # straight-alpha "over" in float: SDL's blit onto a transparent target darkens
+                # soft edges, which would show wherever the core sits over a smaller glow
+                rgba = np.zeros((cw, ch, 4))
+                for layer, (lw, lh), fade in ((glow, (gw, gh), glow_alpha / 255.0), (src, (w, h), 1.0)):
+                    x0, y0 = cw // 2 - lw // 2, ch // 2 - lh // 2  # as separate blits at (x - w//2, y - h//2)
+                    dst = rgba[x0:x0 + lw, y0:y0 + lh]
+                    a = pygame.surfarray.array_alpha(layer)[..., None] / 255.0 * fade
+                    out = a + dst[..., 3:] * (1 - a)
+                    dst[..., :3] = (pygame.surfarray.array3d(layer) * a
+                                    + dst[..., :3] * dst[..., 3:] * (1 - a)) / np.maximum(out, 1e-9)
+                    dst[..., 3:] = out
+                surf = pygame.Surface((cw, ch), pygame.SRCALPHA)
+                pygame.surfarray.blit_array(surf, np.rint(rgba[..., :3]).astype(np.uint8))
+                pygame.surfarray.pixels_alpha(surf)[:] = np.rint(rgba[..., 3] * 255).astype(np.uint8)
+                r = surf.get_bounding_rect()  # transparent margins still cost a blend per pixel
+                surf = surf.subsurface(r).copy()
+                if pygame.display.get_surface():
+                    surf = surf.convert_alpha()
+                table.append((surf, r.x - cw // 2, r.y - ch // 2))
+            entry = self.tables[key] = (src, table)
+        i = int(round((scale - lo) / (hi - lo) * (self.scale_steps - 1)))
+        return entry[1][clamp(i, 0, self.scale_steps - 1)]
+
+    def faded(self, src, alpha):
+        """Copy of src at the nearest of alpha_steps opacities (alpha in 0..255)."""
+        key = (id(src), "alpha")
+        entry = self.tables.get(key)
+        if entry is None:
+            table = []
+            for i in range(self.alpha_steps):
+                surf = src.copy()
+                surf.set_alpha(int(255 * i / (self.alpha_steps - 1)))
+                table.append(surf)
+            entry = self.tables[key] = (src, table)
+        i = int(round(clamp(alpha, 0, 255) / 255 * (self.alpha_steps - 1)))
+        return entry[1][i]
+
+sprite_variants = VariantCache()
+
+# ---------------- TEXT CACHE ----------------
+TEXT_CACHE_SIZE = 256  # rendered strings kept (LRU); the HUD only changes a few of them per frame
+
+class TextCache:
+    """
+    LRU cache of antialiased text surfaces keyed by (font, text, color).
+    Counts hits per frame so the debug overlay can show how many font renders were saved.
+    """
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.frame_hits = 0
+        self.saved_last_frame = 0
+
+    def render(self, fnt, text, color):
+        key = (fnt, text, color)
+        surf = self.entries.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.frame_hits += 1
+            self.entries.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = self.entries[key] = fnt.render(text, True, color)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surf
+
+    def end_frame(self):
+        self.saved_last_frame = self.frame_hits
+        self.frame_hits = 0
+
+text_cache = TextCache()
+
+def render_text(fnt, text, color):
+    return text_cache.render(fnt, text, color)
+
+def draw_particles(surf):
+    n = particles.n
+    if not n:
+        return None
+    ratio = particles.life[:n] / particles.max_life[:n]
+    alphas = ((255 * ratio).astype(np.int32) // PARTICLE_ALPHA_STEP * PARTICLE_ALPHA_STEP).tolist()
+    sizes = np.maximum(1, (particles.size[:n] * ratio).astype(np.int32)).tolist()
+    get = particle_sprite_cache.get
+    blits = []
+    for px, py, size, alpha, rgb in zip(particles.x[:n].tolist(), particles.y[:n].tolist(), sizes, alphas,
+                                         particles.color[:n].tolist()):
+        if alpha <= 0:
+            continue
+        blits.append((get(tuple(rgb), size, alpha), (int(px - size), int(py - size))))
+    return surf.blits(blits, doreturn=compositor.dirty_rects)
+
+# ---------------- SIMULATION CLOCK ----------------
+# All game time (cooldowns, spawn timer, boss fire, effect/rune lifetimes) reads from one clock that only
+# the fixed-step loop advances, so a slow render frame can't desync timers from per-frame movement.
+SIM_DT = 1.0 / FPS
+MAX_SIM_STEPS_PER_FRAME = 5  # cap catch-up steps after a long stall (avoids the "spiral of death")
+
+class SimClock:
+    def __init__(self, start=1000.0):
+        # start well past zero so timers initialised to 0.0 still read as "long ago"
+        self.t = start
+        self.frame = 0
+
+    def advance(self, dt):
+        self.t += dt
+        self.frame += 1
+
+sim_clock = SimClock()
+sim_accumulator = 0.0
+
+# ---------------- RNG STREAMS ----------------
+# Gameplay and cosmetics draw from separate generators, so how often we render, particle
+# budgets or screen shake can never shift the simulation's random sequence.
+rng = random.Random(ARGS.seed)
+fx_rng = random.Random(None if ARGS.seed is None else ARGS.seed + 1)
+
+def seed_rngs(seed):
+    rng.seed(seed)
+    fx_rng.seed(seed + 1)
+    particles.rng = np.random.default_rng(seed)
+
+# ---------------- BULLET STORE ----------------
+BULLET_NORMAL, BULLET_MISSILE, BULLET_LASER = 0, 1, 2
+BULLET_CULL_MARGIN = 100   # bullets further than this outside the screen are dropped
+
+bullet_sprites = []        # sprite id -> Surface (bullets store the id, not the Surface)
+_bullet_sprite_ids = {}    # id(Surface) -> sprite id
+
+def bullet_sprite_id(img):
+    sid = _bullet_sprite_ids.get(id(img))
+    if sid is None:
+        sid = len(bullet_sprites)
+        bullet_sprites.append(img)
+        _bullet_sprite_ids[id(img)] = sid
+    return sid
+
+class BulletStore:
+    """
+    Struct-of-arrays bullet storage: one NumPy array per field, live bullets packed in [0, n).
+    Movement, off-screen culling and the enemy-bullet vs player test are whole-array operations.
+    Hits only clear the "alive" flag; compact() squeezes dead slots out once per frame (order preserved).
+    """
+    FIELDS = (("x", np.float64), ("y", np.float64), ("vx", np.float64), ("vy", np.float64),
+              ("damage", np.int32), ("is_enemy", np.bool_), ("sprite", np.int32),
+              ("pierce", np.int32), ("homing", np.bool_), ("target", np.int32),
+              ("kind", np.int8), ("alive", np.bool_), ("serial", np.int64))
+
+    def __init__(self, capacity=1024):
+        self.n = 0
+        self.capacity = capacity
+        self.next_serial = 0
+        self.hit_log = {}  # serial -> uids a piercing bullet already hit (so it hits each once)
+        for name, dtype in self.FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype))
+
+    def __len__(self):
+        return self.n
+
+    def _grow(self):
+        capacity = self.capacity * 2
+        for name, dtype in self.FIELDS:
+            arr = np.zeros(capacity, dtype)
+            arr[:self.n] = getattr(self, name)[:self.n]
+            setattr(self, name, arr)
+        self.capacity = capacity
+
+    def add(self, x, y, vx, vy, img, damage, is_enemy=False, kind=BULLET_NORMAL, pierce=0, homing=False):
+        if self.n == self.capacity:
+            self._grow()
+        i = self.n
+        self.x[i] = x
+        self.y[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.damage[i] = damage
+        self.is_enemy[i] = is_enemy
+        self.sprite[i] = bullet_sprite_id(img)
+        self.pierce[i] = pierce
+        self.homing[i] = homing
+        self.target[i] = -1
+        self.kind[i] = kind
+        self.alive[i] = True
+        self.serial[i] = self.next_serial
+        if pierce:
+            self.hit_log[self.next_serial] = set()
+        self.next_serial += 1
+        self.n = i + 1
+        return i
+
+    def clear(self):
+        self.n = 0
+        self.next_serial = 0
+        self.hit_log.clear()
+
+    def step(self, margin=BULLET_CULL_MARGIN):
+        """Advance every bullet by its velocity and flag the ones that left the play area."""
+        n = self.n
+        x, y = self.x[:n], self.y[:n]
+        x += self.vx[:n]
+        y += self.vy[:n]
+        self.alive[:n] &= (x >= -margin) & (x <= WIDTH + margin) & (y >= -margin) & (y <= HEIGHT + margin)
+
+    def in_box(self, cx, cy, half_w, half_h, enemy):
+        """Mask of live bullets of one owner whose centre lies strictly inside the box."""
+        n = self.n
+        return (self.alive[:n] & (self.is_enemy[:n] == enemy) &
+                (np.abs(self.x[:n] - cx) < half_w) & (np.abs(self.y[:n] - cy) < half_h))
+
+    def compact(self):
+        n = self.n
+        keep = np.flatnonzero(self.alive[:n])
+        k = len(keep)
+        if k == n:
+            return
+        for name, _ in self.FIELDS:
+            arr = getattr(self, name)
+            arr[:k] = arr[keep]
+        self.n = k
+        if self.hit_log:
+            live = set(self.serial[:k].tolist())
+            for serial in [s for s in self.hit_log if s not in live]:
+                del self.hit_log[serial]
+
+# ---------------- ENTITIES ----------------
+# Slotted records instead of dicts: attribute loads skip the hash lookup in
+# the hot update/draw loops and each instance drops its __dict__.
+class Player:
+    __slots__ = ("x", "y", "hp", "level", "exp", "last_shot", "transformed",
+                 "shield", "shield_max", "speed_level", "damage_level")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.x = 140.0
+        self.y = HEIGHT / 2
+        self.last_shot = 0.0
+        self.hp = 100
+        self.level = 1
+        self.exp = 0
+        self.transformed = False
+        self.shield = 0
+        self.shield_max = 30
+        self.speed_level = 1
+        self.damage_level = 1
+
+_enemy_uids = itertools.count()  # stable identity across pool sweeps/reuse (homing missiles lock onto it)
+
+class Enemy:
+    __slots__ = ("x", "y", "target_y", "speed", "hp", "w", "h",
+                 "last_shot", "fire_delay", "type", "dodge_timer", "uid")
+
+    def __init__(self, x: float, y: float, target_y: float, speed: float, hp: int,
+                 fire_delay: float, type: str, w: int = 64, h: int = 64,
+                 last_shot: float = 0.0, dodge_timer: float = 0.0):
+        self.x = x
+        self.y = y
+        self.target_y = target_y
+        self.speed = speed
+        self.hp = hp
+        self.w = w
+        self.h = h
+        self.last_shot = last_shot
+        self.fire_delay = fire_delay
+        self.type = type
+        self.dodge_timer = dodge_timer
+        self.uid = next(_enemy_uids)
+
+class Boss:
+    __slots__ = ("x", "y", "hp", "max_hp", "speed", "last_shot", "fire_delay", "type",
+                 "phase", "transformed", "dodge_timer", "minions", "laser_timer",
+                 "teleport_timer", "reflect")
+
+    def __init__(self, x: float, y: float, hp: int, speed: float, last_shot: float,
+                 fire_delay: float, type: str = "normal", phase: str = "normal"):
+        self.x = x
+        self.y = y
+        self.hp = hp
+        self.max_hp = hp
+        self.speed = speed
+        self.last_shot = last_shot
+        self.fire_delay = fire_delay
+        self.type = type
+        self.phase = phase
+        self.transformed = False
+        self.dodge_timer = 0.0
+        self.minions = 0
+        self.laser_timer = 0.0
+        self.teleport_timer = 0.0
+        self.reflect = False
+
+class PowerUp:
+    __slots__ = ("x", "y", "type", "vx", "vy", "t", "life")
+
+    def __init__(self, x: float, y: float, type: str, vx: float = 0.0, vy: float = 0.0,
+                 t: float = 0.0, life: float = 10.0):
+        self.x = x
+        self.y = y
+        self.type = type
+        self.vx = vx
+        self.vy = vy
+        self.t = t
+        self.life = life
+
+class Helper:
+    __slots__ = ("offset_x", "offset_y", "last_mimic", "mimic_delay", "x", "y",
+                 "chain_offset", "chain_index", "lerp_mult")
+
+    def __init__(self, idx: int, x: float, y: float):
+        self.offset_x = -60 - 35 * idx
+        self.offset_y = 0
+        self.last_mimic = 0.0
+        self.mimic_delay = 0.08 + 0.06 * idx
+        self.x = x
+        self.y = y
+        self.chain_offset = (-60 - 30 * idx, 0)
+        self.chain_index = idx
+        self.lerp_mult = 0.2
+
+class EntityPool:
+    """List of live records iterated in place. kill(i) only flags; sweep() swap-and-pops the
+    flagged slots once per frame and keeps the records so spawn() can re-initialise them."""
+    __slots__ = ("kind", "items", "killed", "free", "limit")
+
+    def __init__(self, kind, limit=None):
+        self.kind = kind          # Enemy, PowerUp, ... or dict
+        self.items = []
+        self.killed = set()
+        self.free = []
+        self.limit = limit        # spawn() drops new records once this many are live
+
+    def __len__(self): return len(self.items)
+    def __iter__(self): return iter(self.items)
+    def __getitem__(self, i): return self.items[i]
+
+    def spawn(self, **fields):
+        if self.limit is not None and len(self.items) >= self.limit:
+            return None
+        if self.free:
+            obj = self.free.pop()
+            if self.kind is dict:
+                obj.clear()
+                obj.update(fields)
+            else:
+                obj.__init__(**fields)
+        else:
+            obj = self.kind(**fields)
+        self.items.append(obj)
+        return obj
+
+    def kill(self, i):
+        self.killed.add(i)
+
+    def is_live(self, i):
+        return i not in self.killed
+
+    def sweep(self):
+        if not self.killed:
+            return
+        items = self.items
+        # highest index first, so the element popped off the end is never itself pending
+        for i in sorted(self.killed, reverse=True):
+            last = items.pop()
+            if i < len(items):
+                self.free.append(items[i])
+                items[i] = last
+            else:
+                self.free.append(last)
+        self.killed.clear()
+
+    def clear(self):
+        self.free.extend(self.items)
+        self.items.clear()
+        self.killed.clear()
 
 # ---------------- GAME STATE ----------------
 scene = "title"
 selected_hero = 0
 # Player now has shield, speed_level and damage_level for upgraded power-ups
-player = {"x":140.0, "y":HEIGHT/2, "hp":100, "level":1, "exp":0, "last_shot":0.0, "transformed":False,
-          "shield": 0, "shield_max": 30, "speed_level": 1, "damage_level": 1}
-bullets, enemies, effects, float_pops, powerups = [], [], [], [], []
+player = Player()
+bullets = BulletStore()
+enemies, powerups = EntityPool(Enemy), EntityPool(PowerUp)
+effects, float_pops = EntityPool(dict, limit=MAX_EFFECTS), EntityPool(dict)
 boss = None
 score = 0
+game_steps = 0  # sim steps since reset_game(); per-game schedules key off this, not sim_clock.frame
 scroll_x, scroll_speed = 0.0, 3.0
-enemy_spawn_timer = time.time()
+enemy_spawn_timer = sim_clock.t
 shake_timer = 0.0
 shake_offset = (0,0)
 
 # ---------------- HELPERS ----------------
 def clamp(v, lo, hi): return max(lo, min(hi, v))
-def now(): return time.time()
+def now(): return sim_clock.t
 def add_float_pop(x, y, txt, color=(255,255,150)):
-    float_pops.append({"x":x, "y":y, "txt":txt, "t":now(), "dur":0.6, "color":color})
+    # rendered once here; draw only blits the stored surface
+    float_pops.spawn(x=x, y=y, txt=txt, t=now(), dur=0.6, color=color,
+                     surf=render_text(font, txt, color))
 
 # ---------------- LEVEL SYSTEM ----------------
 def gain_exp(amount):
     global helper_count, helper_spawn_timer
-    player["exp"] += amount
-    while player["exp"] >= player["level"] * 100 and player["level"] < MAX_LEVEL:
-        player["level"] += 1
-        player["exp"] -= (player["level"]-1) * 100
-        add_float_pop(player["x"], player["y"]-40, f"LEVEL {player['level']}!", (100,255,100))
-        if levelup_sound: levelup_sound.play()
-        if player["level"] == TRANSFORM_LEVEL and not player["transformed"]:
-            player["transformed"] = True
-            effects.append({"type":"transform", "x":player["x"], "y":player["y"], "t":now(), "dur":1.0})
-            create_particles(player["x"], player["y"], count=30, color=(100,200,255), speed=9, life=1.0, spread=360)
-            if transform_sound: transform_sound.play()
+    player.exp += amount
+    while player.exp >= player.level * 100 and player.level < MAX_LEVEL:
+        player.level += 1
+        player.exp -= (player.level-1) * 100
+        add_float_pop(player.x, player.y-40, f"LEVEL {player.level}!", (100,255,100))
+        sfx.play("levelup", player.x)
+        if player.level == TRANSFORM_LEVEL and not player.transformed:
+            player.transformed = True
+            effects.spawn(type="transform", x=player.x, y=player.y, t=now(), dur=1.0)
+            create_particles(player.x, player.y, count=30, color=(100,200,255), speed=9, life=1.0, spread=360)
+            sfx.play("transform", player.x)
 
         # Grant a DINO helper every 10 levels (10, 20, 30, ...) up to MAX_HELPERS
-        if player["level"] % 10 == 0 and helper_count < MAX_HELPERS:
+        if player.level % 10 == 0 and helper_count < MAX_HELPERS:
             helper_count += 1
             idx = len(helpers)
-            helpers.append({
-                "offset_x": -60 - 35 * idx,
-                "offset_y": 0,
-                "last_mimic": 0.0,
-                "mimic_delay": 0.08 + 0.06 * idx,
-                "x": player["x"],
-                "y": player["y"],
-                "chain_offset": (-60 - 30 * idx, 0)
-            })
+            helpers.append(Helper(idx, player.x, player.y))
             helper_spawn_timer = now()
-            add_float_pop(player["x"], player["y"] - 20, f"DINO HELPER #{helper_count} ACQUIRED!", (100,255,100))
-            if powerup_sound: powerup_sound.play()
+            add_float_pop(player.x, player.y - 20, f"DINO HELPER #{helper_count} ACQUIRED!", (100,255,100))
+            sfx.play("powerup", player.x)
 
 # ---------------- BOMB SKILL ----------------
 def activate_bomb():
@@ -464,17 +1503,17 @@ def activate_bomb():
     bomb_flash = 0.3
     bomb_anim_timer = now()
     bomb_anim_index = 0
-    cleared = 0
-    for b in bullets[:]:
-        if b.get("is_enemy"):
-            bullets.remove(b)
-            create_particles(b["x"], b["y"], 8, (255,200,50), 10, 0.6)
-            cleared += 1
+    n = bullets.n
+    wiped = np.flatnonzero(bullets.alive[:n] & bullets.is_enemy[:n])
+    for i in wiped.tolist():
+        create_particles(float(bullets.x[i]), float(bullets.y[i]), 8, (255,200,50), 10, 0.6)
+    bullets.alive[wiped] = False
+    bullets.compact()
+    cleared = len(wiped)
     if cleared:
         add_float_pop(WIDTH//2, HEIGHT//2, f"CLEARED {cleared} BULLETS!", (255,215,0))
-    for _ in range(120):
-        create_particles(player["x"], player["y"], 1, (255,100,0), 22, 2.0, 12, 0.5, 360)
-    if bomb_sound: bomb_sound.play()
+    create_particles(player.x, player.y, 120, (255,100,0), 22, 2.0, 12, 0.5, 360)
+    sfx.play("bomb", player.x)
     shake_timer = now() + 0.4
 
 # ---------------- SUB WEAPON ----------------
@@ -483,133 +1522,160 @@ def player_sub_shoot():
     if sub_cooldown > 0: return
     sub_cooldown = SUB_COOLDOWN_TIME
     if sub_weapon == "missile":
-        bullets.append({
-            "x": player["x"]+36, "y": player["y"], "vx": 30, "vy": 0,
-            "img": sub_imgs["missile"], "glow": True, "damage": 15,
-            "type": "missile", "homing": True, "target": None
-        })
-        create_particles(player["x"]+40, player["y"], 8, (255,150,50), 10, 0.4)
+        bullets.add(
+            x=player.x+36, y=player.y, vx=30, vy=0,
+            img=sub_imgs["missile"], damage=15, kind=BULLET_MISSILE, homing=True
+        )
+        create_particles(player.x+40, player.y, 8, (255,150,50), 10, 0.4)
     elif sub_weapon == "laser":
-        bullets.append({
-            "x": player["x"]+40, "y": player["y"], "vx": 90, "vy": 0,
-            "img": sub_imgs["laser"], "glow": True, "damage": 8,
-            "type": "laser", "pierce": 99
-        })
-        effects.append({"type":"laser_beam", "x":player["x"]+40, "y":player["y"], "t":now(), "dur":0.3})
+        bullets.add(
+            x=player.x+40, y=player.y, vx=90, vy=0,
+            img=sub_imgs["laser"], damage=8, kind=BULLET_LASER, pierce=99
+        )
+        effects.spawn(type="laser_beam", x=player.x+40, y=player.y, t=now(), dur=0.3)
     elif sub_weapon == "lightning":
-        targets = enemies[:]
-        if boss: targets.append(boss)
-        if targets:
-            start = {"x": player["x"]+40, "y": player["y"]}
-            chain_all_lightning(start, targets, 20)
-
-def chain_all_lightning(start, targets, damage):
-    if not targets: return
-    current = start
-    for target in targets:
-        effects.append({
-            "type":"lightning", "x1":current["x"], "y1":current["y"],
-            "x2":target["x"], "y2":target["y"], "t":now(), "dur":0.15
-        })
-        create_particles(target["x"], target["y"], 15, (200,200,255), 12, 0.6)
-        target["hp"] -= damage
-        current = target
-    if shoot_sound: shoot_sound.play()
+        chain_lightning((player.x+40, player.y), 20)
+
+LIGHTNING_MAX_HOP = 260     # px from the caster to the first target and between targets
+LIGHTNING_MAX_CHAIN = 6     # targets per cast
+LIGHTNING_FALLOFF = 0.75    # damage multiplier per hop
+LIGHTNING_CELL_SIZE = 128
+
+def chain_lightning(start, damage):
+    """
+    Greedy nearest-neighbour chain: jump to the closest unhit target within LIGHTNING_MAX_HOP,
+    up to LIGHTNING_MAX_CHAIN targets, losing LIGHTNING_FALLOFF of the damage per hop.
+    Enemies it kills die through kill_enemy() like any other kill.
+    """
+    xs, ys, slots = [], [], []   # slot: enemy index, or -1 for the boss
+    for i, e in enumerate(enemies.items):
+        if enemies.is_live(i):
+            xs.append(e.x); ys.append(e.y); slots.append(i)
+    if boss:
+        xs.append(boss.x); ys.append(boss.y); slots.append(-1)
+    if not slots:
+        return
+    grid = lightning_grid
+    grid.clear()
+    for k in range(len(slots)):
+        grid.insert(k, xs[k], ys[k])
+    cx, cy = start
+    dmg = float(damage)
+    for _ in range(LIGHTNING_MAX_CHAIN):
+        k = grid.nearest(cx, cy, xs, ys, LIGHTNING_MAX_HOP)
+        if k is None:
+            break
+        grid.remove(k, xs[k], ys[k])
+        tx, ty = xs[k], ys[k]
+        effects.spawn(type="lightning", x1=cx, y1=cy, x2=tx, y2=ty, t=now(), dur=0.15)
+        create_particles(tx, ty, 8, (200,200,255), 12, 0.6)
+        hit = max(1, int(round(dmg)))
+        i = slots[k]
+        if i < 0:
+            boss.hp -= hit   # boss death is handled in update_entities
+        else:
+            e = enemies[i]
+            e.hp -= hit
+            if e.hp <= 0:
+                kill_enemy(i)
+        cx, cy = tx, ty
+        dmg *= LIGHTNING_FALLOFF
+    if (cx, cy) != tuple(start):
+        sfx.play("shoot", cx)
 
 # ---------------- SPAWN ----------------
 def spawn_enemy():
-    y = random.randint(80, HEIGHT-80)
-    speed = random.uniform(ENEMY_MIN_SPEED, ENEMY_MAX_SPEED)
+    if len(enemies) >= governor.enemy_cap():
+        return
+    y = rng.randint(80, HEIGHT-80)
+    speed = rng.uniform(ENEMY_MIN_SPEED, ENEMY_MAX_SPEED)
     # firing multiplier scales down with level so fire_delay shortens (enemies fire faster at higher levels)
-    level = clamp(player.get("level", 1), 1, MAX_LEVEL)
+    level = clamp(player.level, 1, MAX_LEVEL)
     fire_mult = max(ENEMY_FIRE_MIN_MULT, 1.0 - (level - 1) * ENEMY_RATE_SCALE_PER_LEVEL)
-    enemies.append({
-        "x": WIDTH + 50, "y": y, "target_y": y, "speed": speed,
-        "hp": 2 + random.randint(0, 3), "w": 64, "h": 64,
-        "last_shot": 0.0, "fire_delay": random.uniform(1.8, 3.0) * fire_mult,
-        "type": random.choice(["normal", "shooter", "dodger"]),
-        "dodge_timer": 0.0
-    })
+    enemies.spawn(
+        x=WIDTH + 50, y=y, target_y=y, speed=speed,
+        hp=2 + rng.randint(0, 3),
+        fire_delay=rng.uniform(1.8, 3.0) * fire_mult,
+        type=rng.choice(["normal", "shooter", "dodger"])
+    )
+
+def kill_enemy(i):
+    """The one death path: flag for sweep, score, exp, explosion."""
+    global score
+    e = enemies[i]
+    enemies.kill(i)
+    score += 100
+    gain_exp(10)
+    create_particles(e.x, e.y, 12, (255, 200, 50), 10, 0.6)
+    sfx.play("explode", e.x)
 
 def spawn_boss():
     global boss
-    boss = {
-        "x": WIDTH + 150, "y": HEIGHT//2, "hp": 50, "max_hp": 50,
-        "speed": 2.5, "last_shot": now(), "fire_delay": 1.0,
-        "type": "normal"
-    }
+    boss = Boss(x=WIDTH + 150, y=HEIGHT//2, hp=50,
+                speed=2.5, last_shot=now(), fire_delay=1.0, type="normal")
     add_float_pop(WIDTH//2, 100, "BOSS INCOMING!", (255,0,0))
-    if boss_sound: boss_sound.play()
+    sfx.play("boss")
 
 def spawn_boss2():
     global boss
-    boss = {
-        "x": WIDTH + 150, "y": HEIGHT//2, "hp": 80, "max_hp": 80,
-        "speed": 3.0, "last_shot": now(), "fire_delay": 0.6,
-        "phase": "normal", "transformed": False, "dodge_timer": 0.0, "type": "smart"
-    }
+    boss = Boss(x=WIDTH + 150, y=HEIGHT//2, hp=80,
+                speed=3.0, last_shot=now(), fire_delay=0.6,
+                phase="normal", type="smart")
     add_float_pop(WIDTH//2, 100, "SMART BOSS!", (255,0,255))
-    if boss_sound: boss_sound.play()
+    sfx.play("boss")
 
 def spawn_boss3():
     global boss
-    boss = {
-        "x": WIDTH + 200, "y": HEIGHT//2, "hp": 200, "max_hp": 200,
-        "speed": 1.8, "last_shot": now(), "fire_delay": 0.5,
-        "phase": "summon", "transformed": False, "dodge_timer": 0.0,
-        "type": "apocalypse", "minions": 0, "laser_timer": 0.0
-    }
+    boss = Boss(x=WIDTH + 200, y=HEIGHT//2, hp=200,
+                speed=1.8, last_shot=now(), fire_delay=0.5,
+                phase="summon", type="apocalypse")
     add_float_pop(WIDTH//2, 80, "APOCALYPSE BOSS!", (255,100,255))
     add_float_pop(WIDTH//2, 110, "15000 PTS", (255,255,0))
-    if boss_sound: boss_sound.play()
+    sfx.play("boss")
 
 def spawn_boss4():
     global boss
-    boss = {
-        "x": WIDTH + 200, "y": HEIGHT//2, "hp": 400, "max_hp": 400,
-        "speed": 2.0, "last_shot": now(), "fire_delay": 0.4,
-        "phase": "enter", "transformed": False, "dodge_timer": 0.0,
-        "type": "nexus", "minions": 0, "teleport_timer": 0.0, "reflect": False
-    }
+    boss = Boss(x=WIDTH + 200, y=HEIGHT//2, hp=400,
+                speed=2.0, last_shot=now(), fire_delay=0.4,
+                phase="enter", type="nexus")
     add_float_pop(WIDTH//2, 70, "NEXUS BOSS!", (255,50,255))
     add_float_pop(WIDTH//2, 100, "30,000 PTS", (255,215,0))
     add_float_pop(WIDTH//2, 130, "REFLECTS BULLETS!", (255,100,100))
-    if boss_sound: boss_sound.play()
+    sfx.play("boss")
 
 # ---------------- SHOOT ----------------
 def player_shoot():
     global transform_anim_timer, transform_anim_index, transform_sheet_cooldown
     nowt = now()
-    delay = 0.12 / (1 + player["level"] * 0.02)
-    if nowt - player["last_shot"] < delay: return
-    player["last_shot"] = nowt
+    delay = 0.12 / (1 + player.level * 0.02)
+    if nowt - player.last_shot < delay: return
+    player.last_shot = nowt
     row = selected_hero
     mu = muzzle_imgs[row]
-    effects.append({"type":"muzzle", "x":player["x"]+40, "y":player["y"], "img":mu, "t":nowt, "dur":0.1, "glow":True})
-    if shoot_sound: shoot_sound.play()
+    effects.spawn(type="muzzle", x=player.x+40, y=player.y, img=mu, t=nowt, dur=0.1, glow=True)
+    sfx.play("shoot", player.x)
 
     # If transformed: fire a bullet-sheet (fan/spread) but only if sheet cooldown allows
-    if player.get("transformed", False):
+    if player.transformed:
         if transform_sheet_cooldown > 0:
             # sheet still on cooldown: fallback to a single-shot to avoid wasted input
             shots = 1
-            base_damage_from_level = 1 + (player["level"]//10)
-            damage_level = player.get("damage_level", 1)
+            base_damage_from_level = 1 + (player.level//10)
+            damage_level = player.damage_level
             for i in range(shots):
                 angle = 0
                 vx = BULLET_SPEED * cos(angle)
                 vy = BULLET_SPEED * sin(angle)
-                bullets.append({
-                    "x": player["x"]+36, "y": player["y"], "vx": vx, "vy": vy,
-                    "img": bullet_imgs[row], "glow": True,
-                    "damage": base_damage_from_level + max(0, damage_level - 1)
-                })
+                bullets.add(
+                    x=player.x+36, y=player.y, vx=vx, vy=vy,
+                    img=bullet_imgs[row], damage=base_damage_from_level + max(0, damage_level - 1)
+                )
             return
         # allowed to fire sheet
         count = max(1, TRANSFORM_BULLET_SHEET_COUNT)
         spread = float(TRANSFORM_BULLET_SPREAD_DEG)
-        base_damage_from_level = 1 + (player["level"]//10)
-        damage_level = player.get("damage_level", 1)
+        base_damage_from_level = 1 + (player.level//10)
+        damage_level = player.damage_level
         base_damage = base_damage_from_level + max(0, damage_level - 1)
         base_damage = int(base_damage * TRANSFORM_BULLET_DAMAGE_MULT)
 
@@ -626,61 +1692,59 @@ def player_shoot():
                 img_choice = transform_bullet_imgs[i % len(transform_bullet_imgs)]
             else:
                 img_choice = bullet_imgs[row]
-            bullets.append({
-                "x": player["x"]+36, "y": player["y"], "vx": vx, "vy": vy,
-                "img": img_choice, "glow": True,
-                "damage": base_damage
-            })
+            bullets.add(
+                x=player.x+36, y=player.y, vx=vx, vy=vy,
+                img=img_choice, damage=base_damage
+            )
         # set sheet cooldown to prevent immediate re-fire
         transform_sheet_cooldown = TRANSFORM_SHEET_COOLDOWN
     else:
-        shots = 1 + (player["level"] >= 10)
-        base_damage_from_level = 1 + (player["level"]//10)
+        shots = 1 + (player.level >= 10)
+        base_damage_from_level = 1 + (player.level//10)
         # incorporate damage_level (max 10)
-        damage_level = player.get("damage_level", 1)
+        damage_level = player.damage_level
         for i in range(shots):
             angle = radians(-10 + 20*i) if shots > 1 else 0
             vx = BULLET_SPEED * cos(angle)
             vy = BULLET_SPEED * sin(angle)
-            bullets.append({
-                "x": player["x"]+36, "y": player["y"], "vx": vx, "vy": vy,
-                "img": bullet_imgs[row], "glow": True,
-                "damage": base_damage_from_level + max(0, damage_level - 1)
-            })
+            bullets.add(
+                x=player.x+36, y=player.y, vx=vx, vy=vy,
+                img=bullet_imgs[row], damage=base_damage_from_level + max(0, damage_level - 1)
+            )
 
 def enemy_shoot(e):
     nowt = now()
-    if nowt - e["last_shot"] < e["fire_delay"]: return
-    dx = player["x"] - e["x"]
-    dy = player["y"] - e["y"]
+    if nowt - e.last_shot < e.fire_delay: return
+    dx = player.x - e.x
+    dy = player.y - e.y
     dist = max(1, hypot(dx, dy))
     base_vx = (dx/dist) * ENEMY_BULLET_SPEED
     base_vy = (dy/dist) * ENEMY_BULLET_SPEED
-    if e["type"] == "shooter":
+    if e.type == "shooter":
         for angle in [-15, 0, 15]:
             rad = math.atan2(base_vy, base_vx) + radians(angle)
             vx = math.cos(rad) * ENEMY_BULLET_SPEED
             vy = math.sin(rad) * ENEMY_BULLET_SPEED
-            bullets.append({
-                "x": e["x"]-20, "y": e["y"], "vx": vx, "vy": vy,
-                "img": bullet_imgs[2], "glow": True, "is_enemy": True, "damage": 5  
-            })
-    elif e["type"] == "dodger":
-        bullets.append({
-            "x": e["x"]-20, "y": e["y"], "vx": base_vx, "vy": base_vy,
-            "img": bullet_imgs[3], "glow": True, "is_enemy": True, "damage": 10
-        })
-        e["dodge_timer"] = now() + 0.3
+            bullets.add(
+                x=e.x-20, y=e.y, vx=vx, vy=vy,
+                img=bullet_imgs[2], damage=5, is_enemy=True
+            )
+    elif e.type == "dodger":
+        bullets.add(
+            x=e.x-20, y=e.y, vx=base_vx, vy=base_vy,
+            img=bullet_imgs[3], damage=10, is_enemy=True
+        )
+        e.dodge_timer = now() + 0.3
     else:
-        bullets.append({
-            "x": e["x"]-20, "y": e["y"], "vx": base_vx, "vy": base_vy,
-            "img": bullet_imgs[3], "glow": True, "is_enemy": True, "damage": 10
-        })
-    e["last_shot"] = nowt
+        bullets.add(
+            x=e.x-20, y=e.y, vx=base_vx, vy=base_vy,
+            img=bullet_imgs[3], damage=10, is_enemy=True
+        )
+    e.last_shot = nowt
     # after shooting, reset fire_delay scaled by player's level (so subsequent shots come faster at higher levels)
-    level = clamp(player.get("level", 1), 1, MAX_LEVEL)
+    level = clamp(player.level, 1, MAX_LEVEL)
     fire_mult = max(ENEMY_FIRE_MIN_MULT, 1.0 - (level - 1) * ENEMY_RATE_SCALE_PER_LEVEL)
-    e["fire_delay"] = random.uniform(1.5, 3.0) * fire_mult
+    e.fire_delay = rng.uniform(1.5, 3.0) * fire_mult
 
 # ---------------- POWER-UPS ----------------
 # Updated: Speed and Damage levels capped at 10.
@@ -688,17 +1752,225 @@ def enemy_shoot(e):
 # Runes move randomly across the screen and expire after 10s if not collected.
 powerup_colors = {"hp": (0,255,0), "speed": (255,255,0), "damage": (255,100,255), "rune": (200,180,255)}
 powerup_imgs = {}
-for typ, col in powerup_colors.items():
-    surf = pygame.Surface((40,40), pygame.SRCALPHA)
-    pygame.draw.circle(surf, col, (20,20), 18)
-    pygame.draw.circle(surf, (255,255,255), (20,20), 18, 3)
-    font_small = pygame.font.SysFont("arial", 16, bold=True)
-    if typ == "rune":
-        txt = font_small.render("R", True, (0,0,0))
-    else:
-        txt = font_small.render(typ.upper()[0], True, (0,0,0))
-    surf.blit(txt, (20 - txt.get_width()//2, 20 - txt.get_height()//2))
-    powerup_imgs[typ] = surf
+
+def load_powerup_icons():
+    # font rendering stays on the main thread
+    for typ, col in powerup_colors.items():
+        surf = pygame.Surface((40,40), pygame.SRCALPHA)
+        pygame.draw.circle(surf, col, (20,20), 18)
+        pygame.draw.circle(surf, (255,255,255), (20,20), 18, 3)
+        font_small = pygame.font.SysFont("arial", 16, bold=True)
+        if typ == "rune":
+            txt = font_small.render("R", True, (0,0,0))
+        else:
+            txt = font_small.render(typ.upper()[0], True, (0,0,0))
+        surf.blit(txt, (20 - txt.get_width()//2, 20 - txt.get_height()//2))
+        powerup_imgs[typ] = surf
+
+# ---------------- COLLISION BROADPHASE ----------------
+COLLISION_CELL_SIZE = 96  # twice the enemy hit half-extent
+CELL_KEY_STRIDE = 4096    # cell (cx, cy) is stored under (cx + bias) * CELL_KEY_STRIDE + (cy + bias)
+CELL_KEY_BIAS = 1024      # keeps packed keys non-negative so they decode with divmod
+
+class SpatialHash:
+    """
+    Uniform grid keyed by packed cell coordinates, cleared and refilled once per frame.
+    Items are inserted into every cell their hit box overlaps, so a point query reads one cell.
+    Items are list indices; queries return them sorted so hits resolve in list order.
+    """
+    def __init__(self, cell_size=COLLISION_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    def insert(self, item, x, y, half_w=0, half_h=0):
+        cs = self.cell_size
+        cells = self.cells
+        if not half_w and not half_h:
+            key = (int(x // cs) + CELL_KEY_BIAS) * CELL_KEY_STRIDE + int(y // cs) + CELL_KEY_BIAS
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [item]
+            else:
+                bucket.append(item)
+            return
+        x0, x1 = int((x - half_w) // cs), int((x + half_w) // cs)
+        y0, y1 = int((y - half_h) // cs), int((y + half_h) // cs)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                key = (cx + CELL_KEY_BIAS) * CELL_KEY_STRIDE + cy + CELL_KEY_BIAS
+                bucket = cells.get(key)
+                if bucket is None:
+                    cells[key] = [item]
+                else:
+                    bucket.append(item)
+
+    def query_point(self, x, y):
+        cs = self.cell_size
+        return self.cells.get((int(x // cs) + CELL_KEY_BIAS) * CELL_KEY_STRIDE + int(y // cs) + CELL_KEY_BIAS, ())
+
+    def occupied(self, xs, ys):
+        """
+        Vectorized: mask of points (NumPy arrays) that fall in a non-empty cell.
+        Points are expected inside the bullet play area (screen +/- BULLET_CULL_MARGIN).
+        """
+        if not self.cells:
+            return np.zeros(len(xs), np.bool_)
+        cs = self.cell_size
+        pad = BULLET_CULL_MARGIN // cs + 1
+        cols = (WIDTH + BULLET_CULL_MARGIN) // cs + pad + 1
+        rows = (HEIGHT + BULLET_CULL_MARGIN) // cs + pad + 1
+        occ = np.zeros((cols, rows), np.bool_)
+        for key in self.cells:
+            kx, ky = divmod(key, CELL_KEY_STRIDE)
+            cx, cy = kx - CELL_KEY_BIAS + pad, ky - CELL_KEY_BIAS + pad
+            if 0 <= cx < cols and 0 <= cy < rows:
+                occ[cx, cy] = True
+        cx = np.clip(np.floor_divide(xs, cs).astype(np.intp) + pad, 0, cols - 1)
+        cy = np.clip(np.floor_divide(ys, cs).astype(np.intp) + pad, 0, rows - 1)
+        return occ[cx, cy]
+
+    def nearest(self, x, y, xs, ys, max_dist):
+        """
+        Point-inserted item closest to (x, y) within max_dist, or None; xs/ys give item positions.
+        Searches rings of cells outward and stops once a ring cannot beat the best hit; when the
+        grid holds fewer cells than that search would visit, walks the occupied cells instead,
+        skipping any whose box is already further than the best hit. Ties go to the lower index.
+        """
+        cs = self.cell_size
+        cells = self.cells
+        cx0, cy0 = int(x // cs), int(y // cs)
+        best, best_d2 = None, max_dist * max_dist
+        rings = int(max_dist // cs) + 2
+        if len(cells) < (2 * rings - 1) ** 2:
+            for key, bucket in cells.items():
+                kx, ky = divmod(key, CELL_KEY_STRIDE)
+                left, top = (kx - CELL_KEY_BIAS) * cs, (ky - CELL_KEY_BIAS) * cs
+                dx = max(left - x, 0, x - left - cs)
+                dy = max(top - y, 0, y - top - cs)
+                if dx * dx + dy * dy > best_d2:
+                    continue
+                for i in bucket:
+                    d2 = (xs[i] - x) ** 2 + (ys[i] - y) ** 2
+                    if d2 < best_d2 or (d2 == best_d2 and best is not None and i < best):
+                        best, best_d2 = i, d2
+            return best
+        for r in range(rings):
+            reach = (r - 1) * cs  # nothing in ring r is closer than this
+            if reach > 0 and reach * reach > best_d2:
+                break
+            for cx in range(cx0 - r, cx0 + r + 1):
+                edge = cx == cx0 - r or cx == cx0 + r
+                for cy in (range(cy0 - r, cy0 + r + 1) if edge else (cy0 - r, cy0 + r)):
+                    for i in cells.get((cx + CELL_KEY_BIAS) * CELL_KEY_STRIDE + cy + CELL_KEY_BIAS, ()):
+                        d2 = (xs[i] - x) ** 2 + (ys[i] - y) ** 2
+                        if d2 < best_d2 or (d2 == best_d2 and best is not None and i < best):
+                            best, best_d2 = i, d2
+        return best
+
+    def remove(self, item, x, y):
+        """Drop a point-inserted item."""
+        cs = self.cell_size
+        bucket = self.cells.get((int(x // cs) + CELL_KEY_BIAS) * CELL_KEY_STRIDE + int(y // cs) + CELL_KEY_BIAS)
+        if bucket and item in bucket:
+            bucket.remove(item)
+
+    def query_box(self, x, y, half_w, half_h):
+        cs = self.cell_size
+        found = set()
+        for cx in range(int((x - half_w) // cs), int((x + half_w) // cs) + 1):
+            for cy in range(int((y - half_h) // cs), int((y + half_h) // cs) + 1):
+                bucket = self.cells.get((cx + CELL_KEY_BIAS) * CELL_KEY_STRIDE + cy + CELL_KEY_BIAS)
+                if bucket:
+                    found.update(bucket)
+        return sorted(found)
+
+target_grid = SpatialHash()        # enemies (index) + boss (-1)
+pickup_grid = SpatialHash()        # powerups (index into powerups)
+# candidate pairs that reached a narrow-phase test: last frame and running total
+collision_stats = {"pairs": 0, "total_pairs": 0}
+# player bullets faster than this per frame are tested along their path, not at their end point;
+# at half an enemy hit box nothing slower can skip over one
+SWEEP_MIN_SPEED = 48
+
+def segment_box_entry(x0, y0, dx, dy, cx, cy, half_w, half_h):
+    """Slab test: fraction along (x0, y0) + t*(dx, dy), t in [0, 1], where the segment enters the
+    open box around (cx, cy); None if it misses. A start inside the box enters at 0."""
+    t0, t1 = 0.0, 1.0
+    for p, d, c, h in ((x0, dx, cx, half_w), (y0, dy, cy, half_h)):
+        if d == 0.0:
+            if abs(p - c) >= h:
+                return None
+            continue
+        a, b = (c - h - p) / d, (c + h - p) / d
+        if a > b:
+            a, b = b, a
+        if a > t0: t0 = a
+        if b < t1: t1 = b
+        if t0 >= t1:
+            return None
+    return t0
+
+# ---------------- HOMING ----------------
+HOMING_RANGE = 600                 # missiles only lock onto targets this close
+HOMING_TURN_RATE = radians(6)      # max heading change per frame
+HOMING_CELL_SIZE = 128
+HOMING_REACQUIRE_FRAMES = 4        # unlocked bullets look for a target every Nth frame (staggered)
+BOSS_UID = -2                      # bullets.target: enemy uid, BOSS_UID, or -1 for no lock
+homing_grid = SpatialHash(HOMING_CELL_SIZE)  # homing targets as points, rebuilt per frame
+lightning_grid = SpatialHash(LIGHTNING_CELL_SIZE)  # chain_lightning candidates, rebuilt per cast
+
+def steer_homing():
+    """
+    Turn every homing bullet toward its locked target, at most HOMING_TURN_RATE per frame.
+    A bullet whose target died reacquires the nearest target from homing_grid at once; one
+    with no lock retries every HOMING_REACQUIRE_FRAMES frames. Only those bullets touch the
+    grid; the steering itself is vectorized.
+    """
+    n = bullets.n
+    idx = np.flatnonzero(bullets.homing[:n] & bullets.alive[:n])
+    if not len(idx):
+        return
+    tx, ty, uids = [], [], []
+    for i, e in enumerate(enemies.items):
+        if enemies.is_live(i) and e.hp > 0:
+            tx.append(e.x); ty.append(e.y); uids.append(e.uid)
+    if boss:
+        tx.append(boss.x); ty.append(boss.y); uids.append(BOSS_UID)
+    if not uids:
+        bullets.target[idx] = -1
+        return
+    slot = {uid: k for k, uid in enumerate(uids)}
+    homing_grid.clear()
+    for k in range(len(uids)):
+        homing_grid.insert(k, tx[k], ty[k])
+
+    target = bullets.target
+    aim = np.full(len(idx), -1, np.intp)
+    # staggered by serial: slots move in compact(), the serial stays with the bullet
+    phase = game_steps % HOMING_REACQUIRE_FRAMES
+    serial = bullets.serial
+    for j, bi in enumerate(idx.tolist()):
+        k = slot.get(int(target[bi]))
+        if k is None and (target[bi] != -1 or serial[bi] % HOMING_REACQUIRE_FRAMES == phase):
+            k = homing_grid.nearest(float(bullets.x[bi]), float(bullets.y[bi]), tx, ty, HOMING_RANGE)
+            target[bi] = uids[k] if k is not None else -1
+        if k is not None:
+            aim[j] = k
+    locked = aim >= 0
+    if not locked.any():
+        return
+    idx, aim = idx[locked], aim[locked]
+    vx, vy = bullets.vx[idx], bullets.vy[idx]
+    heading = np.arctan2(vy, vx)
+    want = np.arctan2(np.asarray(ty)[aim] - bullets.y[idx], np.asarray(tx)[aim] - bullets.x[idx])
+    turn = np.clip((want - heading + np.pi) % (2 * np.pi) - np.pi, -HOMING_TURN_RATE, HOMING_TURN_RATE)
+    speed = np.hypot(vx, vy)
+    heading += turn
+    bullets.vx[idx] = speed * np.cos(heading)
+    bullets.vy[idx] = speed * np.sin(heading)
 
 # ---------------- UPDATE ENTITIES ----------------
 def update_entities(dt):
@@ -737,72 +2009,62 @@ def update_entities(dt):
 
     # ENEMY SPAWNING (scaled by player level)
     # spawn interval reduces as player level increases (higher spawn rate at higher levels)
-    level = clamp(player.get("level", 1), 1, MAX_LEVEL)
+    level = clamp(player.level, 1, MAX_LEVEL)
     level_multiplier = max(0.3, 1.0 - (level - 1) * ENEMY_RATE_SCALE_PER_LEVEL)
     spawn_interval = max(ENEMY_SPAWN_MIN_INTERVAL, ENEMY_SPAWN_BASE_INTERVAL * level_multiplier)
 
-    if time.time() - enemy_spawn_timer > spawn_interval:
-        enemy_spawn_timer = time.time()
+    if now() - enemy_spawn_timer > spawn_interval:
+        enemy_spawn_timer = now()
         spawn_enemy()
 
     # POWER-UP CHANCE (including occasional rune spawn)
-    if random.random() < 0.003 and len(powerups) < 3:
-        powerups.append({
-            "x": WIDTH + 50,
-            "y": random.randint(60, HEIGHT - 60),
-            "type": random.choice(["hp", "speed", "damage"])
-        })
+    if rng.random() < 0.003 and len(powerups) < 3:
+        powerups.spawn(
+            x=WIDTH + 50,
+            y=rng.randint(60, HEIGHT - 60),
+            type=rng.choice(["hp", "speed", "damage"])
+        )
     # spawn runes more rarely
-    if random.random() < 0.001 and len(powerups) < 4:
+    if rng.random() < 0.001 and len(powerups) < 4:
         # rune moves randomly and lives for 10s
-        powerups.append({
-            "x": random.randint(80, WIDTH-80),
-            "y": random.randint(80, HEIGHT-80),
-            "vx": random.uniform(-120,120)/60.0,
-            "vy": random.uniform(-120,120)/60.0,
-            "t": now(),
-            "type": "rune",
-            "life": 10.0
-        })
+        powerups.spawn(
+            x=rng.randint(80, WIDTH-80),
+            y=rng.randint(80, HEIGHT-80),
+            vx=rng.uniform(-120,120)/60.0,
+            vy=rng.uniform(-120,120)/60.0,
+            t=now(),
+            type="rune",
+            life=10.0
+        )
 
     # DINO HELPER AUTO-SPAWN
     if helper_count > len(helpers) and now() - helper_spawn_timer > 8.0:
         helper_spawn_timer = now()
-        helpers.append({
-            "offset_x": -60 - 35 * len(helpers),
-            "offset_y": 0,
-            "last_mimic": 0.0,
-            "mimic_delay": 0.08 + 0.06 * len(helpers),
-            "x": player["x"],
-            "y": player["y"],
-            "chain_offset": (-60 - 30 * len(helpers), 0)
-        })
+        helpers.append(Helper(len(helpers), player.x, player.y))
         add_float_pop(WIDTH // 2, HEIGHT // 2,
                       f"DINO HELPER #{len(helpers)}", (100, 255, 100))
 
     # BOSS MOVEMENT & ATTACK
     if boss:
-        if boss["x"] > WIDTH - 300:
-            boss["x"] -= boss["speed"]
+        if boss.x > WIDTH - 300:
+            boss.x -= boss.speed
         else:
-            boss["x"] = WIDTH - 300
+            boss.x = WIDTH - 300
 
-        if now() - boss["last_shot"] > boss["fire_delay"]:
-            boss["last_shot"] = now()
-            if boss["type"] == "normal":
+        if now() - boss.last_shot > boss.fire_delay:
+            boss.last_shot = now()
+            if boss.type == "normal":
                 for angle in [-30, -15, 0, 15, 30]:
                     rad = radians(angle)
                     vx = -ENEMY_BULLET_SPEED * 0.8 * cos(rad)
                     vy = ENEMY_BULLET_SPEED * 0.8 * sin(rad)
-                    bullets.append({
-                        "x": boss["x"] - 50, "y": boss["y"],
-                        "vx": vx, "vy": vy,
-                        "img": bullet_imgs[1], "glow": True,
-                        "is_enemy": True, "damage": 15
-                    })
-            elif boss["type"] == "smart":
-                dx = player["x"] - boss["x"]
-                dy = player["y"] - boss["y"]
+                    bullets.add(
+                        x=boss.x - 50, y=boss.y, vx=vx, vy=vy,
+                        img=bullet_imgs[1], damage=15, is_enemy=True
+                    )
+            elif boss.type == "smart":
+                dx = player.x - boss.x
+                dy = player.y - boss.y
                 dist = max(1, hypot(dx, dy))
                 base_vx = (dx/dist) * ENEMY_BULLET_SPEED * 0.9
                 base_vy = (dy/dist) * ENEMY_BULLET_SPEED * 0.9
@@ -810,152 +2072,220 @@ def update_entities(dt):
                     rad = math.atan2(base_vy, base_vx) + radians(angle)
                     vx = cos(rad) * ENEMY_BULLET_SPEED * 0.9
                     vy = sin(rad) * ENEMY_BULLET_SPEED * 0.9
-                    bullets.append({
-                        "x": boss["x"] - 50, "y": boss["y"] + random.randint(-20,20),
-                        "vx": vx, "vy": vy,
-                        "img": bullet_imgs[2], "glow": True,
-                        "is_enemy": True, "damage": 18
-                    })
-            elif boss["type"] == "apocalypse":
-                if random.random() < 0.3:
-                    enemies.append({
-                        "x": boss["x"], "y": boss["y"] + random.randint(-100,100),
-                        "target_y": boss["y"], "speed": 4.0,
-                        "hp": 3, "w": 64, "h": 64,
-                        "last_shot": 0.0, "fire_delay": 2.0,
-                        "type": "shooter"
-                    })
-                if boss.get("laser_timer", 0) <= 0:
-                    boss["laser_timer"] = now() + 2.0
-                    effects.append({"type": "laser_warning", "y": player["y"], "t": now(), "dur": 1.5})
-            elif boss["type"] == "nexus":
-                if random.random() < 0.02:
-                    boss["reflect"] = True
-                    create_particles(boss["x"], boss["y"], 20, (255,100,255), 8, 0.8)
-                if now() - boss.get("teleport_timer", 0) > 8.0:
-                    boss["teleport_timer"] = now()
-                    boss["x"] = WIDTH + 100
-                    create_particles(boss["x"], boss["y"], 40, (200,50,255), 15, 1.2)
-
-    # BULLET MOVEMENT & COLLISION
-    for b in bullets[:]:
-        b["x"] += b["vx"]
-        b["y"] += b["vy"]
-        if (b["x"] < -100 or b["x"] > WIDTH + 100 or
-            b["y"] < -100 or b["y"] > HEIGHT + 100):
-            bullets.remove(b)
+                    bullets.add(
+                        x=boss.x - 50, y=boss.y + rng.randint(-20,20), vx=vx, vy=vy,
+                        img=bullet_imgs[2], damage=18, is_enemy=True
+                    )
+            elif boss.type == "apocalypse":
+                if rng.random() < 0.3 and len(enemies) < governor.enemy_cap():
+                    enemies.spawn(
+                        x=boss.x, y=boss.y + rng.randint(-100,100),
+                        target_y=boss.y, speed=4.0,
+                        hp=3, fire_delay=2.0, type="shooter"
+                    )
+                if boss.laser_timer <= 0:
+                    boss.laser_timer = now() + 2.0
+                    effects.spawn(type="laser_warning", y=player.y, t=now(), dur=1.5)
+            elif boss.type == "nexus":
+                if rng.random() < 0.02:
+                    boss.reflect = True
+                    create_particles(boss.x, boss.y, 20, (255,100,255), 8, 0.8)
+                if now() - boss.teleport_timer > 8.0:
+                    boss.teleport_timer = now()
+                    boss.x = WIDTH + 100
+                    create_particles(boss.x, boss.y, 40, (200,50,255), 15, 1.2)
+
+    # BULLET MOVEMENT & CULL (vectorized over the whole store)
+    steer_homing()
+    bullets.step()
+
+    # BROADPHASE: one grid rebuild per frame. Enemies/boss are inserted with their hit extents so each
+    # player bullet reads a single cell; bullets in empty cells are rejected in one vectorized pass.
+    collision_stats["pairs"] = 0
+    targets = enemies.items
+    target_grid.clear()
+    for i, e in enumerate(targets):
+        target_grid.insert(i, e.x, e.y, 48, 48)
+    if boss:
+        target_grid.insert(-1, boss.x, boss.y, 80, 80)
+    n = bullets.n
+    bx, by, bdmg, bvx, bvy = bullets.x, bullets.y, bullets.damage, bullets.vx, bullets.vy
+    own = bullets.alive[:n] & ~bullets.is_enemy[:n]
+    fast = own & (bvx[:n] ** 2 + bvy[:n] ** 2 > SWEEP_MIN_SPEED ** 2)
+    near = fast | (own & target_grid.occupied(bx[:n], by[:n]))
+    if player_invulnerable:
+        struck = np.zeros(n, np.bool_)
+    else:
+        struck = bullets.in_box(player.x, player.y, 40, 40, enemy=True)
+
+    # BULLET COLLISION (in bullet order). A plain bullet (pierce 0) damages every target it overlaps
+    # this frame and then dies, as it always has; a piercing one spends one pierce per target and
+    # dies when it runs out.
+    for bi in np.flatnonzero(near | struck).tolist():
+        x, y = float(bx[bi]), float(by[bi])
+        if struck[bi]:
+            # Enemy bullet hits player: shield absorbs first, then hp
+            dmg = int(bdmg[bi])
+            shield = player.shield
+            if shield > 0:
+                taken_by_shield = min(shield, dmg)
+                player.shield -= taken_by_shield
+                dmg -= taken_by_shield
+                create_particles(x, y, 8, (100,200,255), 6, 0.4)  # shield hit effect
+            if dmg > 0:
+                player.hp -= dmg
+            bullets.alive[bi] = False
+            create_particles(x, y, 8, (255, 100, 0), 8, 0.4)
+            sfx.play("hit", x)
             continue
-
-        if not b.get("is_enemy"):
-            hit = False
-            for e in enemies[:]:
-                if (abs(b["x"] - e["x"]) < 48 and abs(b["y"] - e["y"]) < 48):
-                    e["hp"] -= b.get("damage", 1)
-                    hit = True
-                    if e["hp"] <= 0:
-                        enemies.remove(e)
-                        score += 100
-                        gain_exp(10)
-                        create_particles(e["x"], e["y"], 12, (255, 200, 50), 10, 0.6)
-                        if explode_sound: explode_sound.play()
-            if boss and (abs(b["x"] - boss["x"]) < 80 and abs(b["y"] - boss["y"]) < 80):
-                boss["hp"] -= b.get("damage", 1)
-                hit = True
-                create_particles(b["x"], b["y"], 10, (255, 255, 200), 10, 0.5)
-                effects.append({"type": "hit_flash", "t": now(), "dur": 0.1})
-                if hit_sound: hit_sound.play()
-            if hit:
-                bullets.remove(b)
-                create_particles(b["x"], b["y"], 6, (255, 255, 100), 6, 0.3)
+        hits = []  # (target index or -1 for the boss, impact x, impact y) in the order they are struck
+        if fast[bi]:
+            # swept: the segment travelled this frame against every box its bounding box reaches
+            dx, dy = float(bvx[bi]), float(bvy[bi])
+            x0, y0 = x - dx, y - dy
+            entries = []
+            for i in target_grid.query_box(x0 + dx / 2, y0 + dy / 2, abs(dx) / 2, abs(dy) / 2):
+                collision_stats["pairs"] += 1
+                if i < 0:
+                    t = segment_box_entry(x0, y0, dx, dy, boss.x, boss.y, 80, 80) if boss else None
+                elif enemies.is_live(i):
+                    t = segment_box_entry(x0, y0, dx, dy, targets[i].x, targets[i].y, 48, 48)
+                else:
+                    continue
+                if t is not None:
+                    entries.append((t, i))
+            for t, i in sorted(entries):
+                hits.append((i, x0 + dx * t, y0 + dy * t))
         else:
-            # Enemy bullet hits player: shield absorbs first, then hp
-            if (abs(b["x"] - player["x"]) < 40 and
-                abs(b["y"] - player["y"]) < 40 and
-                not player_invulnerable):
-                dmg = b.get("damage", 10)
-                shield = player.get("shield", 0)
-                if shield > 0:
-                    taken_by_shield = min(shield, dmg)
-                    player["shield"] -= taken_by_shield
-                    dmg -= taken_by_shield
-                    create_particles(b["x"], b["y"], 8, (100,200,255), 6, 0.4)  # shield hit effect
-                if dmg > 0:
-                    player["hp"] -= dmg
-                bullets.remove(b)
-                create_particles(b["x"], b["y"], 8, (255, 100, 0), 8, 0.4)
-                if hit_sound: hit_sound.play()
+            boss_near = False
+            for i in sorted(target_grid.query_point(x, y)):
+                if i < 0:
+                    boss_near = True
+                    continue
+                collision_stats["pairs"] += 1
+                if not enemies.is_live(i):
+                    continue
+                e = targets[i]
+                if (abs(x - e.x) < 48 and abs(y - e.y) < 48):
+                    hits.append((i, x, y))
+            if boss_near:
+                collision_stats["pairs"] += 1
+            if boss_near and boss and (abs(x - boss.x) < 80 and abs(y - boss.y) < 80):
+                hits.append((-1, x, y))
+        if not hits:
+            continue
+        pierce = int(bullets.pierce[bi])
+        seen = bullets.hit_log.get(int(bullets.serial[bi]))  # bullets spawned piercing, even once spent
+        landed = 0
+        for i, hx, hy in hits:
+            if seen is not None:
+                uid = BOSS_UID if i < 0 else targets[i].uid
+                if uid in seen:
+                    continue  # still inside a target it already went through
+                seen.add(uid)
+            if i < 0:
+                boss.hp -= int(bdmg[bi])
+                create_particles(hx, hy, 10, (255, 255, 200), 10, 0.5)
+                effects.spawn(type="hit_flash", t=now(), dur=0.1)
+                sfx.play("hit", hx)
+            elif enemies.is_live(i):
+                e = targets[i]
+                e.hp -= int(bdmg[bi])
+                if e.hp <= 0:
+                    kill_enemy(i)
+            else:
+                continue
+            create_particles(hx, hy, 6, (255, 255, 100), 6, 0.3)
+            landed += 1
+            if pierce and landed > pierce:
+                bullets.alive[bi] = False
+                break
+        else:
+            if pierce:
+                bullets.pierce[bi] = pierce - landed
+            elif landed:
+                bullets.alive[bi] = False
+    bullets.compact()
+    enemies.sweep()
 
     # ENEMY MOVEMENT
-    for e in enemies[:]:
-        e["x"] -= e["speed"]
-        if random.random() < 0.012:
+    for i, e in enumerate(enemies):
+        e.x -= e.speed
+        if rng.random() < 0.012:
             enemy_shoot(e)
-        if e["x"] < -100:
-            enemies.remove(e)
+        if e.x < -100:
+            enemies.kill(i)
+    enemies.sweep()
 
     # BOSS DEATH
-    if boss and boss["hp"] <= 0:
-        reward = 5000 if boss["type"] == "nexus" else 2500 if boss["type"] == "apocalypse" else 1500 if boss["type"] == "smart" else 1000
-        if victory_sound: victory_sound.play()
-        gain_exp(1000 if boss["type"] == "nexus" else 500)
+    if boss and boss.hp <= 0:
+        reward = 5000 if boss.type == "nexus" else 2500 if boss.type == "apocalypse" else 1500 if boss.type == "smart" else 1000
+        sfx.play("victory")
+        gain_exp(1000 if boss.type == "nexus" else 500)
         score += reward
         # NOTE: helper acquisition moved to level-up rewards (every 10 levels).
         # Keep boss points & celebratory particles but do NOT auto-grant a helper here.
-        add_float_pop(boss["x"], boss["y"] - 50, f"+{reward} PTS", (255, 215, 0))
+        add_float_pop(boss.x, boss.y - 50, f"+{reward} PTS", (255, 215, 0))
         for _ in range(12):
-            create_particles(boss["x"] + random.randint(-80, 80), boss["y"] + random.randint(-80, 80), 40, (255, 50, 50), 18, 2.5, 6, 0.6)
+            create_particles(boss.x + fx_rng.randint(-80, 80), boss.y + fx_rng.randint(-80, 80), 40, (255, 50, 50), 18, 2.5, 6, 0.6)
         boss = None
 
-    # POWERUP MOVEMENT & PICKUP
-    for p in powerups[:]:
+    # POWERUP MOVEMENT
+    for i, p in enumerate(powerups):
         # moving runes have vx/vy and lifetime
-        if p.get("type") == "rune":
+        if p.type == "rune":
             # move
-            p["x"] += p.get("vx", 0) * dt * FPS
-            p["y"] += p.get("vy", 0) * dt * FPS
+            p.x += p.vx * dt * FPS
+            p.y += p.vy * dt * FPS
             # bounce
-            if p["x"] < 40 or p["x"] > WIDTH - 40:
-                p["vx"] *= -1
-            if p["y"] < 40 or p["y"] > HEIGHT - 40:
-                p["vy"] *= -1
+            if p.x < 40 or p.x > WIDTH - 40:
+                p.vx *= -1
+            if p.y < 40 or p.y > HEIGHT - 40:
+                p.vy *= -1
             # expire after life seconds
-            if now() - p.get("t", now()) > p.get("life", 10):
-                powerups.remove(p)
-                continue
-
-        # check pickup by player
-        if abs(p["x"] - player["x"]) < 40 and abs(p["y"] - player["y"]) < 40:
-            typ = p.get("type")
+            if now() - p.t > p.life:
+                powerups.kill(i)
+    powerups.sweep()
+
+    # POWERUP PICKUP (broadphase: only powerups bucketed near the player are tested)
+    pickup_grid.clear()
+    for i, p in enumerate(powerups):
+        pickup_grid.insert(i, p.x, p.y)
+    for i in pickup_grid.query_box(player.x, player.y, 40, 40):
+        collision_stats["pairs"] += 1
+        p = powerups[i]
+        if abs(p.x - player.x) < 40 and abs(p.y - player.y) < 40:
+            typ = p.type
             if typ == "hp":
-                player["hp"] = min(100, player["hp"] + 30)
-                add_float_pop(player["x"], player["y"] - 20, "+30 HP", (0,255,0))
+                player.hp = min(100, player.hp + 30)
+                add_float_pop(player.x, player.y - 20, "+30 HP", (0,255,0))
             elif typ == "speed":
                 # increase speed_level up to 10
-                sl = player.get("speed_level", 1)
+                sl = player.speed_level
                 if sl < 10:
-                    player["speed_level"] = sl + 1
-                    add_float_pop(player["x"], player["y"] - 20, f"SPEED LVL {player['speed_level']}", (255,255,0))
+                    player.speed_level = sl + 1
+                    add_float_pop(player.x, player.y - 20, f"SPEED LVL {player.speed_level}", (255,255,0))
                 else:
-                    add_float_pop(player["x"], player["y"] - 20, "SPEED MAX", (200,200,0))
+                    add_float_pop(player.x, player.y - 20, "SPEED MAX", (200,200,0))
             elif typ == "damage":
-                dl = player.get("damage_level", 1)
+                dl = player.damage_level
                 if dl < 10:
-                    player["damage_level"] = dl + 1
-                    add_float_pop(player["x"], player["y"] - 20, f"DAMAGE LVL {player['damage_level']}", (255,100,255))
+                    player.damage_level = dl + 1
+                    add_float_pop(player.x, player.y - 20, f"DAMAGE LVL {player.damage_level}", (255,100,255))
                 else:
-                    add_float_pop(player["x"], player["y"] - 20, "DAMAGE MAX", (200,100,200))
+                    add_float_pop(player.x, player.y - 20, "DAMAGE MAX", (200,100,200))
             elif typ == "rune":
                 # runes give 1000 EXP and increase shield_max by +10 (cap 100) and refill shield
                 gain_exp(1000)
-                old_shield_max = player.get("shield_max", 30)
+                old_shield_max = player.shield_max
                 new_shield_max = min(100, old_shield_max + 10)
-                player["shield_max"] = new_shield_max
-                player["shield"] = new_shield_max  # refill every rune
-                add_float_pop(player["x"], player["y"] - 20, "+1000 EXP + SHIELD", (200,180,255))
-                if powerup_sound: powerup_sound.play()
-            # remove powerup after pickup
-            if p in powerups:
-                powerups.remove(p)
+                player.shield_max = new_shield_max
+                player.shield = new_shield_max  # refill every rune
+                add_float_pop(player.x, player.y - 20, "+1000 EXP + SHIELD", (200,180,255))
+                sfx.play("powerup", player.x)
+            powerups.kill(i)
+    powerups.sweep()
+    collision_stats["total_pairs"] += collision_stats["pairs"]
 
     update_particles(dt)
 
@@ -1021,17 +2351,10 @@ def install_dino_chain(globals_dict, custom_path=CUSTOM_DINO_PATH, size=(48,48),
         # write into globals so main draw uses it
         globals_dict['dino_img'] = dino_img_local
 
-        # ensure helpers if present have chain offsets and x/y
+        # Helper() already carries chain offsets and x/y; just keep chain order current
         if 'helpers' in globals_dict:
             for i, h in enumerate(globals_dict['helpers']):
-                h.setdefault('chain_index', i)
-                h.setdefault('chain_offset', (-60 - 30 * i, 0))
-                if 'player' in globals_dict and isinstance(globals_dict['player'], dict):
-                    h.setdefault('x', globals_dict['player'].get('x', 0))
-                    h.setdefault('y', globals_dict['player'].get('y', 0))
-                else:
-                    h.setdefault('x', h.get('x', 0))
-                    h.setdefault('y', h.get('y', 0))
+                h.chain_index = i
 
         # define chain update
         def dino_chain_update(player_obj, helpers_list, lerp_speed=0.18):
@@ -1040,21 +2363,21 @@ def install_dino_chain(globals_dict, custom_path=CUSTOM_DINO_PATH, size=(48,48),
             for i, h in enumerate(helpers_list):
                 try:
                     if i == 0:
-                        c_off = h.get('chain_offset')
+                        c_off = h.chain_offset
                         if c_off is None:
-                            tx = player_obj.get('x', 0) + h.get('offset_x', -60)
-                            ty = player_obj.get('y', 0) + h.get('offset_y', 0)
+                            tx = player_obj.x + h.offset_x
+                            ty = player_obj.y + h.offset_y
                         else:
-                            tx = player_obj.get('x', 0) + c_off[0]
-                            ty = player_obj.get('y', 0) + c_off[1]
+                            tx = player_obj.x + c_off[0]
+                            ty = player_obj.y + c_off[1]
                     else:
                         prev = helpers_list[i-1]
-                        tx = prev.get('x', player_obj.get('x', 0))
-                        ty = prev.get('y', player_obj.get('y', 0))
-                    mult = h.get('lerp_mult', 0.2)
+                        tx = prev.x
+                        ty = prev.y
+                    mult = h.lerp_mult
                     effective_speed = lerp_speed * mult
-                    h['x'] += (tx - h.get('x', tx)) * effective_speed
-                    h['y'] += (ty - h.get('y', ty)) * effective_speed
+                    h.x += (tx - h.x) * effective_speed
+                    h.y += (ty - h.y) * effective_speed
                 except Exception:
                     traceback.print_exc()
                     continue
@@ -1062,12 +2385,9 @@ def install_dino_chain(globals_dict, custom_path=CUSTOM_DINO_PATH, size=(48,48),
         globals_dict['dino_chain_update'] = dino_chain_update
         # convenience initializer
         def dino_chain_ensure(globals_inner):
-            if 'helpers' in globals_inner and 'player' in globals_inner:
+            if 'helpers' in globals_inner:
                 for i, h in enumerate(globals_inner['helpers']):
-                    h.setdefault('chain_index', i)
-                    h.setdefault('chain_offset', (-60 - 30 * i, 0))
-                    h.setdefault('x', globals_inner['player'].get('x', 0))
-                    h.setdefault('y', globals_inner['player'].get('y', 0))
+                    h.chain_index = i
         globals_dict['dino_chain_ensure'] = dino_chain_ensure
 
         return True
@@ -1075,80 +2395,183 @@ def install_dino_chain(globals_dict, custom_path=CUSTOM_DINO_PATH, size=(48,48),
         traceback.print_exc()
         return False
 
-# Call the installer now so dino_img and dino_chain_update are available
-install_dino_chain(globals(), custom_path=CUSTOM_DINO_PATH, size=(48,48), wing_padding=12)
+# The installer runs as a loader stage once dino_img is in (see STARTUP)
+
+# ---------------- COMPOSITOR ----------------
+DIRTY_RECT_LIMIT = 256  # above this many changed areas a full flip is cheaper than display.update(rects)
+
+class Compositor:
+    """
+    Builds the game scene from three layers:
+      background + world -> one off-screen world buffer, composited once at the camera (shake) offset
+      HUD               -> transparent layer, redrawn only when hud_state() changes
+    In dirty-rect mode (software rendering) the background is static, only areas touched this frame or
+    last frame are restored/recomposited, and presentation uses display.update(rects).
+    """
+    def __init__(self, size=(WIDTH, HEIGHT), dirty_rects=False):
+        self.size = size
+        self.world = pygame.Surface(size).convert()
+        self.hud = pygame.Surface(size, pygame.SRCALPHA)
+        self.hud_key = None
+        self.hud_rects = []
+        self.prev_hud_rects = []
+        self.hud_redraws = 0
+        self.dirty_rects = dirty_rects
+        self.background = None   # static backdrop for dirty-rect mode
+        self.world_rects = []    # areas drawn into the world buffer this frame (dirty mode only)
+        self.prev_world_rects = []
+        self.prev_overlay_rects = []
+        self.update_rects = None  # None -> flip the whole display
+        self.last_offset = (0, 0)
+        self.full_redraw = True
+
+    def invalidate(self):
+        """Next game frame recomposites everything (scene change, window expose...)."""
+        self.full_redraw = True
+        self.hud_key = None
+
+    def track(self, rects):
+        if self.dirty_rects and rects:
+            if isinstance(rects, Rect):
+                self.world_rects.append(rects)
+            else:
+                self.world_rects.extend(rects)
+
+    def begin_frame(self):
+        self.prev_world_rects = self.world_rects
+        self.world_rects = []
+        if self.dirty_rects:
+            if self.background is None:
+                self.background = pygame.Surface(self.size).convert()
+                draw_background(self.background, scroll=False)
+            if self.full_redraw:
+                self.world.blit(self.background, (0, 0))
+            else:
+                for r in self.prev_world_rects:
+                    self.world.blit(self.background, r, r)
+        else:
+            draw_background(self.world)
+
+    def update_hud(self):
+        key = hud_state()
+        if key == self.hud_key:
+            return False
+        self.hud_key = key
+        self.hud.fill((0, 0, 0, 0))
+        self.prev_hud_rects = self.hud_rects
+        self.hud_rects = draw_hud(self.hud)
+        self.hud_redraws += 1
+        return True
+
+    def present(self, offset):
+        """Composite world + HUD onto the screen; decides what presentation has to update."""
+        hud_changed = self.update_hud()
+        full = (not self.dirty_rects or self.full_redraw or offset != (0, 0) or self.last_offset != (0, 0)
+                or len(self.world_rects) + len(self.prev_world_rects) > DIRTY_RECT_LIMIT)
+        if full:
+            if offset != (0, 0):
+                screen.fill((0, 0, 0))
+            screen.blit(self.world, offset)
+            for r in self.hud_rects:
+                screen.blit(self.hud, r, r)
+            overlay = draw_hud_overlay(screen)
+            self.update_rects = None
+        else:
+            rects = self.prev_world_rects + self.world_rects + self.prev_overlay_rects
+            if hud_changed:
+                rects += self.prev_hud_rects + self.hud_rects
+            for r in rects:
+                screen.blit(self.world, r, r)
+                screen.blit(self.hud, r, r)
+            overlay = draw_hud_overlay(screen)
+            self.update_rects = rects + overlay
+        self.prev_overlay_rects = overlay
+        self.last_offset = offset
+        self.full_redraw = False
+
+    def add_update_rects(self, rects):
+        """Screen-space overlays drawn after present(); restored from the layers next frame."""
+        self.prev_overlay_rects = self.prev_overlay_rects + rects
+        if self.update_rects is not None:
+            self.update_rects.extend(rects)
+
+    def flip(self):
+        if self.update_rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.update_rects)
+        self.update_rects = None
+
+compositor = Compositor(dirty_rects=ARGS.dirty_rects)
 
 # ---------------- DRAW ----------------
-def draw_scene_game():
-    global scroll_x, bomb_flash, transform_anim_timer, transform_anim_index
+def draw_background(surf, scroll=True):
+    global scroll_x
     if stage_img:
         w = stage_img.get_width()
-        scroll_x = (scroll_x + scroll_speed) % w
-        x = -int(scroll_x)
+        if scroll:
+            scroll_x = (scroll_x + scroll_speed) % w
+        x = -int(scroll_x) if scroll else 0
         while x < WIDTH:
-            screen.blit(stage_img, (x + shake_offset[0], shake_offset[1]))
+            surf.blit(stage_img, (x, 0))
             x += w
     else:
-        screen.fill((10,20,40))
+        surf.fill((10,20,40))
 
+def draw_world(surf):
+    """Everything that lives in world space; drawn without shake (the compositor applies the camera)."""
+    global bomb_flash, transform_anim_timer, transform_anim_index
+    track = compositor.track
+    dirty = compositor.dirty_rects
     if bomb_flash > 0:
         overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
         overlay.fill((255, 200, 100, int(255 * bomb_flash)))
-        screen.blit(overlay, (0, 0))
+        track(surf.blit(overlay, (0, 0)))
         bomb_flash = max(0, bomb_flash - 0.02)
 
-    for b in bullets:
-        img = b.get("img")
-        bx = int(b["x"]) + shake_offset[0]
-        by = int(b["y"]) + shake_offset[1]
-        if img:
-            pulse = 1.0 + 0.2 * sin(now() * 12)
-            glow = pygame.transform.smoothscale(img, (int(img.get_width()*pulse), int(img.get_height()*pulse)))
-            glow.set_alpha(100)
-            screen.blit(glow, (bx - glow.get_width()//2, by - glow.get_height()//2))
-            screen.blit(img, (bx - img.get_width()//2, by - img.get_height()//2))
+    # bullets: one pre-baked glow+core blit each. The pulse step is the same for every bullet this
+    # frame, so each sprite is looked up once and the blit offsets are computed as arrays.
+    t = profiler.start()
+    n = bullets.n
+    if n:
+        pulse = 1.0 + 0.2 * sin(now() * 12)
+        baked = [sprite_variants.glowing(img, pulse, 0.8, 1.2, 100) for img in bullet_sprites]
+        frames = [b[0] for b in baked]
+        sids = bullets.sprite[:n]
+        xs = (bullets.x[:n].astype(np.int64) + np.array([b[1] for b in baked])[sids]).tolist()
+        ys = (bullets.y[:n].astype(np.int64) + np.array([b[2] for b in baked])[sids]).tolist()
+        track(surf.blits(zip(map(frames.__getitem__, sids.tolist()), zip(xs, ys)), doreturn=dirty))
+    profiler.stop("draw.bullets", t)
 
     for e in enemies:
-        screen.blit(enemy_img, (int(e["x"]-32) + shake_offset[0], int(e["y"]-32) + shake_offset[1]))
+        track(surf.blit(enemy_img, (int(e.x-32), int(e.y-32))))
 
     # draw powerups (including moving runes)
     for p in powerups:
-        img = powerup_imgs.get(p.get("type"), None)
-        px = int(p["x"]) + shake_offset[0]
-        py = int(p["y"]) + shake_offset[1]
-        if p.get("type") == "rune":
+        img = powerup_imgs.get(p.type, None)
+        px = int(p.x)
+        py = int(p.y)
+        if p.type == "rune":
             # draw rune glow (larger)
             ri = rune_img
-            screen.blit(ri, (px - ri.get_width()//2, py - ri.get_height()//2))
+            track(surf.blit(ri, (px - ri.get_width()//2, py - ri.get_height()//2)))
+            # tiny float label for runes remaining time
+            remaining = int(max(0, p.life - (now() - p.t)))
+            txt = render_text(font, f"{remaining}s", (200,200,255))
+            track(surf.blit(txt, (px - txt.get_width()//2, py + 22)))
         elif img:
-            screen.blit(img, (px - img.get_width()//2, py - img.get_height()//2))
-
-    for p in powerups:
-        # optional tiny float label for runes remaining time
-        if p.get("type") == "rune":
-            remaining = int(max(0, p.get("life", 10) - (now() - p.get("t", now()))))
-            txt = font.render(f"{remaining}s", True, (200,200,255))
-            screen.blit(txt, (int(p["x"]) - txt.get_width()//2 + shake_offset[0], int(p["y"]) + 22 + shake_offset[1]))
-
-    for p in powerups:
-        pass  # already drawn above
-
-    for p in powerups:
-        pass
-
-    for e in enemies:
-        pass  # already drawn above
+            track(surf.blit(img, (px - img.get_width()//2, py - img.get_height()//2)))
 
     if boss:
-        screen.blit(boss_img, (int(boss["x"]-70) + shake_offset[0], int(boss["y"]-70) + shake_offset[1]))
+        track(surf.blit(boss_img, (int(boss.x-70), int(boss.y-70))))
         bar_w = 120
-        hp_ratio = boss["hp"] / boss["max_hp"]
-        pygame.draw.rect(screen, (100,0,0), (boss["x"]-60, boss["y"]-80, bar_w, 8))
-        pygame.draw.rect(screen, (0,255,0), (boss["x"]-60, boss["y"]-80, bar_w*hp_ratio, 8))
+        hp_ratio = boss.hp / boss.max_hp
+        track(pygame.draw.rect(surf, (100,0,0), (boss.x-60, boss.y-80, bar_w, 8)))
+        track(pygame.draw.rect(surf, (0,255,0), (boss.x-60, boss.y-80, bar_w*hp_ratio, 8)))
 
     # Choose hero image: animated if transformed (3-frame), fallback to hero_transform_img
     try:
-        if player.get("transformed", False) and transform_frames:
+        if player.transformed and transform_frames:
             if len(transform_frames) > 1 and now() - transform_anim_timer > TRANSFORM_ANIM_INTERVAL:
                 transform_anim_timer = now()
                 transform_anim_index = (transform_anim_index + 1) % len(transform_frames)
@@ -1156,137 +2579,169 @@ def draw_scene_game():
         else:
             img = hero_imgs[selected_hero]
     except Exception:
-        img = hero_transform_img if player.get("transformed", False) else hero_imgs[selected_hero]
+        img = hero_transform_img if player.transformed else hero_imgs[selected_hero]
 
     # draw hero, applying visual-only vertical offset for transform bobbing if set
-    draw_y = int(player.get("y", 0) + transform_draw_offset)
+    draw_y = int(player.y + transform_draw_offset)
     if player_invulnerable and int(now() * 10) % 2 == 0:
         pass
     else:
-        screen.blit(img, (int(player["x"] - img.get_width()//2) + shake_offset[0],
-                           int(draw_y - img.get_height()//2) + shake_offset[1]))
+        track(surf.blit(img, (int(player.x - img.get_width()//2), int(draw_y - img.get_height()//2))))
 
     # DRAW DINO HELPERS (CHAINED if available)
+    pulse = 1.0 + 0.15 * sin(now() * 10)
+    scaled = sprite_variants.scaled(dino_img, pulse, 0.85, 1.15)
     for h in helpers:
-        pulse = 1.0 + 0.15 * sin(now() * 10)
-        scaled = pygame.transform.smoothscale(dino_img, (int(48*pulse), int(48*pulse)))
-        screen.blit(scaled, (int(h["x"] - 24) + shake_offset[0], int(h["y"] - 24) + shake_offset[1]))
+        track(surf.blit(scaled, (int(h.x - 24), int(h.y - 24))))
 
-    draw_particles()
+    t = profiler.start()
+    track(draw_particles(surf))
+    profiler.stop("draw.particles", t)
 
-    for ef in effects[:]:
+    t = profiler.start()
+    for ef in effects:
         elapsed = now() - ef["t"]
         if elapsed > ef["dur"]:
-            effects.remove(ef)
-            continue
+            continue  # expire_effects() drops it on the next sim step
         if ef["type"] == "transform":
             alpha = int(255 * (1 - elapsed/ef["dur"]))
             s = pygame.Surface((200,200), pygame.SRCALPHA)
             s.fill((255,255,100,alpha))
             pygame.draw.circle(s, (255,255,200,alpha), (100,100), 80 + int(elapsed*100))
-            screen.blit(s, (ef["x"]-100, ef["y"]-100))
+            track(surf.blit(s, (ef["x"]-100, ef["y"]-100)))
         elif ef["type"] == "laser_beam":
             alpha = int(255 * (1 - elapsed/ef["dur"]))
-            pygame.draw.line(screen, (0,255,255,alpha), (ef["x"], ef["y"]-20), (WIDTH, ef["y"]), 6)
-            pygame.draw.line(screen, (100,255,255,alpha), (ef["x"], ef["y"]-20), (WIDTH, ef["y"]), 3)
+            track(pygame.draw.line(surf, (0,255,255,alpha), (ef["x"], ef["y"]-20), (WIDTH, ef["y"]), 6))
+            track(pygame.draw.line(surf, (100,255,255,alpha), (ef["x"], ef["y"]-20), (WIDTH, ef["y"]), 3))
         elif ef["type"] == "lightning":
             alpha = int(255 * (1 - elapsed/ef["dur"]))
             points = [(ef["x1"], ef["y1"])]
             for _ in range(5):
-                mx = (ef["x1"] + ef["x2"]) / 2 + random.randint(-30,30)
-                my = (ef["y1"] + ef["y2"]) / 2 + random.randint(-30,30)
+                mx = (ef["x1"] + ef["x2"]) / 2 + fx_rng.randint(-30,30)
+                my = (ef["y1"] + ef["y2"]) / 2 + fx_rng.randint(-30,30)
                 points.append((mx, my))
             points.append((ef["x2"], ef["y2"]))
-            pygame.draw.lines(screen, (200,200,255,alpha), False, points, 4)
-            pygame.draw.lines(screen, (255,255,100,alpha), False, points, 2)
+            track(pygame.draw.lines(surf, (200,200,255,alpha), False, points, 4))
+            track(pygame.draw.lines(surf, (255,255,100,alpha), False, points, 2))
         elif ef["type"] == "laser_warning":
             alpha = int(255 * (1 - elapsed/ef["dur"]))
-            pygame.draw.line(screen, (255,0,0,alpha), (0, ef["y"]), (WIDTH, ef["y"]), 8)
-            pygame.draw.line(screen, (255,100,100,alpha), (0, ef["y"]-4), (WIDTH, ef["y"]+4), 4)
+            track(pygame.draw.line(surf, (255,0,0,alpha), (0, ef["y"]), (WIDTH, ef["y"]), 8))
+            track(pygame.draw.line(surf, (255,100,100,alpha), (0, ef["y"]-4), (WIDTH, ef["y"]+4), 4))
         elif ef["type"] == "hit_flash" and boss:
             alpha = int(255 * (1 - elapsed/ef["dur"]))
             overlay = pygame.Surface((200, 200), pygame.SRCALPHA)
             overlay.fill((255, 200, 100, alpha))
-            screen.blit(overlay, (boss["x"]-100, boss["y"]-100))
+            track(surf.blit(overlay, (boss.x-100, boss.y-100)))
         else:
             img = ef.get("img")
             if img:
                 alpha = int(255 * (1 - elapsed/ef["dur"]))
-                img.set_alpha(alpha)
-                screen.blit(img, (int(ef["x"]-img.get_width()//2)+shake_offset[0], int(ef["y"]-img.get_height()//2)+shake_offset[1]))
+                img = sprite_variants.faded(img, alpha)
+                track(surf.blit(img, (int(ef["x"]-img.get_width()//2), int(ef["y"]-img.get_height()//2))))
 
-    for fp in float_pops[:]:
-        t = now() - fp["t"]
-        if t > fp["dur"]:
-            float_pops.remove(fp)
+    for fp in float_pops:
+        age = now() - fp["t"]
+        if age > fp["dur"]:
             continue
-        surf = font.render(fp["txt"], True, fp.get("color",(255,255,150)))
-        screen.blit(surf, (int(fp["x"] - surf.get_width()//2) + shake_offset[0],
-                           int(fp["y"] - t*50) + shake_offset[1]))
+        txt = fp["surf"]
+        track(surf.blit(txt, (int(fp["x"] - txt.get_width()//2), int(fp["y"] - age*50))))
+    profiler.stop("draw.effects", t)
+
+def hud_state():
+    """Everything the cached HUD layer depends on. The cooldown bars live in draw_hud_overlay(),
+    so while cooling only the whole-second bomb countdown changes it."""
+    return (score, player.level, player.hp, int(player.shield), player.shield_max,
+            player.speed_level, player.damage_level, sub_weapon,
+            helper_count, bool(helpers), boss.type if boss else None,
+            int(bomb_cooldown) if bomb_cooldown > 0 else -1)
+
+def draw_hud(surf):
+    """Redraw the cached HUD layer; returns the rects it touched."""
+    rects = []
+    def put(img, pos):
+        rects.append(surf.blit(img, pos))
 
     # UI - display score/level/hp like before, plus new Speed/Damage levels and Shield bar
-    level_color = (255,215,0) if player["level"] >= TRANSFORM_LEVEL else (255,255,255)
-    screen.blit(font.render(f"SCORE: {score}", True, (255,255,255)), (12,10))
-    screen.blit(font.render(f"LVL: {player['level']}/{MAX_LEVEL}", True, level_color), (12,34))
-    screen.blit(font.render(f"HP: {player['hp']}", True, (255,100,100)), (12,58))
+    level_color = (255,215,0) if player.level >= TRANSFORM_LEVEL else (255,255,255)
+    put(render_text(font, f"SCORE: {score}", (255,255,255)), (12,10))
+    put(render_text(font, f"LVL: {player.level}/{MAX_LEVEL}", level_color), (12,34))
+    put(render_text(font, f"HP: {player.hp}", (255,100,100)), (12,58))
 
     # Speed & Damage levels (cap 10)
-    sp_lvl = player.get("speed_level", 1)
-    dmg_lvl = player.get("damage_level", 1)
-    screen.blit(font.render(f"SPEED LVL: {sp_lvl}/10", True, (200,200,255)), (12,82))
-    screen.blit(font.render(f"DAMAGE LVL: {dmg_lvl}/10", True, (200,200,255)), (12,104))
+    sp_lvl = player.speed_level
+    dmg_lvl = player.damage_level
+    put(render_text(font, f"SPEED LVL: {sp_lvl}/10", (200,200,255)), (12,82))
+    put(render_text(font, f"DAMAGE LVL: {dmg_lvl}/10", (200,200,255)), (12,104))
 
     sub_text = sub_weapon.upper()
     color = (255,100,100) if sub_weapon == "missile" else (0,255,255) if sub_weapon == "laser" else (200,200,255)
-    screen.blit(font.render(f"SUB: {sub_text}", True, color), (12, 128))
-    screen.blit(sub_imgs[sub_weapon], (90, 124))
-    if sub_cooldown > 0:
-        bar_w = 80
-        ratio = sub_cooldown / SUB_COOLDOWN_TIME
-        pygame.draw.rect(screen, (60,60,60), (12, 152, bar_w, 6))
-        pygame.draw.rect(screen, color, (12, 152, bar_w * (1 - ratio), 6))
+    put(render_text(font, f"SUB: {sub_text}", color), (12, 128))
+    put(sub_imgs[sub_weapon], (90, 124))
 
     # Shield HUD
-    shield = player.get("shield", 0)
-    shield_max = player.get("shield_max", 30)
+    shield = player.shield
+    shield_max = player.shield_max
     sx, sy = 12, 170
-    pygame.draw.rect(screen, (30,30,30), (sx, sy, 140, 12))
+    rects.append(pygame.draw.rect(surf, (30,30,30), (sx, sy, 140, 12)))
     if shield_max > 0:
-        pygame.draw.rect(screen, (100,200,255), (sx, sy, int(140 * (shield / shield_max)), 12))
-    screen.blit(font.render(f"SHIELD: {int(shield)}/{int(shield_max)}", True, (100,220,255)), (sx + 148, sy - 2))
+        pygame.draw.rect(surf, (100,200,255), (sx, sy, int(140 * (shield / shield_max)), 12))
+    put(render_text(font, f"SHIELD: {int(shield)}/{int(shield_max)}", (100,220,255)), (sx + 148, sy - 2))
 
-    helper_text = font.render(f"DINO: {helper_count}", True, (100,255,100))
-    screen.blit(helper_text, (12, 196))
+    put(render_text(font, f"DINO: {helper_count}", (100,255,100)), (12, 196))
     if helpers:
-        screen.blit(dino_img, (90, 192))
+        put(dino_img, (90, 192))
     if boss:
-        boss_name = {"normal": "BOSS 1", "smart": "BOSS 2", "apocalypse": "BOSS 3", "nexus": "NEXUS BOSS"}.get(boss.get("type", "normal"), "BOSS")
+        boss_name = {"normal": "BOSS 1", "smart": "BOSS 2", "apocalypse": "BOSS 3", "nexus": "NEXUS BOSS"}.get(boss.type, "BOSS")
         color = (255,0,0) if "NEXUS" not in boss_name else (255,50,255)
-        screen.blit(bigfont.render(boss_name, True, color), (WIDTH//2 - 80, 20))
+        put(render_text(bigfont, boss_name, color), (WIDTH//2 - 80, 20))
 
     bomb_x, bomb_y = WIDTH - 100, HEIGHT - 70
     if bomb_cooldown <= 0:
-        pulse = 1.0 + 0.1 * sin(now() * 8)
-        frame = bomb_frames[bomb_anim_index]
-        scaled = pygame.transform.smoothscale(frame, (int(60*pulse), int(60*pulse)))
-        screen.blit(scaled, (bomb_x - scaled.get_width()//2, bomb_y - scaled.get_height()//2))
-        screen.blit(font.render("READY", True, (100,255,100)), (bomb_x - 50, bomb_y + 40))
+        put(render_text(font, "READY", (100,255,100)), (bomb_x - 50, bomb_y + 40))
     else:
-        frame = bomb_frames[bomb_anim_index]
-        screen.blit(frame, (bomb_x - 30, bomb_y - 30))
+        txt = render_text(font, f"{int(bomb_cooldown)}s", (255,100,100))
+        put(txt, (bomb_x - txt.get_width()//2, bomb_y - 10))
+    return rects
+
+def draw_hud_overlay(surf):
+    """HUD pieces that change every frame (cooldown bars, bomb icon spin/pulse); drawn over the cached HUD layer."""
+    rects = []
+    if sub_cooldown > 0:
+        bar_w = 80
+        ratio = sub_cooldown / SUB_COOLDOWN_TIME
+        color = (255,100,100) if sub_weapon == "missile" else (0,255,255) if sub_weapon == "laser" else (200,200,255)
+        rects.append(pygame.draw.rect(surf, (60,60,60), (12, 152, bar_w, 6)))
+        pygame.draw.rect(surf, color, (12, 152, bar_w * (1 - ratio), 6))
+    bomb_x, bomb_y = WIDTH - 100, HEIGHT - 70
+    if bomb_cooldown > 0:
         ratio = bomb_cooldown / BOMB_COOLDOWN_TIME
-        pygame.draw.circle(screen, (60,60,60), (bomb_x, bomb_y), 35, 5)
-        pygame.draw.arc(screen, (255,100,100), (bomb_x-35, bomb_y-35, 70, 70),
+        rects.append(pygame.draw.circle(surf, (60,60,60), (bomb_x, bomb_y), 35, 5))
+        pygame.draw.arc(surf, (255,100,100), (bomb_x-35, bomb_y-35, 70, 70),
                         math.pi/2, math.pi/2 + 2*math.pi*(1-ratio), 5)
-        txt = font.render(f"{int(bomb_cooldown)}s", True, (255,100,100))
-        screen.blit(txt, (bomb_x - txt.get_width()//2, bomb_y - 10))
+    frame = bomb_frames[bomb_anim_index]
+    if bomb_cooldown <= 0:
+        pulse = 1.0 + 0.1 * sin(now() * 8)
+        frame = sprite_variants.scaled(frame, pulse, 0.9, 1.1)
+    rects.append(surf.blit(frame, (bomb_x - frame.get_width()//2, bomb_y - frame.get_height()//2)))
+    return rects
 
-def load_transform_frames(base_name="assets/hero_transform", canvas=HERO_CANVAS):
+def draw_scene_game():
+    t_draw = t = profiler.start()
+    compositor.begin_frame()
+    profiler.stop("draw.background", t)
+    draw_world(compositor.world)
+    t = profiler.start()
+    compositor.present(shake_offset)
+    profiler.stop("draw.hud", t)
+    profiler.stop("draw", t_draw)
+
+def load_transform_frames(base_name="assets/hero_transform", canvas=None):
     """
     Load hero_transform1..3 and ensure each frame is centered on HERO_CANVAS.
     If a frame is smaller than canvas, scale it up (preserving aspect) so it visually matches the normal hero size.
     If none are found, fall back to hero_transform_img (also normalized to canvas).
     """
+    canvas = canvas or HERO_CANVAS
     frames = []
     for i in range(1, 4):
         path = f"{base_name}{i}.png"
@@ -1342,137 +2797,138 @@ def load_transform_frames(base_name="assets/hero_transform", canvas=HERO_CANVAS)
         pass
     return frames
 
-def slice_atlas_by_alpha(path):
+# ---------------- ATLAS SLICING ----------------
+ATLAS_ALPHA_THRESHOLD = 16  # alpha at or below this counts as background
+ATLAS_MIN_AREA = 12         # components with fewer opaque pixels are specks/antialias dust
+ATLAS_MAX_DIM = 48          # scale down very large projectile slices to this maximum dimension
+ATLAS_SLICER_VERSION = 2    # bump when slicing changes so packed slices get rebuilt
+_atlas_rects = {}           # (path, mtime, size, threshold, min_area) -> [Rect]
+
+def _component_area(mask, rect):
     """
-    Loads an atlas image and returns a list of subsurfaces (copied) for each connected non-transparent region.
-    Accepts either a relative asset path (e.g. "assets/transform_bullets.png") or an absolute path.
-    Also normalizes each sliced sprite to a reasonable maximum size to avoid extremely large blobs.
+    Opaque pixel count of the component whose bounding rect is rect. The component lies inside
+    rect, so labeling a crop of the mask finds it exactly: it is the crop component spanning the
+    whole crop. Should a neighbour's fragment span the crop too, the full mask settles it.
     """
-    # load the surface robustly regardless of whether caller passed ap(...) or a relative path
-    surf = None
-    try:
-        if os.path.isabs(path) and os.path.exists(path):
-            surf = pygame.image.load(path).convert_alpha()
-        else:
-            # treat as project-relative name
-            surf = load_image_safe(path)
-    except Exception:
-        try:
-            # fallback: try load_image_safe on absolute path too
-            surf = load_image_safe(path)
-        except Exception:
-            surf = None
-
-    if not surf or getattr(surf, "get_width", lambda: 0)() < 8:
-        return []
-
-    rects = _find_connected_components_alpha(surf)
-    frames = []
-    MAX_DIM = 48  # scale down very large projectile slices to this maximum dimension
-    for r in rects:
-        try:
-            sub = surf.subsurface(r).copy()
-            sw, sh = sub.get_size()
-            if max(sw, sh) > MAX_DIM:
-                s = MAX_DIM / max(sw, sh)
-                new_w = max(1, int(sw * s))
-                new_h = max(1, int(sh * s))
-                try:
-                    sub = pygame.transform.smoothscale(sub, (new_w, new_h))
-                except Exception:
-                    sub = pygame.transform.scale(sub, (new_w, new_h))
-            frames.append(sub)
-        except Exception:
-            continue
-    # If slicing produced no small pieces but the atlas itself is usable, return scaled atlas as single sprite
-    if not frames:
-        sw, sh = surf.get_size()
-        if max(sw, sh) > 0:
-            if max(sw, sh) > MAX_DIM:
-                s = MAX_DIM / max(sw, sh)
-                try:
-                    surf_small = pygame.transform.smoothscale(surf, (max(1, int(sw * s)), max(1, int(sh * s))))
-                except Exception:
-                    surf_small = pygame.transform.scale(surf, (max(1, int(sw * s)), max(1, int(sh * s))))
-                frames = [surf_small]
-            else:
-                frames = [surf.copy()]
-    # Debug info
-    try:
-        sizes = [f.get_size() for f in frames]
-        print("sliced atlas into", len(frames), "frames sizes:", sizes)
-    except Exception:
-        pass
-    return frames
-
-def load_transform_and_bullets():
+    crop = pygame.Mask(rect.size)
+    crop.draw(mask, (-rect.x, -rect.y))
+    whole = pygame.Rect((0, 0), rect.size)
+    seen = pygame.Mask(rect.size)
+    spans = []  # (top-row x, area) of crop components whose bounds are the whole crop
+    for x in range(rect.w):
+        if crop.get_at((x, 0)) and not seen.get_at((x, 0)):
+            comp = crop.connected_component((x, 0))
+            seen.draw(comp, (0, 0))
+            if comp.get_bounding_rects()[0] == whole:
+                spans.append((x, comp.count()))
+    if len(spans) == 1:
+        return spans[0][1]
+    for x, area in spans:
+        if mask.connected_component((rect.x + x, rect.y)).get_bounding_rects()[0] == rect:
+            return area
+    return 0
+
+def _find_connected_components_alpha(surf, threshold=ATLAS_ALPHA_THRESHOLD, min_area=ATLAS_MIN_AREA):
     """
-    Convenience loader that returns (transform_frames, transform_bullet_frames).
-    Uses relative paths (not ap()) so load_image_safe works consistently.
+    Bounding rects of the 8-connected opaque regions of surf, in reading order: rows top to
+    bottom (a sprite joins a row if its top is above the row's first sprite's middle), then
+    left to right. Labeling is one pass of pygame's C mask code (get_bounding_rects); the
+    area filter counts opaque pixels per rect with NumPy. That count is the component's own
+    only while no other component's rect reaches into it; overlapping rects are measured
+    exactly by _component_area(). connected_components() would build a full-size mask per
+    sprite and takes seconds on a 2048x2048 atlas.
     """
-    t_frames = load_transform_frames(base_name="assets/hero_transform", canvas=HERO_CANVAS)
-    # pass relative path to the slicer so it uses load_image_safe internally
-    b_frames = slice_atlas_by_alpha("assets/transform_bullets.png")
-    # If slicing produced nothing, attempt a fallback using load_image_safe and scale it small
-    if not b_frames:
-        surf = load_image_safe("assets/transform_bullets.png")
-        if hasattr(surf, "get_width") and surf.get_width() > 8:
-            sw, sh = surf.get_size()
-            MAX_DIM = 48
-            if max(sw, sh) > MAX_DIM:
-                s = MAX_DIM / max(sw, sh)
-                try:
-                    surf_small = pygame.transform.smoothscale(surf, (max(1, int(sw * s)), max(1, int(sh * s))))
-                except Exception:
-                    surf_small = pygame.transform.scale(surf, (max(1, int(sw * s)), max(1, int(sh * s))))
-                b_frames = [surf_small]
-            else:
-                b_frames = [surf]
-    # Final debug
+    mask = pygame.mask.from_surface(surf, threshold)
+    alpha = pygame.surfarray.pixels_alpha(surf)  # indexed [x, y]
+    found = mask.get_bounding_rects()
+    rects = []
+    for r in found:
+        if np.count_nonzero(alpha[r.left:r.right, r.top:r.bottom] > threshold) < min_area:
+            continue  # an upper bound on the component's area, so this is already too small
+        if len(r.collidelistall(found)) > 1 and _component_area(mask, r) < min_area:
+            continue
+        rects.append(r)
+    del alpha  # releases the surface lock
+    rects.sort(key=lambda r: (r.y, r.x, r.w, r.h))
+    ordered, row = [], []
+    for r in rects:
+        if row and r.y >= row[0].centery:
+            ordered.extend(sorted(row, key=lambda q: (q.x, q.y)))
+            row = []
+        row.append(r)
+    ordered.extend(sorted(row, key=lambda q: (q.x, q.y)))
+    return ordered
+
+def atlas_rects(path, surf):
+    """_find_connected_components_alpha, remembered per atlas file until the file changes."""
     try:
-        print("transform_frames:", len(t_frames), "transform_bullets:", len(b_frames))
+        st = os.stat(path)
+        key = (path, st.st_mtime_ns, st.st_size, ATLAS_ALPHA_THRESHOLD, ATLAS_MIN_AREA)
+    except OSError:
+        return _find_connected_components_alpha(surf)
+    rects = _atlas_rects.get(key)
+    if rects is None:
+        rects = _atlas_rects[key] = _find_connected_components_alpha(surf)
+    return [Rect(r) for r in rects]
+
+def _fit_max_dim(surf, max_dim=ATLAS_MAX_DIM):
+    sw, sh = surf.get_size()
+    if max(sw, sh) <= max_dim:
+        return surf
+    s = max_dim / max(sw, sh)
+    size = (max(1, int(sw * s)), max(1, int(sh * s)))
+    try:
+        return pygame.transform.smoothscale(surf, size)
     except Exception:
-        pass
-    return t_frames, b_frames
+        return pygame.transform.scale(surf, size)
 
 def slice_atlas_by_alpha(path):
     """
-    Loads an atlas image and returns a list of subsurfaces (copied) for each connected non-transparent region.
-    If the atlas is missing or empty, returns an empty list.
+    Loads an atlas image and returns a list of copies of each connected non-transparent region,
+    each scaled down to fit ATLAS_MAX_DIM. Accepts a project-relative name (e.g.
+    "assets/transform_bullets.png") or an absolute path. A usable atlas with no components
+    comes back as one scaled sprite; a missing or empty one as an empty list.
     """
-    surf = load_image_safe(path)
-    if not surf or getattr(surf, "get_width", lambda:0)() < 8:
+    full = path if os.path.isabs(path) else ap(path)
+    surf = load_image_safe(full) if os.path.exists(full) else None
+    if not surf or surf.get_width() < 8:
         return []
-    rects = _find_connected_components_alpha(surf)
+
     frames = []
-    for r in rects:
-        try:
-            sub = surf.subsurface(r).copy()
-            # trim transparent border a little further if needed (optional)
-            frames.append(sub)
-        except Exception:
-            continue
+    for r in atlas_rects(full, surf):
+        frames.append(_fit_max_dim(surf.subsurface(r).copy()))
+    if not frames:
+        frames = [_fit_max_dim(surf.copy())]
+    print("sliced atlas into", len(frames), "frames sizes:", [f.get_size() for f in frames])
     return frames
 
 def load_transform_and_bullets():
     """
     Convenience loader that returns (transform_frames, transform_bullet_frames).
     Call once after assets are available (e.g. after calling install_dino_chain).
+    Both come from the asset pack unless their source images changed.
     """
-    t_frames = load_transform_frames(base_name="assets/hero_transform", canvas=HERO_CANVAS)
-    b_frames = slice_atlas_by_alpha(ap("assets/transform_bullets.png"))
-    # If slicing produced no frames, attempt to use single large image as one bullet
-    if not b_frames and hasattr(surf := load_image_safe("assets/transform_bullets.png"), "get_width"):
-        if surf.get_width() > 8:
-            b_frames = [surf]
+    t_sources = [f"assets/hero_transform{i}.png" for i in range(1, 4)] + ["assets/hero_transform.png"]
+    t_frames = asset_pack.get("transform_frames", t_sources, HERO_CANVAS,
+                              lambda: load_transform_frames(base_name="assets/hero_transform", canvas=HERO_CANVAS))
+    b_frames = asset_pack.get("transform_bullets", ["assets/transform_bullets.png"],
+                              [ATLAS_ALPHA_THRESHOLD, ATLAS_MIN_AREA, ATLAS_MAX_DIM, ATLAS_SLICER_VERSION],
+                              lambda: slice_atlas_by_alpha("assets/transform_bullets.png"))
     return t_frames, b_frames
 
-# Example usage (call this once after loader definitions in your main file):
-try:
-    transform_frames, transform_bullet_imgs = load_transform_and_bullets()
-except Exception:
-    transform_frames = [hero_transform_img] if 'hero_transform_img' in globals() else []
-    transform_bullet_imgs = []
+def load_transform_assets():
+    global transform_frames, transform_bullet_imgs
+    try:
+        transform_frames, transform_bullet_imgs = load_transform_and_bullets()
+    except Exception:
+        transform_frames = [hero_transform_img] if hero_transform_img else []
+        transform_bullet_imgs = []
+
+# title / game-over text is static, so render it once and let the variant cache pulse it
+title_surf = bigfont.render("SKY RUINS", True, (255,215,0))
+title_glow_surf = bigfont.render("SKY RUINS", True, (255,100,0))
+game_over_surf = bigfont.render("GAME OVER", True, (255,50,50))
+game_over_glow_surf = bigfont.render("GAME OVER", True, (255,0,0))
 
 def draw_scene_title():
     global scroll_x
@@ -1485,32 +2941,35 @@ def draw_scene_title():
             x += w
     else:
         screen.fill((8,12,28))
-    title_surf = bigfont.render("SKY RUINS", True, (255,215,0))
-    glow_surf = bigfont.render("SKY RUINS", True, (255,100,0))
     pulse = 1.0 + 0.1 * sin(now() * 4)
-    gw, gh = int(glow_surf.get_width() * pulse), int(glow_surf.get_height() * pulse)
-    glow_scaled = pygame.transform.smoothscale(glow_surf, (gw, gh))
-    glow_scaled.set_alpha(80)
-    screen.blit(glow_scaled, (WIDTH//2 - gw//2, 120))
+    glow_scaled = sprite_variants.scaled(title_glow_surf, pulse, 0.9, 1.1, alpha=80)
+    screen.blit(glow_scaled, (WIDTH//2 - glow_scaled.get_width()//2, 120))
     screen.blit(title_surf, (WIDTH//2 - title_surf.get_width()//2, 120))
-    subtitle = font.render("PRESS X TO CYCLE SUB-WEAPON • B FOR BOMB • ENTER TO PLAY", True, (200,200,255))
+    subtitle = render_text(font, "PRESS X TO CYCLE SUB-WEAPON • B FOR BOMB • ENTER TO PLAY", (200,200,255))
     screen.blit(subtitle, (WIDTH//2 - subtitle.get_width()//2, 220))
     controls = [
-        font.render("ARROW KEYS / WASD: MOVE", True, (150,200,255)),
-        font.render("SPACE: SHOOT + SUB (3s CD)", True, (150,200,255)),
-        font.render("X: CYCLE SUB-WEAPON", True, (150,200,255)),
-        font.render("B: BOMB (20s CD)", True, (150,200,255))
+        render_text(font, "ARROW KEYS / WASD: MOVE", (150,200,255)),
+        render_text(font, "SPACE: SHOOT + SUB (3s CD)", (150,200,255)),
+        render_text(font, "X: CYCLE SUB-WEAPON", (150,200,255)),
+        render_text(font, "B: BOMB (20s CD)", (150,200,255))
     ]
     for i, ctrl in enumerate(controls):
         screen.blit(ctrl, (WIDTH//2 - ctrl.get_width()//2, 280 + i*25))
+    if not asset_loader.done():
+        bw, bx, by = 400, WIDTH//2 - 200, 420
+        pygame.draw.rect(screen, (40,40,70), (bx, by, bw, 12))
+        pygame.draw.rect(screen, (150,200,255), (bx, by, int(bw * asset_loader.progress()), 12))
+        pygame.draw.rect(screen, (200,200,255), (bx, by, bw, 12), 1)
+        label = render_text(smallfont, f"LOADING {asset_loader.current().upper()}", (200,200,255))
+        screen.blit(label, (WIDTH//2 - label.get_width()//2, by + 18))
 import math
 import pygame
 
 # Config — tweak to taste
 WING_FRAME_COUNT = 6           # number of animation frames for flap cycle
 WING_ANIM_INTERVAL = 0.06      # seconds per wing frame
-WING_BASE_WIDTH = int(HERO_CANVAS[0] * 0.9)   # visual width of wings
-WING_BASE_HEIGHT = int(HERO_CANVAS[1] * 0.55) # visual height of wings
+WING_WIDTH_RATIO = 0.9         # wing width relative to HERO_CANVAS
+WING_HEIGHT_RATIO = 0.55       # wing height relative to HERO_CANVAS
 WING_COLOR = (120, 200, 255)   # base plasma color
 WING_GLOW = (140, 220, 255)    # glow color
 
@@ -1518,7 +2977,7 @@ WING_GLOW = (140, 220, 255)    # glow color
 wing_frames_left = []   # list of Surfaces for left wing (animated)
 wing_frames_right = []  # mirrored copies for right wing
 wing_anim_index = 0
-wing_a    nim_timer = 0.0
+wing_anim_timer = 0.0
 
 def _draw_plasma_layer(surf, cx, cy, w, h, phase, color, alpha):
     """
@@ -1556,14 +3015,17 @@ def _create_single_wing_frame(w, h, flap_amount, base_color=WING_COLOR, glow_col
         pygame.draw.line(surf, (*glow_color, 200), (px-6, py), (px+int(w*0.25), py - int(h*0.08)), 3)
     return surf
 
-def create_plasma_wing_frames(frame_count=WING_FRAME_COUNT, size=(WING_BASE_WIDTH, WING_BASE_HEIGHT)):
+def wing_size():
+    return int(HERO_CANVAS[0] * WING_WIDTH_RATIO), int(HERO_CANVAS[1] * WING_HEIGHT_RATIO)
+
+def create_plasma_wing_frames(frame_count=WING_FRAME_COUNT, size=None):
     """
     Returns (left_frames, right_frames) lists of surfaces.
     Each frame is left-oriented; right frames are mirrored.
     """
     left = []
     right = []
-    w, h = size
+    w, h = size or wing_size()
     for i in range(frame_count):
         # flap phase between -1 and 1
         phase = math.sin((i / frame_count) * math.pi * 2.0)
@@ -1578,7 +3040,7 @@ def create_plasma_wing_frames(frame_count=WING_FRAME_COUNT, size=(WING_BASE_WIDT
 def init_plasma_wings():
     global wing_frames_left, wing_frames_right, wing_anim_index, wing_anim_timer
     try:
-        left, right = create_plasma_wing_frames(WING_FRAME_COUNT, (WING_BASE_WIDTH, WING_BASE_HEIGHT))
+        left, right = create_plasma_wing_frames(WING_FRAME_COUNT, wing_size())
         wing_frames_left = left
         wing_frames_right = right
         wing_anim_index = 0
@@ -1598,181 +3060,337 @@ def draw_scene_game_over():
     overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
     overlay.fill((255,0,0,int(80*pulse)))
     screen.blit(overlay, (0,0))
-    go_surf = bigfont.render("GAME OVER", True, (255,50,50))
-    glow = bigfont.render("GAME OVER", True, (255,0,0))
     pulse = 1.0 + 0.1 * sin(now() * 4)
-    gw, gh = int(glow.get_width() * pulse), int(glow.get_height() * pulse)
-    glow_scaled = pygame.transform.smoothscale(glow, (gw, gh))
-    glow_scaled.set_alpha(100)
-    screen.blit(glow_scaled, (WIDTH//2 - gw//2, 100))
-    screen.blit(go_surf, (WIDTH//2 - go_surf.get_width()//2, 100))
-    score_surf = font.render(f"FINAL SCORE: {score}", True, (255,255,100))
+    glow_scaled = sprite_variants.scaled(game_over_glow_surf, pulse, 0.9, 1.1, alpha=100)
+    screen.blit(glow_scaled, (WIDTH//2 - glow_scaled.get_width()//2, 100))
+    screen.blit(game_over_surf, (WIDTH//2 - game_over_surf.get_width()//2, 100))
+    score_surf = render_text(font, f"FINAL SCORE: {score}", (255,255,100))
     screen.blit(score_surf, (WIDTH//2 - score_surf.get_width()//2, 180))
     new_high = score > high_score
     hs_color = (255,215,0) if new_high else (200,200,200)
-    hs_surf = font.render(f"HIGH SCORE: {max(score, high_score)}", True, hs_color)
+    hs_surf = render_text(font, f"HIGH SCORE: {max(score, high_score)}", hs_color)
     screen.blit(hs_surf, (WIDTH//2 - hs_surf.get_width()//2, 210))
-    restart_surf = font.render("PRESS ENTER TO RESTART", True, (200,200,255))
+    restart_surf = render_text(font, "PRESS ENTER TO RESTART", (200,200,255))
     screen.blit(restart_surf, (WIDTH//2 - restart_surf.get_width()//2, 280))
-    ctrl = font.render("ESC = QUIT", True, (150,150,150))
+    ctrl = render_text(font, "ESC = QUIT", (150,150,150))
     screen.blit(ctrl, (WIDTH//2 - ctrl.get_width()//2, 320))
 
-# ---------------- MAIN LOOP ----------------
-running = True
-while running:
-    dt = clock.tick(FPS) / 1000.0
-    for ev in pygame.event.get():
-        if ev.type == pygame.QUIT:
-            running = False
-        if ev.type == pygame.KEYDOWN:
-            if ev.key == pygame.K_ESCAPE:
-                running = False
-            if scene == "title" and ev.key == pygame.K_RETURN:
-                scene = "game"
-                player.update({"hp":100, "level":1, "exp":0, "transformed":False, "shield": 0, "shield_max": 30, "speed_level": 1, "damage_level": 1})
-                score = 0
-                bullets.clear(); enemies.clear(); powerups.clear(); boss = None; particles.clear()
-                helpers.clear(); helper_count = 0; helper_spawn_timer = now()
-                enemy_spawn_timer = time.time()
-                bomb_cooldown = 0
-                sub_cooldown = 0
-                # reset transform visuals
-                transform_anim_index = 0
-                transform_anim_timer = now()
-                transform_draw_offset = 0.0
-                transform_fly_phase = 0.0
-                transform_thrust_timer = now()
-                if os.path.exists(music_path):
-                    pygame.mixer.music.play(-1)
-            if scene == "game_over" and ev.key == pygame.K_RETURN:
-                scene = "game"
-                player.update({"hp":100, "level":1, "exp":0, "transformed":False, "shield": 0, "shield_max": 30, "speed_level": 1, "damage_level": 1})
-                score = 0
-                bullets.clear(); enemies.clear(); powerups.clear(); boss = None; particles.clear()
-                helpers.clear(); helper_count = 0; helper_spawn_timer = now()
-                enemy_spawn_timer = time.time()
-                bomb_cooldown = 0
-                sub_cooldown = 0
-                transform_anim_index = 0
-                transform_anim_timer = now()
-                transform_draw_offset = 0.0
-                transform_fly_phase = 0.0
-                transform_thrust_timer = now()
-                if os.path.exists(music_path):
-                    pygame.mixer.music.play(-1)
-            if scene == "game" and ev.key == pygame.K_SPACE:
-                player_shoot()
-                if sub_cooldown <= 0:
-                    player_sub_shoot()
-            if scene == "game" and ev.key == pygame.K_b:
-                activate_bomb()
-            if scene == "game" and ev.key == pygame.K_x:
-                sub_cycle_index = (sub_cycle_index + 1) % len(sub_weapons)
-                sub_weapon = sub_weapons[sub_cycle_index]
-                color = (255,100,100) if sub_weapon == "missile" else (0,255,255) if sub_weapon == "laser" else (200,200,255)
-                add_float_pop(WIDTH//2, HEIGHT//2 - 50, f"{sub_weapon.upper()} READY!", color)
-
-    keys = pygame.key.get_pressed()
-    if scene == "game":
-        dx = dy = 0
-        # effective movement speed considers speed_level (capped at 10)
-        speed_level = clamp(player.get("speed_level",1), 1, 10)
-        base_speed = PLAYER_SPEED * (1.0 + 0.08 * (speed_level - 1))
-        if player.get("transformed", False):
-            effective_speed = base_speed * TRANSFORM_MOVE_BOOST
-        else:
-            effective_speed = base_speed
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]: dx -= effective_speed
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]: dx += effective_speed
-        if keys[pygame.K_UP] or keys[pygame.K_w]: dy -= effective_speed
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]: dy += effective_speed
-        if dx and dy: dx *= 0.7071; dy *= 0.7071
-        player["x"] = clamp(player["x"] + dx, 40, WIDTH-40)
-        player["y"] = clamp(player["y"] + dy, 40, HEIGHT-40)
-
-        # transform flight visuals: bobbing + thruster particles (visual only)
-        if player.get("transformed", False):
-            transform_fly_phase += dt * TRANSFORM_FLY_SPEED
-            transform_draw_offset = math.sin(transform_fly_phase) * TRANSFORM_FLY_AMPLITUDE
-            if now() - transform_thrust_timer > TRANSFORM_THRUST_PART_INTERVAL:
-                transform_thrust_timer = now()
-                # left thruster
-                create_particles(player["x"] - 10, player["y"] + 22, count=3, color=(255,180,80),
-                                 speed=2.4, life=0.35, size=3, gravity=0.08, spread=40)
-                # right thruster
-                create_particles(player["x"] + 10, player["y"] + 22, count=3, color=(255,180,80),
-                                 speed=2.4, life=0.35, size=3, gravity=0.08, spread=40)
-        else:
-            transform_draw_offset = 0.0
-
-        if keys[pygame.K_SPACE]:
-            player_shoot()
-            if sub_cooldown <= 0:
-                player_sub_shoot()
+# ---------------- STARTUP ----------------
+def decode_images(*names):
+    return lambda: [decode_image(n) for n in names]
+
+def set_sound(name, filename):
+    return lambda source: sfx.register(name, make_sound(filename, source))
+
+# required stages, in dependency order (hero before transform, sprites before the dino chain)
+asset_loader.submit("stage", decode_images("assets/stage.png"), lambda _: load_stage())
+asset_loader.submit("hero", decode_images(*HERO_SOURCES, "assets/hero_transform.png"), lambda _: load_hero())
+asset_loader.submit("sprites", decode_images("assets/enemy.png", "assets/boss1.png", DINO_SPRITE_PATH),
+                    lambda _: load_sprites())
+asset_loader.submit("dino chain", decode_images(CUSTOM_DINO_PATH),
+                    lambda _: install_dino_chain(globals(), custom_path=CUSTOM_DINO_PATH, size=(48,48), wing_padding=12))
+asset_loader.submit("runes", build_rune_glows, set_rune_glows)
+asset_loader.submit("bomb", build_bomb_frames, set_bomb_frames)
+asset_loader.submit("sub weapons", decode_images(*sub_sprite_paths.values()), lambda _: load_sub_sprites())
+asset_loader.submit("power-ups", finish=lambda _: load_powerup_icons())
+asset_loader.submit("transform", decode_images(*[f"assets/hero_transform{i}.png" for i in range(1, 4)],
+                                               "assets/transform_bullets.png"),
+                    lambda _: load_transform_assets())
+asset_loader.submit("asset pack", finish=lambda _: asset_pack.save())
+if not HEADLESS:
+    for name, filename in SOUND_FILES.items():
+        asset_loader.submit(filename, lambda f=filename: sound_source(f), set_sound(name, filename), required=False)
+    asset_loader.submit("music", finish=lambda _: start_music(), required=False)
+
+# windowed play pumps the loader behind the title screen; everything else needs the assets now
+if HEADLESS or __name__ != "__main__":
+    asset_loader.wait(required_only=False)
+if __name__ == "__main__" and ARGS.build_assets:
+    pygame.quit()
+    sys.exit()
+
+# ---------------- PROFILER ----------------
+# top-level phases first; "draw.*" are sub-sections nested inside "draw"
+PROFILE_PHASES = ("events", "mimic", "entities", "chain", "draw", "flip",
+                  "draw.background", "draw.bullets", "draw.particles", "draw.effects", "draw.hud")
+PROFILE_TOP = 6
+PROFILE_FRAMES = 300
+PROFILE_COLORS = ((200,200,200), (100,255,100), (255,200,50), (100,200,255), (255,100,255), (255,80,80))
+PROFILE_GRAPH_MS = 2 * 1000.0 / FPS  # graph height covers two frames at the target rate
+
+class FrameProfiler:
+    """
+    Per-phase wall-clock timings kept in a ring buffer of PROFILE_FRAMES rows.
+    Sections are bracketed with t = start() ... stop(name, t) and accumulate within a frame
+    (the sim can step several times per frame); end_frame() commits the row.
+    Disabled, start() and stop() return right after one attribute test. Committed rows are
+    streamed to csv_path through a buffered file (opened on the first one), not kept in memory.
+    """
+    def __init__(self, phases=PROFILE_PHASES, frames=PROFILE_FRAMES, csv_path=None):
+        self.enabled = False
+        self.phases = phases
+        self.column = {name: i for i, name in enumerate(phases)}
+        self.samples = np.zeros((frames, len(phases)))
+        self.current = [0.0] * len(phases)
+        self.row = 0
+        self.count = 0
+        self.frames_recorded = 0
+        self.csv_path = csv_path
+        self.csv = None
+
+    def start(self):
+        return time.perf_counter() if self.enabled else 0.0
+
+    def stop(self, name, t):
+        if self.enabled:
+            self.current[self.column[name]] += (time.perf_counter() - t) * 1000.0
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.samples[self.row] = self.current
+        if self.csv_path:
+            if self.csv is None:
+                self.csv = open(self.csv_path, "w", buffering=1 << 16)
+                self.csv.write("frame," + ",".join(f"{name}_ms" for name in self.phases) + "\n")
+            self.csv.write(f"{self.frames_recorded}," + ",".join(f"{v:.4f}" for v in self.current) + "\n")
+        self.frames_recorded += 1
+        self.current = [0.0] * len(self.phases)
+        self.row = (self.row + 1) % len(self.samples)
+        self.count = min(self.count + 1, len(self.samples))
+
+    def percentiles(self):
+        """(p50, p99) arrays in ms over the frames currently in the ring."""
+        if not self.count:
+            zeros = np.zeros(len(self.phases))
+            return zeros, zeros
+        p50, p99 = np.percentile(self.samples[:self.count], (50, 99), axis=0)
+        return p50, p99
+
+    def recent(self):
+        """Ring contents oldest-first."""
+        if self.count < len(self.samples):
+            return self.samples[:self.count]
+        return np.roll(self.samples, -self.row, axis=0)
+
+    def close(self):
+        """Flush the CSV stream, if any frame was recorded."""
+        if self.csv is not None:
+            self.csv.close()
+            self.csv = None
+            print(f"profile: {self.frames_recorded} frames written to {self.csv_path}")
+
+profiler = FrameProfiler(csv_path=ARGS.profile_csv)
+profiler.enabled = ARGS.profile
+
+def draw_profiler_overlay():
+    """Stacked per-frame graph of the top-level phases plus p50/p99 per phase; returns rects."""
+    rects = []
+    gw, gh = PROFILE_FRAMES, 120
+    gx, gy = WIDTH - gw - 10, 10
+    panel = pygame.Surface((gw, gh), pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 160))
+    scale = gh / PROFILE_GRAPH_MS
+    for x, row in enumerate(profiler.recent()[:, :PROFILE_TOP].tolist()):
+        y = gh
+        for ms, color in zip(row, PROFILE_COLORS):
+            h = ms * scale
+            if h >= 1:
+                pygame.draw.line(panel, color, (x, int(y)), (x, int(y - h)))
+            y -= h
+    budget_y = gh - int(governor.budget_ms * scale)
+    pygame.draw.line(panel, (255, 255, 255), (0, budget_y), (gw, budget_y))
+    rects.append(screen.blit(panel, (gx, gy)))
+    p50, p99 = profiler.percentiles()
+    y = gy + gh + 4
+    for i, name in enumerate(profiler.phases):
+        color = PROFILE_COLORS[i] if i < PROFILE_TOP else (180, 180, 180)
+        line = render_text(smallfont, f"{name:<16} p50 {p50[i]:5.2f}  p99 {p99[i]:5.2f} ms", color)
+        rects.append(screen.blit(line, (gx, y)))
+        y += 16
+    return rects
+
+# ---------------- DEBUG OVERLAY ----------------
+show_debug = False  # toggled with F3
+
+def draw_debug_overlay():
+    ps = particle_sprite_cache.stats()
+    lines = [
+        f"FPS: {clock.get_fps():.0f}  SIM FRAME: {sim_clock.frame}",
+        f"BULLETS: {len(bullets)}  ENEMIES: {len(enemies)}  PARTICLES: {len(particles)}",
+        f"TEXT CACHE: {text_cache.saved_last_frame} renders saved/frame",
+        f"PARTICLE SPRITES: {ps['hits']} hits / {ps['misses']} misses",
+        f"HUD REDRAWS: {compositor.hud_redraws}  {'DIRTY RECTS' if compositor.dirty_rects else 'FULL FLIP'}",
+        f"QUALITY: {governor.quality:.2f}  FRAME: {governor.avg_ms:.1f}/{governor.budget_ms:.1f} ms  "
+        f"ENEMY CAP: {governor.enemy_cap()}",
+        f"SFX: {sfx.stats['played']} played  {sfx.stats['merged']} merged  "
+        f"{sfx.stats['stolen']} stolen  {sfx.stats['dropped']} dropped",
+    ]
+    y = HEIGHT - 10 - 22 * len(lines)
+    rects = []
+    for line in lines:
+        rects.append(screen.blit(render_text(font, line, (255,255,0)), (WIDTH//2 - 200, y)))
+        y += 22
+    return rects
+
+# ---------------- GAME FLOW ----------------
+def reset_game(seed=None):
+    """Start a fresh run; with a seed the run is fully reproducible from here (see REPLAY)."""
+    global score, game_steps, boss, helper_count, helper_spawn_timer, enemy_spawn_timer
+    global bomb_cooldown, sub_cooldown, player_invulnerable, invul_timer, bomb_flash, shake_timer
+    global transform_anim_index, transform_anim_timer, transform_draw_offset
+    global transform_fly_phase, transform_thrust_timer, transform_sheet_cooldown
+    if seed is not None:
+        seed_rngs(seed)
+    player.reset()
+    score = 0
+    game_steps = 0
+    bullets.clear(); enemies.clear(); powerups.clear(); boss = None; particles.clear()
+    effects.clear(); float_pops.clear()
+    helpers.clear(); helper_count = 0; helper_spawn_timer = now()
+    enemy_spawn_timer = now()
+    bomb_cooldown = 0
+    sub_cooldown = 0
+    player_invulnerable, invul_timer, bomb_flash = False, 0.0, 0.0
+    shake_timer = 0.0
+    transform_sheet_cooldown = 0.0
+    # reset transform visuals
+    transform_anim_index = 0
+    transform_anim_timer = now()
+    transform_draw_offset = 0.0
+    transform_fly_phase = 0.0
+    transform_thrust_timer = now()
+    if not HEADLESS and os.path.exists(music_path):
+        pygame.mixer.music.play(-1)
 
-        # DINO HELPER MIMIC
-        for h in helpers:
-            if keys[pygame.K_SPACE] and now() - h["last_mimic"] > h["mimic_delay"]:
-                row = selected_hero
-                shots = 1 + (player["level"] >= 10)
-                for i in range(shots):
-                    angle = radians(-10 + 20*i) if shots > 1 else 0
-                    vx = BULLET_SPEED * 0.9 * cos(angle)
-                    vy = BULLET_SPEED * 0.9 * sin(angle)
-                    # helper bullets incorporate player's damage_level
-                    base_damage = max(1, player.get("damage_level",1))
-                    bullets.append({
-                        "x": h["x"] + 24, "y": h["y"], "vx": vx, "vy": vy,
-                        "img": bullet_imgs[row], "glow": True,
-                        "damage": base_damage
-                    })
-                effects.append({
-                    "type": "muzzle", "x": h["x"]+30, "y": h["y"],
-                    "img": muzzle_imgs[row], "t": now(), "dur": 0.1, "glow": True
-                })
-                h["last_mimic"] = now()
-                if shoot_sound: shoot_sound.play()
-            if sub_cooldown <= 0 and keys[pygame.K_SPACE] and now() - h["last_mimic"] > 0.25:
-                if sub_weapon == "missile":
-                    bullets.append({
-                        "x": h["x"]+28, "y": h["y"], "vx": 28, "vy": 0,
-                        "img": sub_imgs["missile"], "glow": True, "damage": 12,
-                        "type": "missile", "homing": True, "target": None
-                    })
-                    create_particles(h["x"]+32, h["y"], 6, (255,150,50), 8, 0.4)
-                elif sub_weapon == "laser":
-                    bullets.append({
-                        "x": h["x"]+28, "y": h["y"], "vx": 85, "vy": 0,
-                        "img": sub_imgs["laser"], "glow": True, "damage": 6,
-                        "type": "laser", "pierce": 99
-                    })
-                    effects.append({"type": "laser_beam", "x": h["x"]+28, "y": h["y"], "t": now(), "dur": 0.25})
-                elif sub_weapon == "lightning":
-                    targets = enemies[:]
-                    if boss: targets.append(boss)
-                    if targets:
-                        start = {"x": h["x"]+28, "y": h["y"]}
-                        chain_all_lightning(start, targets, 14)
-                h["last_mimic"] = now()
+def apply_action(action):
+    """Discrete keydown actions. Routed through here so the replay recorder sees them."""
+    global sub_cycle_index, sub_weapon
+    if action == "fire":
+        player_shoot()
+        if sub_cooldown <= 0:
+            player_sub_shoot()
+    elif action == "bomb":
+        activate_bomb()
+    elif action == "cycle":
+        sub_cycle_index = (sub_cycle_index + 1) % len(sub_weapons)
+        sub_weapon = sub_weapons[sub_cycle_index]
+        color = (255,100,100) if sub_weapon == "missile" else (0,255,255) if sub_weapon == "laser" else (200,200,255)
+        add_float_pop(WIDTH//2, HEIGHT//2 - 50, f"{sub_weapon.upper()} READY!", color)
+
+def player_move_speed():
+    """Pixels per step along one axis; diagonals move at 0.7071 of it on each."""
+    # effective movement speed considers speed_level (capped at 10)
+    speed_level = clamp(player.speed_level, 1, 10)
+    base_speed = PLAYER_SPEED * (1.0 + 0.08 * (speed_level - 1))
+    if player.transformed:
+        return base_speed * TRANSFORM_MOVE_BOOST
+    return base_speed
+
+def update_player(keys, dt):
+    """Movement, transform flight visuals, firing and the dino helper mimic block for one frame."""
+    global transform_fly_phase, transform_draw_offset, transform_thrust_timer
+    dx = dy = 0
+    effective_speed = player_move_speed()
+    if keys[pygame.K_LEFT] or keys[pygame.K_a]: dx -= effective_speed
+    if keys[pygame.K_RIGHT] or keys[pygame.K_d]: dx += effective_speed
+    if keys[pygame.K_UP] or keys[pygame.K_w]: dy -= effective_speed
+    if keys[pygame.K_DOWN] or keys[pygame.K_s]: dy += effective_speed
+    if dx and dy: dx *= 0.7071; dy *= 0.7071
+    player.x = clamp(player.x + dx, 40, WIDTH-40)
+    player.y = clamp(player.y + dy, 40, HEIGHT-40)
+
+    # transform flight visuals: bobbing + thruster particles (visual only)
+    if player.transformed:
+        transform_fly_phase += dt * TRANSFORM_FLY_SPEED
+        transform_draw_offset = math.sin(transform_fly_phase) * TRANSFORM_FLY_AMPLITUDE
+        if now() - transform_thrust_timer > TRANSFORM_THRUST_PART_INTERVAL:
+            transform_thrust_timer = now()
+            # left thruster
+            create_particles(player.x - 10, player.y + 22, count=3, color=(255,180,80),
+                             speed=2.4, life=0.35, size=3, gravity=0.08, spread=40)
+            # right thruster
+            create_particles(player.x + 10, player.y + 22, count=3, color=(255,180,80),
+                             speed=2.4, life=0.35, size=3, gravity=0.08, spread=40)
+    else:
+        transform_draw_offset = 0.0
 
-        update_entities(dt)
+    if keys[pygame.K_SPACE]:
+        player_shoot()
+        if sub_cooldown <= 0:
+            player_sub_shoot()
 
-        # apply shake
-        if now() - shake_timer < 0.4:
-            intensity = 12 if now() - shake_timer < 0.2 else 6
-            shake_offset = (random.randint(-intensity, intensity), random.randint(-intensity, intensity))
-        else:
-            shake_offset = (0,0)
+    # DINO HELPER MIMIC
+    t = profiler.start()
+    for h in helpers:
+        if keys[pygame.K_SPACE] and now() - h.last_mimic > h.mimic_delay:
+            row = selected_hero
+            shots = 1 + (player.level >= 10)
+            for i in range(shots):
+                angle = radians(-10 + 20*i) if shots > 1 else 0
+                vx = BULLET_SPEED * 0.9 * cos(angle)
+                vy = BULLET_SPEED * 0.9 * sin(angle)
+                # helper bullets incorporate player's damage_level
+                base_damage = max(1, player.damage_level)
+                bullets.add(
+                    x=h.x + 24, y=h.y, vx=vx, vy=vy,
+                    img=bullet_imgs[row], damage=base_damage
+                )
+            effects.spawn(type="muzzle", x=h.x+30, y=h.y,
+                          img=muzzle_imgs[row], t=now(), dur=0.1, glow=True)
+            h.last_mimic = now()
+            sfx.play("shoot", h.x)
+        if sub_cooldown <= 0 and keys[pygame.K_SPACE] and now() - h.last_mimic > 0.25:
+            if sub_weapon == "missile":
+                bullets.add(
+                    x=h.x+28, y=h.y, vx=28, vy=0,
+                    img=sub_imgs["missile"], damage=12, kind=BULLET_MISSILE, homing=True
+                )
+                create_particles(h.x+32, h.y, 6, (255,150,50), 8, 0.4)
+            elif sub_weapon == "laser":
+                bullets.add(
+                    x=h.x+28, y=h.y, vx=85, vy=0,
+                    img=sub_imgs["laser"], damage=6, kind=BULLET_LASER, pierce=99
+                )
+                effects.spawn(type="laser_beam", x=h.x+28, y=h.y, t=now(), dur=0.25)
+            elif sub_weapon == "lightning":
+                chain_lightning((h.x+28, h.y), 14)
+            h.last_mimic = now()
+    profiler.stop("mimic", t)
+
+def expire_effects():
+    """Drop effects and float pops whose time is up. Runs per sim step, so headless runs expire them too."""
+    t = now()
+    for i, ef in enumerate(effects):
+        if t - ef["t"] > ef["dur"]:
+            effects.kill(i)
+    effects.sweep()
+    for i, fp in enumerate(float_pops):
+        if t - fp["t"] > fp["dur"]:
+            float_pops.kill(i)
+    float_pops.sweep()
+
+def update_shake():
+    global shake_offset
+    if now() - shake_timer < 0.4:
+        intensity = 12 if now() - shake_timer < 0.2 else 6
+        shake_offset = (fx_rng.randint(-intensity, intensity), fx_rng.randint(-intensity, intensity))
+    else:
+        shake_offset = (0,0)
 
-        if player["hp"] <= 0:
-            if score > high_score:
+def check_player_death():
+    global high_score, scene
+    if player.hp <= 0:
+        if score > high_score:
+            if not HEADLESS and replay_player is None:
                 with open(HIGH_SCORE_FILE, "w") as f:
                     f.write(str(score))
-                high_score = score
-            for _ in range(30):
-                create_particles(player["x"], player["y"], 20, (255,100,0), 15, 1.5, 5, 0.8)
-            scene = "game_over"
+            high_score = score
+        for _ in range(30):
+            create_particles(player.x, player.y, 20, (255,100,0), 15, 1.5, 5, 0.8)
+        scene = "game_over"
 
+def update_helper_follow():
     # SMOOTH DINO HELPER FOLLOW (CHAINED)
     # Use dino_chain_update if installed; otherwise fall back to original lerp follow.
     if 'dino_chain_update' in globals():
@@ -1781,18 +3399,795 @@ while running:
         except Exception:
             # fallback to original per-helper offsets lerp
             for h in helpers:
-                target_x = player["x"] + h.get("offset_x", -60)
-                target_y = player["y"] + h.get("offset_y", 0)
+                target_x = player.x + h.offset_x
+                target_y = player.y + h.offset_y
                 lerp_speed = 0.06
-                h["x"] += (target_x - h["x"]) * lerp_speed
-                h["y"] += (target_y - h["y"]) * lerp_speed
+                h.x += (target_x - h.x) * lerp_speed
+                h.y += (target_y - h.y) * lerp_speed
     else:
         for h in helpers:
-            target_x = player["x"] + h["offset_x"]
-            target_y = player["y"] + h["offset_y"]
+            target_x = player.x + h.offset_x
+            target_y = player.y + h.offset_y
             lerp_speed = 0.04
-            h["x"] += (target_x - h["x"]) * lerp_speed
-            h["y"] += (target_y - h["y"]) * lerp_speed
+            h.x += (target_x - h.x) * lerp_speed
+            h.y += (target_y - h.y) * lerp_speed
+
+def simulate_frame(keys, dt=SIM_DT):
+    """One gameplay tick without any drawing: input, entities, shake, death check and helper follow."""
+    global game_steps
+    sim_clock.advance(dt)
+    if scene == "game":
+        game_steps += 1
+        update_player(keys, dt)
+        t = profiler.start()
+        update_entities(dt)
+        profiler.stop("entities", t)
+        update_shake()
+        check_player_death()
+    expire_effects()
+    t = profiler.start()
+    update_helper_follow()
+    profiler.stop("chain", t)
+
+# ---------------- HEADLESS MODE ----------------
+class KeyState(dict):
+    """Stand-in for pygame.key.get_pressed(); keys that were never set read as released."""
+    def __missing__(self, key):
+        return False
+
+def headless_keys(frame):
+    """Scripted input for headless runs: hold fire and weave up and down every 1.5s."""
+    keys = KeyState()
+    keys[pygame.K_SPACE] = True
+    keys[pygame.K_UP if (frame // 90) % 2 else pygame.K_DOWN] = True
+    return keys
+
+# ---------------- AUTOPILOT ----------------
+# Stand-in player for headless runs, batch sweeps, benches and --autopilot. Each step it scores
+# nine candidate moves (hold one of the eight directions, or stand still) against the enemy
+# bullets pushed forward along their velocities, all candidates x horizon x bullets in one
+# NumPy pass. It uses no RNG, so a seeded autopilot game is as reproducible as a recording.
+AUTOPILOT_HOME_X = 220         # preferred distance from the left edge
+# steps ahead that are checked; gaps stay <= 3 so a bullet closing at ~25 px/step can't skip
+# through the 2 * AUTOPILOT_HIT_HALF box between two samples
+AUTOPILOT_HORIZON = np.array([1, 2, 3, 4, 5, 6, 8, 10, 12, 15, 18, 21, 24], np.float64)
+AUTOPILOT_HIT_HALF = 40 + 8    # player hit box half-size (see update_entities) plus a margin
+AUTOPILOT_HIT_DECAY = 0.9      # a hit t steps out counts 0.9**t of its damage: later is less certain
+AUTOPILOT_DANGER_COST = 40.0   # px of positioning one point of expected damage is worth
+AUTOPILOT_GOAL_STEP = 7        # horizon index whose position is compared against the goal
+AUTOPILOT_IMMINENT = 6         # steps: damage this close that no move avoids...
+AUTOPILOT_BOMB_DAMAGE = 25     # ... sets off the bomb when it is at least this much (or lethal)
+AUTOPILOT_SWAP_LEAD = 0.25     # s before the sub weapon is ready to switch to the right one
+AUTOPILOT_PICKUP_RANGE = 260   # powerups closer than this become the goal
+AUTOPILOT_RESTART_FRAMES = 3 * FPS  # --autopilot window: idle frames on title/game over before (re)starting
+
+_AUTOPILOT_MOVES = np.array([(0, 0), (-1, 0), (1, 0), (0, -1), (0, 1),
+                             (-1, -1), (-1, 1), (1, -1), (1, 1)], np.float64)
+_AUTOPILOT_MOVES[5:] *= 0.7071
+_AUTOPILOT_KEYS = [KeyState({pygame.K_LEFT: dx < 0, pygame.K_RIGHT: dx > 0,
+                             pygame.K_UP: dy < 0, pygame.K_DOWN: dy > 0})
+                   for dx, dy in _AUTOPILOT_MOVES]
+# horizon index k gets rank len - k (earliest highest), 0 means no hit
+_AUTOPILOT_RANK = np.arange(len(AUTOPILOT_HORIZON), 0, -1).astype(np.uint8)[:, None]
+_AUTOPILOT_RANK_WEIGHT = np.concatenate(([0.0], AUTOPILOT_HIT_DECAY ** AUTOPILOT_HORIZON[::-1]))
+_AUTOPILOT_RANK_IMMINENT = len(AUTOPILOT_HORIZON) - np.searchsorted(AUTOPILOT_HORIZON, AUTOPILOT_IMMINENT, "right") + 1
+# the nine moves use only five distinct offsets per axis: test those, then combine per move
+_AUTOPILOT_DX, _AUTOPILOT_IX = np.unique(_AUTOPILOT_MOVES[:, 0], return_inverse=True)
+_AUTOPILOT_DY, _AUTOPILOT_IY = np.unique(_AUTOPILOT_MOVES[:, 1], return_inverse=True)
+
+class Autopilot:
+    """
+    decide() returns this step's held keys and leaves the keydown actions ("bomb", "cycle")
+    to apply before the step in .actions; drive() does both and returns the keys.
+    """
+    def __init__(self):
+        self.move = 0      # last candidate; it wins ties so the ship doesn't jitter
+        self.actions = []
+        self.danger = np.zeros(len(_AUTOPILOT_MOVES))    # expected damage per candidate
+        self.imminent = np.zeros(len(_AUTOPILOT_MOVES))  # damage within AUTOPILOT_IMMINENT steps
+
+    def threats(self, speed):
+        """Fill danger/imminent for every candidate from the live enemy bullets."""
+        T = AUTOPILOT_HORIZON
+        px, py = player.x, player.y
+        # per-axis candidate tracks (offsets, horizon), clamped like update_player
+        tx = np.clip(px + _AUTOPILOT_DX[:, None] * (speed * T), 40, WIDTH - 40)
+        ty = np.clip(py + _AUTOPILOT_DY[:, None] * (speed * T), 40, HEIGHT - 40)
+        n = bullets.n
+        bx, by, bvx, bvy = bullets.x[:n], bullets.y[:n], bullets.vx[:n], bullets.vy[:n]
+        # broadphase: the box a bullet sweeps over the horizon must overlap the box the ship can reach
+        reach = AUTOPILOT_HIT_HALF + speed * T[-1]
+        ex, ey = bx + bvx * T[-1], by + bvy * T[-1]
+        near = (bullets.alive[:n] & bullets.is_enemy[:n]
+                & (np.minimum(bx, ex) < px + reach) & (np.maximum(bx, ex) > px - reach)
+                & (np.minimum(by, ey) < py + reach) & (np.maximum(by, ey) > py - reach))
+        idx = np.flatnonzero(near)
+        if not len(idx):
+            self.danger[:] = 0.0
+            self.imminent[:] = 0.0
+            return
+        fx = bx[idx] + bvx[idx] * T[:, None]  # (horizon, bullets)
+        fy = by[idx] + bvy[idx] * T[:, None]
+        hit_x = np.abs(fx - tx[:, :, None]) < AUTOPILOT_HIT_HALF  # (offsets, horizon, bullets)
+        hit_y = np.abs(fy - ty[:, :, None]) < AUTOPILOT_HIT_HALF
+        hit = hit_x[_AUTOPILOT_IX] & hit_y[_AUTOPILOT_IY]          # (candidates, horizon, bullets)
+        # a bullet dies on its first hit, so only that one counts; max over a rank is several
+        # times cheaper than argmax across the horizon axis
+        rank = (hit.view(np.uint8) * _AUTOPILOT_RANK).max(axis=1)  # (candidates, bullets)
+        dmg = bullets.damage[idx].astype(np.float64)
+        self.danger = _AUTOPILOT_RANK_WEIGHT[rank] @ dmg
+        self.imminent = (rank >= _AUTOPILOT_RANK_IMMINENT) @ dmg
+
+    def decide(self):
+        self.actions = actions = []
+        speed = player_move_speed()
+        self.threats(speed)
+        px, py = player.x, player.y
+
+        # targets: the boss first, else the closest enemy still ahead of the ship
+        aim_y, ahead, nearest, in_row = None, False, float("inf"), 0
+        if boss:
+            aim_y, ahead = boss.y, boss.x > px
+            nearest = hypot(boss.x - px - 40, boss.y - py)
+        lead_x = float("inf")
+        for e in enemies:
+            if e.x <= px:
+                continue
+            ahead = True
+            nearest = min(nearest, hypot(e.x - px - 40, e.y - py))
+            if abs(e.y - py) < 24:
+                in_row += 1
+            if not boss and e.x < lead_x:
+                lead_x, aim_y = e.x, e.y
+
+        goal_x, goal_y = AUTOPILOT_HOME_X, HEIGHT / 2 if aim_y is None else aim_y
+        best = AUTOPILOT_PICKUP_RANGE
+        for p in powerups:
+            d = hypot(p.x - px, p.y - py)
+            if d < best:
+                best, goal_x, goal_y = d, p.x, p.y
+
+        # expected damage dominates; among equally safe moves head for the goal, x counting half
+        k = AUTOPILOT_GOAL_STEP
+        gx = np.clip(px + _AUTOPILOT_MOVES[:, 0] * speed * AUTOPILOT_HORIZON[k], 40, WIDTH - 40)
+        gy = np.clip(py + _AUTOPILOT_MOVES[:, 1] * speed * AUTOPILOT_HORIZON[k], 40, HEIGHT - 40)
+        cost = (self.danger * AUTOPILOT_DANGER_COST
+                + np.abs(gx - goal_x) * 0.5 + np.abs(gy - goal_y))
+        cost[self.move] -= 1.0
+        self.move = int(np.argmin(cost))
+
+        # bomb when even the best move walks into heavy (or lethal) damage
+        unavoidable = float(self.imminent.min())
+        if (unavoidable and bomb_cooldown <= 0 and not player_invulnerable
+                and (unavoidable >= AUTOPILOT_BOMB_DAMAGE or unavoidable >= player.hp + player.shield)):
+            actions.append("bomb")
+
+        # lightning when something is in chain range, laser down a crowded row, missiles otherwise
+        if nearest <= LIGHTNING_MAX_HOP:
+            want = "lightning"
+        elif in_row >= 2:
+            want = "laser"
+        else:
+            want = "missile"
+        if want != sub_weapon and sub_cooldown <= AUTOPILOT_SWAP_LEAD:
+            actions.append("cycle")
+
+        keys = KeyState(_AUTOPILOT_KEYS[self.move])
+        keys[pygame.K_SPACE] = ahead
+        return keys
+
+    def drive(self):
+        """decide(), apply its actions (recording them if a recorder is running) and return the keys."""
+        keys = self.decide()
+        for action in self.actions:
+            if recorder:
+                recorder.action(action)
+            apply_action(action)
+        return keys
+
+def run_headless(frames, dt=SIM_DT):
+    """Step the simulation as fast as possible (no draw, no clock.tick) and report steps per second."""
+    global scene
+    seed = ARGS.seed
+    if recorder and seed is None:
+        seed = random.getrandbits(32)  # a recording needs a seed to replay from
+    reset_game(seed)
+    scene = "game"
+    if recorder:
+        recorder.begin(seed)
+    pilot = Autopilot() if ARGS.autopilot else None
+    steps = 0
+    start = time.perf_counter()
+    while steps < frames and scene == "game":
+        keys = pilot.drive() if pilot else headless_keys(steps)
+        if recorder:
+            recorder.step(keys)
+        simulate_frame(keys, dt)
+        steps += 1
+    elapsed = max(1e-9, time.perf_counter() - start)
+    if recorder:
+        recorder.finish()
+    print(f"headless: {steps} steps ({steps * dt / 60.0:.2f} sim min) in {elapsed:.2f}s "
+          f"-> {steps / elapsed:.0f} steps/s, score {score}, level {player.level}, scene {scene}, "
+          f"{collision_stats['total_pairs'] / max(1, steps):.1f} candidate pairs/step")
+    return steps, elapsed
+
+def bench_autopilot(counts=(100, 300, 600, 1200), decisions=500):
+    """Micro-benchmark: Autopilot.decide() cost against N enemy bullets spread over the screen."""
+    global scene
+    pts = np.random.default_rng(1)
+    for count in counts:
+        reset_game(1)
+        scene = "game"
+        for _ in range(12):
+            enemies.spawn(x=float(pts.uniform(WIDTH / 2, WIDTH)), y=float(pts.uniform(60, HEIGHT - 60)),
+                          target_y=HEIGHT / 2, speed=2.0, hp=4, fire_delay=2.0, type="shooter")
+        for _ in range(count):
+            angle = pts.uniform(math.pi / 2, 3 * math.pi / 2)
+            bullets.add(x=pts.uniform(0, WIDTH), y=pts.uniform(0, HEIGHT),
+                        vx=ENEMY_BULLET_SPEED * cos(angle), vy=ENEMY_BULLET_SPEED * sin(angle),
+                        img=bullet_imgs[3], damage=10, is_enemy=True)
+        pilot = Autopilot()
+        times = []
+        for i in range(decisions):
+            player.y = 60 + (i * 7) % (HEIGHT - 120)
+            t = time.perf_counter()
+            pilot.decide()
+            times.append(time.perf_counter() - t)
+        us = np.array(times) * 1e6
+        print(f"autopilot: {count:5d} enemy bullets -> {us.mean():6.1f} us/decision "
+              f"(p99 {np.percentile(us, 99):6.1f} us)")
+
+def bench_entities(count=2000, frames=300):
+    """Micro-benchmark: the enemy movement loop over dict entities vs slotted Enemy objects."""
+    import tracemalloc
+
+    def make_dicts():
+        return [{"x": WIDTH + 50.0, "y": 100.0 + i % 400, "target_y": 270.0, "speed": 2.0 + i % 3,
+                 "hp": 4, "w": 64, "h": 64, "last_shot": 0.0, "fire_delay": 2.0,
+                 "type": "dodger", "dodge_timer": 0.0} for i in range(count)]
+
+    def make_slotted():
+        return [Enemy(x=WIDTH + 50.0, y=100.0 + i % 400, target_y=270.0, speed=2.0 + i % 3,
+                      hp=4, fire_delay=2.0, type="dodger") for i in range(count)]
+
+    def step_dicts(ents):
+        for _ in range(frames):
+            for e in ents:
+                e["x"] -= e["speed"]
+                e["y"] += (e["target_y"] - e["y"]) * 0.05
+                if e["x"] < -100:
+                    e["x"] = WIDTH + 50.0
+
+    def step_slotted(ents):
+        for _ in range(frames):
+            for e in ents:
+                e.x -= e.speed
+                e.y += (e.target_y - e.y) * 0.05
+                if e.x < -100:
+                    e.x = WIDTH + 50.0
+
+    for name, make, step in (("dict", make_dicts, step_dicts), ("slots", make_slotted, step_slotted)):
+        tracemalloc.start()
+        ents = make()
+        mem = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        start = time.perf_counter()
+        step(ents)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>5}: {elapsed * 1e9 / (count * frames):6.1f} ns/entity-update, "
+              f"{mem / count:6.0f} B/entity ({sys.getsizeof(ents[0])} B shallow)")
+
+# ---------------- MAIN LOOP ----------------
+# ---------------- REPLAY ----------------
+# A recording covers one game from reset_game(seed): the sim-clock start, one key bitmask
+# per sim step (run-length encoded on disk), keydown actions and governor quality changes
+# tagged with the step they preceded, and the final result for verification.
+REPLAY_VERSION = 2
+REPLAY_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN,
+               pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s, pygame.K_SPACE)
+_replay_keystates = {}
+
+def pack_keys(keys):
+    mask = 0
+    for bit, key in enumerate(REPLAY_KEYS):
+        if keys[key]:
+            mask |= 1 << bit
+    return mask
+
+def unpack_keys(mask):
+    keys = _replay_keystates.get(mask)
+    if keys is None:
+        keys = _replay_keystates[mask] = KeyState(
+            (key, True) for bit, key in enumerate(REPLAY_KEYS) if mask >> bit & 1)
+    return keys
+
+class ReplayRecorder:
+    def __init__(self, path):
+        self.path = path
+        self.games = 0
+        self.data = None
+        self.quality = 1.0
+
+    def begin(self, seed):
+        """Call right after reset_game(seed) for a new game."""
+        self.finish()
+        self.games += 1
+        self.quality = governor.quality
+        self.data = {"version": REPLAY_VERSION, "seed": seed, "start_t": sim_clock.t,
+                     "sub_cycle_index": sub_cycle_index, "quality": self.quality,
+                     "keys": [], "actions": []}
+
+    def action(self, name, value=None):
+        if self.data is not None:
+            entry = [len(self.data["keys"]), name]
+            if value is not None:
+                entry.append(value)
+            self.data["actions"].append(entry)
+
+    def step(self, keys):
+        if self.data is None:
+            return
+        if governor.quality != self.quality:
+            self.quality = governor.quality
+            self.action("quality", self.quality)
+        self.data["keys"].append(pack_keys(keys))
+
+    def finish(self):
+        """Write the current game (if any) and stop recording until the next begin()."""
+        data, self.data = self.data, None
+        if not data or not data["keys"]:
+            return
+        runs = []
+        for mask in data["keys"]:
+            if runs and runs[-1][0] == mask:
+                runs[-1][1] += 1
+            else:
+                runs.append([mask, 1])
+        data["keys"] = runs
+        data["result"] = {"steps": sum(n for _, n in runs), "score": score, "level": player.level}
+        path = self.path
+        if self.games > 1:
+            root, ext = os.path.splitext(path)
+            path = f"{root}-{self.games}{ext}"
+        with open(path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        print(f"replay: {data['result']['steps']} steps recorded to {path}")
+
+class ReplayPlayer:
+    def __init__(self, path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("version") != REPLAY_VERSION:
+            raise ValueError(f"{path}: unsupported replay version {data.get('version')}")
+        self.data = data
+        self.keys = [mask for mask, n in data["keys"] for _ in range(n)]
+        self.actions = {}
+        for entry in data["actions"]:
+            self.actions.setdefault(entry[0], []).append(entry[1:])
+        self.index = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def start(self):
+        global scene, sub_cycle_index, sub_weapon
+        sim_clock.t = self.data["start_t"]
+        sub_cycle_index = self.data["sub_cycle_index"]
+        sub_weapon = sub_weapons[sub_cycle_index]
+        reset_game(self.data["seed"])
+        governor.set_quality(self.data["quality"])
+        scene = "game"
+        self.index = 0
+
+    def done(self):
+        return self.index >= len(self.keys)
+
+    def next_keys(self):
+        """Apply the actions recorded before this step and return its input."""
+        for entry in self.actions.get(self.index, ()):
+            if entry[0] == "quality":
+                governor.set_quality(entry[1])
+            else:
+                apply_action(entry[0])
+        keys = unpack_keys(self.keys[self.index])
+        self.index += 1
+        return keys
+
+    def verify(self):
+        """Compare the replayed outcome to the recorded one; returns True on a match."""
+        want = self.data["result"]
+        got = {"steps": self.index, "score": score, "level": player.level}
+        ok = got == want
+        print(f"replay: {got['steps']} steps, score {got['score']}, level {got['level']} -> "
+              f"{'matches recording' if ok else f'DIVERGED from recorded {want}'}")
+        return ok
+
+def run_replay_headless(path):
+    replay = ReplayPlayer(path)
+    replay.start()
+    start = time.perf_counter()
+    while not replay.done():
+        simulate_frame(replay.next_keys())
+    elapsed = max(1e-9, time.perf_counter() - start)
+    print(f"replay: {len(replay)} steps in {elapsed:.2f}s -> {len(replay) / elapsed:.0f} steps/s")
+    return replay.verify()
+
+recorder = ReplayRecorder(ARGS.record) if ARGS.record else None
+replay_player = ReplayPlayer(ARGS.replay) if ARGS.replay else None
+
+# ---------------- BENCHMARK SUITE ----------------
+# Each scenario is (setup, per-frame hook). Setup runs after a seeded reset; the hook runs
+# before every frame (outside the timed region) to hold the worst case in place.
+def _bench_immortal(frame):
+    player.hp = 100
+    if boss:
+        boss.hp = boss.max_hp
+
+def _bench_transformed():
+    player.level = MAX_LEVEL
+    player.transformed = True
+    player.damage_level = player.speed_level = 10
+
+def _bench_helpers():
+    global helper_count
+    for i in range(MAX_HELPERS):
+        helpers.append(Helper(i, player.x, player.y))
+    helper_count = MAX_HELPERS
+
+def _bench_bomb_hook(frame):
+    global bomb_cooldown
+    _bench_immortal(frame)
+    if frame % 60 == 30:
+        bomb_cooldown = 0
+        activate_bomb()
+
+BENCH_BULLET_COUNT = 5000
+_bench_bullet_rng = None
+
+def _bench_bullets():
+    global _bench_bullet_rng
+    _bench_bullet_rng = np.random.default_rng(0)  # the hook's own stream, so gameplay RNG is untouched
+
+def _bench_bullets_hook(frame):
+    """Top the store back up to BENCH_BULLET_COUNT slow bullets, half of them hostile."""
+    _bench_immortal(frame)
+    pts = _bench_bullet_rng
+    for i in range(bullets.n, BENCH_BULLET_COUNT):
+        hostile = i % 2 == 0
+        bullets.add(x=float(pts.uniform(0, WIDTH)), y=float(pts.uniform(0, HEIGHT)),
+                    vx=-2.0 if hostile else 2.0, vy=float(pts.uniform(-1, 1)),
+                    img=bullet_imgs[2 + i % 2] if hostile else bullet_imgs[i % 2],
+                    damage=0 if hostile else 1, is_enemy=hostile)
+
+def _bench_flood_hook(frame):
+    _bench_immortal(frame)
+    boss.last_shot = 0.0  # apocalypse boss rolls for a minion every frame
+
+BENCH_SCENARIOS = {
+    "transformed_l40": (_bench_transformed, _bench_immortal),
+    "helpers_x3": (lambda: (_bench_transformed(), _bench_helpers()), _bench_immortal),
+    "nexus_boss": (spawn_boss4, _bench_immortal),
+    "bomb": (lambda: (spawn_boss2(), _bench_helpers()), _bench_bomb_hook),
+    "minion_flood": (spawn_boss3, _bench_flood_hook),
+    "bullets_5k": (_bench_bullets, _bench_bullets_hook),
+}
+if replay_player is not None:
+    # the recorded session itself; its frame count comes from the recording
+    BENCH_SCENARIOS["replay"] = (replay_player.start, lambda frame: None)
+
+def run_bench_scenario(name, frames, seed):
+    """Seeded sim + draw + present for `frames` frames; timing pass, then a tracemalloc pass."""
+    import tracemalloc
+    setup, hook = BENCH_SCENARIOS[name]
+    pilot = None
+    if name == "replay":
+        frames = len(replay_player)
+
+    def play(measure):
+        nonlocal pilot
+        global scene
+        reset_game(seed)
+        scene = "game"
+        setup()
+        pilot = Autopilot() if ARGS.autopilot else None
+        compositor.invalidate()
+        for f in range(frames):
+            hook(f)
+            if name == "replay":
+                keys = replay_player.next_keys()
+            else:
+                keys = pilot.drive() if pilot else headless_keys(f)
+            measure(f, keys)
+
+    times = []
+    peak = {"bullets": 0, "enemies": 0, "particles": 0, "effects": 0}
+
+    def timed(f, keys):
+        t = time.perf_counter()
+        simulate_frame(keys)
+        draw_scene_game()
+        compositor.flip()
+        times.append(time.perf_counter() - t)
+        text_cache.end_frame()
+        for key, pool in (("bullets", bullets), ("enemies", enemies),
+                          ("particles", particles), ("effects", effects)):
+            peak[key] = max(peak[key], len(pool))
+
+    play(timed)
+
+    # tracing is slow, so allocations get their own pass over the same seeded frames
+    alloc_bytes = []
+    alloc_blocks = []
+
+    def traced(f, keys):
+        blocks = sys.getallocatedblocks()
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        simulate_frame(keys)
+        draw_scene_game()
+        compositor.flip()
+        text_cache.end_frame()
+        alloc_bytes.append(tracemalloc.get_traced_memory()[1] - base)
+        alloc_blocks.append(sys.getallocatedblocks() - blocks)
+
+    tracemalloc.start()
+    try:
+        play(traced)
+    finally:
+        tracemalloc.stop()
+
+    ms = np.array(times) * 1000.0
+    return {
+        "frames": frames,
+        "mean_fps": round(1000.0 / max(1e-9, float(ms.mean())), 1),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "peak": peak,
+        "alloc_peak_bytes_per_frame": int(np.mean(alloc_bytes)),
+        "alloc_net_blocks_per_frame": round(float(np.mean(alloc_blocks)), 2),
+    }
+
+def run_bench(which, frames, seed, out=None, baseline=None, tolerance=0.15):
+    """Run one or all scenarios, print the JSON report and return the number of regressions."""
+    names = list(BENCH_SCENARIOS) if which == "all" else [which]
+    report = {"seed": seed, "frames": frames, "python": sys.version.split()[0],
+              "pygame": pygame.version.ver, "scenarios": {}}
+    for name in names:
+        report["scenarios"][name] = run_bench_scenario(name, frames, seed)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if out:
+        with open(out, "w") as f:
+            f.write(text + "\n")
+    regressions = 0
+    if baseline:
+        with open(baseline) as f:
+            base = json.load(f)["scenarios"]
+        for name, result in report["scenarios"].items():
+            ref = base.get(name)
+            if not ref:
+                continue
+            for key in ("mean_ms", "p99_ms"):
+                if result[key] > ref[key] * (1.0 + tolerance):
+                    regressions += 1
+                    print(f"REGRESSION {name}.{key}: {ref[key]} -> {result[key]}", file=sys.stderr)
+    return regressions
+
+# ---------------- BATCH RUNNER ----------------
+# Balance sweeps: N seeded autopilot games spread over a process pool. Each game gets a fresh
+# sim clock, its seed and its own config override (module constants, restored afterwards),
+# so a run's result depends only on (seed, config), not on which worker ran it or in what order.
+# Only constants the game reads while it runs can be overridden; ones baked in at import or bound as
+# default arguments (MAX_PARTICLES, MAX_EFFECTS, SIM_DT, ...) would be silently ignored.
+BATCH_TUNABLES = (
+    "ENEMY_SPAWN_BASE_INTERVAL", "ENEMY_SPAWN_MIN_INTERVAL", "ENEMY_RATE_SCALE_PER_LEVEL",
+    "ENEMY_FIRE_MIN_MULT", "ENEMY_MIN_SPEED", "ENEMY_MAX_SPEED", "ENEMY_BULLET_SPEED",
+    "BOSS_SPAWN_SCORE", "BOSS2_SPAWN_SCORE", "BOSS3_SPAWN_SCORE", "BOSS4_SPAWN_SCORE",
+    "TRANSFORM_LEVEL", "TRANSFORM_MOVE_BOOST", "TRANSFORM_BULLET_SHEET_COUNT",
+    "TRANSFORM_BULLET_SPREAD_DEG", "TRANSFORM_BULLET_SPEED_MULT", "TRANSFORM_BULLET_DAMAGE_MULT",
+    "TRANSFORM_SHEET_COOLDOWN", "PLAYER_SPEED", "BULLET_SPEED",
+    "BOMB_COOLDOWN_TIME", "BOMB_INVUL_TIME", "SUB_COOLDOWN_TIME",
+)
+
+def load_batch_configs(path):
+    if not path:
+        return [{}]
+    with open(path) as f:
+        configs = json.load(f)
+    if isinstance(configs, dict):
+        configs = [configs]
+    for cfg in configs:
+        for name, value in cfg.items():
+            if name not in BATCH_TUNABLES:
+                raise ValueError(f"{name!r} in {path} is not a batch tunable; choose from: {', '.join(BATCH_TUNABLES)}")
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                raise ValueError(f"config {name} must be a number, got {value!r}")
+    return configs or [{}]
+
+def run_batch_game(task):
+    """One autopilot game in this process; task = (run, seed, config, frame limit)."""
+    global scene, sub_weapon, sub_cycle_index
+    run, seed, config, frames = task
+    saved = {name: globals()[name] for name in config}
+    globals().update(config)
+    try:
+        sim_clock.__init__()
+        sub_cycle_index, sub_weapon = 0, sub_weapons[0]
+        reset_game(seed)
+        scene = "game"
+        pilot = Autopilot()
+        times = []
+        peak = {"bullets": 0, "enemies": 0, "particles": 0, "effects": 0, "float_pops": 0, "total": 0}
+        start, cpu_start = time.perf_counter(), time.process_time()
+        steps = 0
+        while steps < frames and scene == "game":
+            t = time.perf_counter()
+            simulate_frame(pilot.drive())
+            times.append(time.perf_counter() - t)
+            steps += 1
+            counts = (len(bullets), len(enemies), len(particles), len(effects), len(float_pops))
+            for key, c in zip(("bullets", "enemies", "particles", "effects", "float_pops"), counts):
+                if c > peak[key]: peak[key] = c
+            total = sum(counts)
+            if total > peak["total"]: peak["total"] = total
+        ms = np.array(times) * 1000.0
+        return {
+            "run": run, "seed": seed, "config": config,
+            "frames": steps,
+            "survival_s": round(steps * SIM_DT, 2),
+            "died": scene != "game",
+            "score": score,
+            "level": player.level,
+            "peak": peak,
+            "frame_mean_ms": round(float(ms.mean()), 4) if steps else 0.0,
+            "frame_p99_ms": round(float(np.percentile(ms, 99)), 4) if steps else 0.0,
+            "wall_s": round(time.perf_counter() - start, 3),
+            "cpu_s": round(time.process_time() - cpu_start, 3),
+        }
+    finally:
+        globals().update(saved)
+
+def run_batch(games, workers, frames, seed, config_path, out):
+    import multiprocessing
+    configs = load_batch_configs(config_path)
+    tasks = [(i, seed + i, configs[i % len(configs)], frames) for i in range(games)]
+    workers = max(1, min(workers or os.cpu_count() or 1, games))
+    start = time.perf_counter()
+    if workers == 1:
+        results = [run_batch_game(task) for task in tasks]
+    else:
+        # spawn, not fork: the asset-loader and mixer threads make forking this process unsafe.
+        # chunksize 1: games vary a lot in length, so hand them out one at a time
+        with multiprocessing.get_context("spawn").Pool(workers) as pool:
+            results = sorted(pool.imap_unordered(run_batch_game, tasks, chunksize=1), key=lambda r: r["run"])
+            pool.close()
+            pool.join()
+    elapsed = time.perf_counter() - start
+    # game CPU time over wall time: how many cores the games actually kept busy (ideally ~workers)
+    busy = sum(r["cpu_s"] for r in results)
+    report = {"games": games, "workers": workers, "frame_limit": frames, "seed": seed,
+              "wall_s": round(elapsed, 3), "busy_cores": round(busy / max(1e-9, elapsed), 2),
+              "configs": configs, "runs": results}
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    for ci, cfg in enumerate(configs):
+        runs = [r for r in results if r["run"] % len(configs) == ci]
+        if runs:
+            print(f"config {ci} {json.dumps(cfg)}: {len(runs)} games, "
+                  f"survival {np.mean([r['survival_s'] for r in runs]):.1f}s, "
+                  f"score {np.mean([r['score'] for r in runs]):.0f}, "
+                  f"level {np.mean([r['level'] for r in runs]):.1f}, "
+                  f"frame {np.mean([r['frame_mean_ms'] for r in runs]):.3f} ms")
+    print(f"batch: {games} games on {workers} workers in {elapsed:.1f}s "
+          f"({report['busy_cores']} cores busy) -> {out}")
+
+if __name__ == "__main__" and ARGS.batch is not None:
+    run_batch(ARGS.batch, ARGS.batch_workers, ARGS.batch_frames,
+              ARGS.seed if ARGS.seed is not None else 1, ARGS.batch_config, ARGS.batch_out)
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__" and ARGS.bench is not None:
+    if ARGS.bench != "all" and ARGS.bench not in BENCH_SCENARIOS:
+        print(f"unknown scenario {ARGS.bench!r}; choose from: all, {', '.join(BENCH_SCENARIOS)}", file=sys.stderr)
+        sys.exit(2)
+    failed = run_bench(ARGS.bench, ARGS.bench_frames, ARGS.bench_seed,
+                       ARGS.bench_out, ARGS.bench_baseline, ARGS.bench_tolerance)
+    pygame.quit()
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__" and ARGS.bench_autopilot:
+    bench_autopilot()
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__" and ARGS.bench_entities:
+    bench_entities()
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__" and HEADLESS and replay_player is not None:
+    matched = run_replay_headless(ARGS.replay)
+    pygame.quit()
+    sys.exit(0 if matched else 1)
+
+if __name__ == "__main__" and HEADLESS:
+    run_headless(ARGS.frames)
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__" and replay_player is not None:
+    asset_loader.wait()
+    replay_player.start()
+
+def start_game():
+    """ENTER on the title / game-over screen, or the autopilot (re)starting a game."""
+    global scene
+    asset_loader.wait()  # sounds may keep streaming in; images can't
+    scene = "game"
+    seed = ARGS.seed if ARGS.seed is not None else random.getrandbits(32)
+    reset_game(seed)
+    if recorder:
+        recorder.begin(seed)
+
+autopilot = Autopilot() if ARGS.autopilot and replay_player is None else None
+autopilot_idle = 0  # frames spent off the game scene while the autopilot plays
+
+running = __name__ == "__main__"
+while running:
+    frame_dt = clock.tick(FPS) / 1000.0
+    if replay_player is None and asset_loader.done():
+        governor.record(clock.get_rawtime())  # work time of the last frame, excluding the tick's sleep
+    elif not asset_loader.done():
+        asset_loader.pump()
+    sim_accumulator = min(sim_accumulator + frame_dt, SIM_DT * MAX_SIM_STEPS_PER_FRAME)
+    t = profiler.start()
+    for ev in pygame.event.get():
+        if ev.type == pygame.QUIT:
+            running = False
+        if ev.type == pygame.KEYDOWN:
+            if ev.key == pygame.K_ESCAPE:
+                running = False
+            if ev.key == pygame.K_F3:
+                show_debug = not show_debug
+            if ev.key == pygame.K_F4:
+                profiler.enabled = not profiler.enabled
+            if replay_player is not None:
+                continue  # gameplay input comes from the recording
+            if scene in ("title", "game_over") and ev.key == pygame.K_RETURN:
+                start_game()
+            action = {pygame.K_SPACE: "fire", pygame.K_b: "bomb", pygame.K_x: "cycle"}.get(ev.key)
+            if scene == "game" and action:
+                if recorder:
+                    recorder.action(action)
+                apply_action(action)
+
+    profiler.stop("events", t)
+    if autopilot:
+        autopilot_idle = 0 if scene == "game" else autopilot_idle + 1
+        if autopilot_idle > AUTOPILOT_RESTART_FRAMES:
+            start_game()
+
+    # fixed-timestep simulation: render rate and sim rate are decoupled
+    keys = pygame.key.get_pressed()
+    while sim_accumulator >= SIM_DT:
+        if replay_player is not None:
+            if replay_player.done():
+                replay_player.verify()
+                running = False
+                break
+            keys = replay_player.next_keys()
+        elif scene == "game":
+            if autopilot:
+                keys = autopilot.drive()
+            if recorder:
+                recorder.step(keys)
+        simulate_frame(keys, SIM_DT)
+        sim_accumulator -= SIM_DT
+    if recorder and scene != "game":
+        recorder.finish()
+    sfx.flush(player.x)
 
     if scene == "title":
         draw_scene_title()
@@ -1800,8 +4195,22 @@ while running:
         draw_scene_game()
     elif scene == "game_over":
         draw_scene_game_over()
-
-    pygame.display.flip()
-
-pygame.quit()
-sys.exit()
+    if scene != "game":
+        compositor.invalidate()
+    if show_debug:
+        compositor.add_update_rects(draw_debug_overlay())
+    if profiler.enabled:
+        compositor.add_update_rects(draw_profiler_overlay())
+    text_cache.end_frame()
+
+    t = profiler.start()
+    compositor.flip()
+    profiler.stop("flip", t)
+    profiler.end_frame()
+
+if __name__ == "__main__":
+    if recorder:
+        recorder.finish()
+    profiler.close()
+    pygame.quit()
+    sys.exit()